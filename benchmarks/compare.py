@@ -0,0 +1,63 @@
+"""
+Compares two benchmarks.run result files.
+
+The latest result of every (backend, command, size) in each file is
+compared: wall time, d-bus calls and peak memory, with the ratio of
+the new value to the base one.
+
+    python -m benchmarks.compare base.txt new.txt
+"""
+import argparse
+import json
+
+
+def load(path):
+    """
+    Returns the latest record of each (backend, command, size)
+    found in a results file.
+    """
+    records = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            key = (record['backend'], record['command'], record['size'])
+            records[key] = record
+    return records
+
+
+def ratio(base, new):
+    return f'{new / base:6.2f}x' if base else '    --'
+
+
+def compare(base, new):
+    rows = []
+    for key in sorted(set(base) & set(new)):
+        old_record, new_record = base[key], new[key]
+        backend, command, size = key
+        rows.append(
+            f'{command:<24} {backend:<5} {size:>6} '
+            f'{old_record["wall_time"] * 1000:9.1f} -> {new_record["wall_time"] * 1000:9.1f} ms {ratio(old_record["wall_time"], new_record["wall_time"])}  '  # noqa E501
+            f'{old_record["dbus_calls"]:6d} -> {new_record["dbus_calls"]:6d} calls  '  # noqa E501
+            f'{old_record["peak_memory_kb"] / 1024:6.1f} -> {new_record["peak_memory_kb"] / 1024:6.1f} MiB {ratio(old_record["peak_memory_kb"], new_record["peak_memory_kb"])}'  # noqa E501
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('base')
+    parser.add_argument('new')
+    args = parser.parse_args()
+
+    base, new = load(args.base), load(args.new)
+    rows = compare(base, new)
+    if not rows:
+        print('No common (backend, command, size) between the two files.')
+    for row in rows:
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
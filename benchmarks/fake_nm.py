@@ -0,0 +1,430 @@
+"""
+A scriptable, in-memory org.freedesktop.NetworkManager service.
+
+It owns the NetworkManager bus name on a (private) bus and serves a
+generated inventory of devices, connection profiles and access points
+through the methods and properties wypy uses. Every method call it
+receives is counted, the count is read and reset through the
+org.wypy.Benchmark interface on /org/wypy/Benchmark.
+
+    python -m benchmarks.fake_nm --address unix:path=/tmp/bus \\
+        --devices 1000 --profiles 1000 --access-points 1000
+"""
+import argparse
+import sys
+import time
+import uuid
+from wypy.wire import WireBus, Variant
+from wypy.wire.message import (
+    Message,
+    METHOD_CALL,
+    METHOD_RETURN,
+    ERROR,
+    SIGNAL
+)
+from wypy.utils.constants import (
+    NM_BUS_NAME,
+    NM_OBJ_PATH,
+    NM_OBJ_MANAGER_PATH,
+    NM_IFACE,
+    NM_SETTINGS_OBJ_PATH,
+    NM_SETTINGS_IFACE,
+    NM_DEVICE_IFACE,
+    NM_WIRELESS_IFACE,
+    NM_ACCESS_POINT_IFACE,
+    NM_ACTIVE_CONN_IFACE,
+    NM_CONNECTION_IFACE,
+    IP4_CONFIG_IFACE,
+    DBUS_BUS_NAME,
+    DBUS_OBJ_PATH,
+    DBUS_IFACE,
+    DBUS_PROPERTIES_IFACE,
+    DBUS_OBJ_MANAGER_IFACE
+)
+
+BENCHMARK_OBJ_PATH = '/org/wypy/Benchmark'
+BENCHMARK_IFACE = 'org.wypy.Benchmark'
+
+# RequestName flags / replies
+DBUS_NAME_FLAG_DO_NOT_QUEUE = 4
+DBUS_REQUEST_NAME_REPLY_PRIMARY_OWNER = 1
+
+ERROR_UNKNOWN_OBJECT = 'org.freedesktop.DBus.Error.UnknownObject'
+ERROR_UNKNOWN_METHOD = 'org.freedesktop.DBus.Error.UnknownMethod'
+ERROR_UNKNOWN_PROPERTY = 'org.freedesktop.DBus.Error.UnknownProperty'
+ERROR_UNKNOWN_DEVICE = 'org.freedesktop.NetworkManager.UnknownDevice'
+ERROR_UNKNOWN_CONNECTION = 'org.freedesktop.NetworkManager.Settings.InvalidConnection'  # noqa E501
+
+
+class FakeError(Exception):
+
+    def __init__(self, name, message):
+        super().__init__(message)
+        self.name = name
+
+
+def o(path):
+    return Variant('o', path)
+
+
+def ao(paths):
+    return Variant('ao', list(paths))
+
+
+def u(number):
+    return Variant('u', number)
+
+
+def build_inventory(devices=10, profiles=10, access_points=10, radios=1):
+    """
+    Generates NetworkManager's object tree, in the format of
+    GetManagedObjects, along with the connection profiles' settings.
+
+    The first `radios` devices are wireless devices, the access points
+    being spread over them, the others are ethernet devices. Every
+    other device is connected to the connection profile with the same
+    index, if there is one.
+
+    Returns:
+        tuple -- (objects, settings) dictionaries keyed by object path
+    """
+    objects, settings = {}, {}
+    device_paths = [f'{NM_OBJ_PATH}/Devices/{i}' for i in range(devices)]
+    profile_paths = [f'{NM_SETTINGS_OBJ_PATH}/{i}' for i in range(profiles)]
+    ap_paths = [f'{NM_OBJ_PATH}/AccessPoint/{i}' for i in range(access_points)]
+    active_paths = []
+    ssids = max(access_points // 3, 1)
+
+    for i, path in enumerate(profile_paths):
+        wireless = i == 0
+        settings[path] = {
+            'connection': {
+                'id': f'profile-{i}',
+                'uuid': str(uuid.uuid5(uuid.NAMESPACE_URL, path)),
+                'type': '802-11-wireless' if wireless else '802-3-ethernet',
+                'interface-name': 'wlan0' if wireless else f'eth{i}',
+                'timestamp': Variant('t', 1600000000 + i),
+                'autoconnect': True
+            }
+        }
+        objects[path] = {
+            NM_CONNECTION_IFACE: {
+                'Unsaved': False,
+                'Flags': u(0),
+                'Filename': f'/etc/NetworkManager/system-connections/profile-{i}.nmconnection'  # noqa E501
+            }
+        }
+
+    for i, path in enumerate(device_paths):
+        wireless = i < radios
+        active_path = '/'
+        if i % 2 == 0 and i < profiles:
+            active_path = f'{NM_OBJ_PATH}/ActiveConnection/{i}'
+            active_paths.append(active_path)
+            objects[active_path] = {
+                NM_ACTIVE_CONN_IFACE: {
+                    'Id': f'profile-{i}',
+                    'Uuid': settings[profile_paths[i]]['connection']['uuid'],
+                    'Type': settings[profile_paths[i]]['connection']['type'],
+                    'Devices': ao([path]),
+                    'Connection': o(profile_paths[i]),
+                    'State': u(2),
+                    'Default': i == 0
+                }
+            }
+
+        ip4_path = f'{NM_OBJ_PATH}/IP4Config/{i}'
+        objects[ip4_path] = {
+            IP4_CONFIG_IFACE: {
+                'AddressData': Variant('aa{sv}', [
+                    {'address': f'10.{i // 250 % 250}.{i % 250}.2', 'prefix': u(24)}  # noqa E501
+                ]),
+                'NameserverData': Variant('aa{sv}', [{'address': '10.0.0.1'}]),
+                'Gateway': f'10.{i // 250 % 250}.{i % 250}.1',
+                'Domains': Variant('as', ['bench.local'])
+            }
+        }
+
+        connected = active_path != '/'
+        objects[path] = {
+            NM_DEVICE_IFACE: {
+                'Interface': f'wlan{i}' if wireless else f'eth{i}',
+                'DeviceType': u(2 if wireless else 1),
+                'State': u(100 if connected else 30),
+                'ActiveConnection': o(active_path),
+                'Ip4Config': o(ip4_path),
+                'Managed': True,
+                'Autoconnect': True,
+                'Real': True,
+                'Mtu': u(1500),
+                'HwAddress': f'02:00:00:{i >> 16 & 255:02X}:{i >> 8 & 255:02X}:{i & 255:02X}'  # noqa E501
+            }
+        }
+        if wireless:
+            objects[path][NM_WIRELESS_IFACE] = {
+                'AccessPoints': ao(ap_paths[i::radios]),
+                'LastScan': Variant('x', 0),
+                'Bitrate': u(270000),
+                'Mode': u(2)
+            }
+
+    for i, path in enumerate(ap_paths):
+        objects[path] = {
+            NM_ACCESS_POINT_IFACE: {
+                'Ssid': f'network-{i % ssids}'.encode('utf-8'),
+                'Strength': Variant('y', (i * 37) % 101),
+                'Frequency': u(2412 if i % 2 else 5180),
+                'HwAddress': f'12:00:00:{i >> 16 & 255:02X}:{i >> 8 & 255:02X}:{i & 255:02X}',  # noqa E501
+                'Mode': u(2),
+                'MaxBitrate': u(54000 if i % 2 else 270000),
+                'Flags': u(1),
+                'WpaFlags': u(0),
+                'RsnFlags': u(392),
+                'LastSeen': Variant('i', 1000)
+            }
+        }
+
+    objects[NM_SETTINGS_OBJ_PATH] = {
+        NM_SETTINGS_IFACE: {
+            'Connections': ao(profile_paths),
+            'Hostname': 'benchmark',
+            'CanModify': True
+        }
+    }
+    objects[NM_OBJ_PATH] = {
+        NM_IFACE: {
+            'Devices': ao(device_paths),
+            'AllDevices': ao(device_paths),
+            'ActiveConnections': ao(active_paths),
+            'PrimaryConnection': o(active_paths[0] if active_paths else '/'),
+            'State': u(70),
+            'Connectivity': u(4),
+            'NetworkingEnabled': True,
+            'WirelessEnabled': True,
+            'WirelessHardwareEnabled': True,
+            'WwanEnabled': False,
+            'WwanHardwareEnabled': False,
+            'Version': '1.42.0'
+        }
+    }
+    return objects, settings
+
+
+class FakeNetworkManager(WireBus):
+    """
+    Serves an inventory built by build_inventory on the bus at `address`.
+    Like NetworkManager, it replies to RequestScan at once and updates
+    the device's LastScan property `scan_time` seconds later.
+    """
+    scan_time = 0.1
+
+    def __init__(self, address, devices=10, profiles=10, access_points=10,
+                 radios=1):
+        super().__init__(address=address)
+        self.objects, self.settings = build_inventory(
+            devices, profiles, access_points, radios
+        )
+        self.call_count = 0
+        self.methods = {
+            (DBUS_PROPERTIES_IFACE, 'Get'): self.get,
+            (DBUS_PROPERTIES_IFACE, 'GetAll'): self.get_all,
+            (DBUS_PROPERTIES_IFACE, 'Set'): self.set,
+            (DBUS_OBJ_MANAGER_IFACE, 'GetManagedObjects'): self.get_managed_objects,  # noqa E501
+            (NM_IFACE, 'GetDevices'): self.get_devices,
+            (NM_IFACE, 'GetAllDevices'): self.get_devices,
+            (NM_IFACE, 'GetDeviceByIpIface'): self.get_device_by_ip_iface,
+            (NM_IFACE, 'CheckConnectivity'): lambda path: ('u', [4]),
+            (NM_IFACE, 'Enable'): lambda path, flag: ('', []),
+            (NM_IFACE, 'DeactivateConnection'): lambda path, conn: ('', []),
+            (NM_SETTINGS_IFACE, 'ListConnections'): self.list_connections,
+            (NM_SETTINGS_IFACE, 'GetConnectionByUuid'): self.get_connection_by_uuid,  # noqa E501
+            (NM_CONNECTION_IFACE, 'GetSettings'): self.get_settings,
+            (NM_CONNECTION_IFACE, 'Delete'): lambda path: ('', []),
+            (NM_DEVICE_IFACE, 'Disconnect'): lambda path: ('', []),
+            (NM_DEVICE_IFACE, 'Delete'): lambda path: ('', []),
+            (NM_DEVICE_IFACE, 'Reapply'): lambda path, *args: ('', []),
+            (NM_WIRELESS_IFACE, 'GetAccessPoints'): self.get_access_points,
+            (NM_WIRELESS_IFACE, 'GetAllAccessPoints'): self.get_access_points,
+            (NM_WIRELESS_IFACE, 'RequestScan'): self.request_scan,
+            (BENCHMARK_IFACE, 'GetCallCount'): lambda path: ('u', [self.call_count]),  # noqa E501
+            (BENCHMARK_IFACE, 'ResetCallCount'): self.reset_call_count
+        }
+
+        owner = self.call_blocking(
+            DBUS_BUS_NAME, DBUS_OBJ_PATH, DBUS_IFACE, 'RequestName', 'su',
+            (NM_BUS_NAME, DBUS_NAME_FLAG_DO_NOT_QUEUE)
+        )
+        if owner != DBUS_REQUEST_NAME_REPLY_PRIMARY_OWNER:
+            raise RuntimeError(f'{NM_BUS_NAME} is already owned on {address}')
+
+    def serve(self):
+        loop = self.create_main_loop()
+        loop.run()
+
+    # Properties / ObjectManager
+
+    def get(self, path, iface_name, prop):
+        props = self._get_props(path, iface_name)
+        if prop not in props:
+            raise FakeError(ERROR_UNKNOWN_PROPERTY, f'No such property {prop}')  # noqa E501
+        return 'v', [props[prop]]
+
+    def get_all(self, path, iface_name):
+        return 'a{sv}', [self._get_props(path, iface_name)]
+
+    def set(self, path, iface_name, prop, value):
+        props = self._get_props(path, iface_name)
+        props[prop] = value
+        self.emit_properties_changed(path, iface_name, {prop: value})
+        return '', []
+
+    def get_managed_objects(self, path):
+        if path != NM_OBJ_MANAGER_PATH:
+            raise FakeError(ERROR_UNKNOWN_METHOD, 'No object manager here')
+        return 'a{oa{sa{sv}}}', [self.objects]
+
+    # NetworkManager
+
+    def get_devices(self, path):
+        return 'ao', [self.objects[NM_OBJ_PATH][NM_IFACE]['Devices'].value]
+
+    def get_device_by_ip_iface(self, path, ifname):
+        for device_path in self.objects[NM_OBJ_PATH][NM_IFACE]['Devices'].value:  # noqa E501
+            if self.objects[device_path][NM_DEVICE_IFACE]['Interface'] == ifname:  # noqa E501
+                return 'o', [device_path]
+        raise FakeError(ERROR_UNKNOWN_DEVICE, 'No device found for the requested iface.')  # noqa E501
+
+    # Settings
+
+    def list_connections(self, path):
+        return 'ao', [list(self.settings)]
+
+    def get_connection_by_uuid(self, path, conn_uuid):
+        for conn_path, settings in self.settings.items():
+            if settings['connection']['uuid'] == conn_uuid:
+                return 'o', [conn_path]
+        raise FakeError(ERROR_UNKNOWN_CONNECTION, 'No connection with the UUID was found.')  # noqa E501
+
+    def get_settings(self, path):
+        if path not in self.settings:
+            raise FakeError(ERROR_UNKNOWN_OBJECT, f'No such object {path}')
+        return 'a{sa{sv}}', [self.settings[path]]
+
+    # Wireless
+
+    def get_access_points(self, path):
+        props = self._get_props(path, NM_WIRELESS_IFACE)
+        return 'ao', [props['AccessPoints'].value]
+
+    def request_scan(self, path, options):
+        props = self._get_props(path, NM_WIRELESS_IFACE)
+
+        def complete_scan():
+            now = time.clock_gettime(time.CLOCK_BOOTTIME)
+            props['LastScan'] = Variant('x', int(now * 1000))
+            self.emit_properties_changed(
+                path,
+                NM_WIRELESS_IFACE,
+                {'LastScan': props['LastScan']}
+            )
+            return False
+
+        self.timeout_add(int(self.scan_time * 1000), complete_scan)
+        return '', []
+
+    # Benchmark control
+
+    def reset_call_count(self, path):
+        self.call_count = 0
+        return '', []
+
+    def emit_properties_changed(self, path, iface_name, changed):
+        self.sock.sendall(Message(
+            SIGNAL,
+            next(self._serials),
+            path=path,
+            interface=DBUS_PROPERTIES_IFACE,
+            member='PropertiesChanged',
+            signature='sa{sv}as',
+            body=[iface_name, changed, []]
+        ).encode())
+
+    # --------------- #
+    # Private Methods #
+    # --------------- #
+
+    def _get_props(self, path, iface_name):
+        if path not in self.objects:
+            raise FakeError(ERROR_UNKNOWN_OBJECT, f'No such object {path}')
+        if iface_name not in self.objects[path]:
+            raise FakeError(ERROR_UNKNOWN_METHOD, f'No such interface {iface_name}')  # noqa E501
+        return self.objects[path][iface_name]
+
+    def _dispatch(self, message):
+        if message.message_type != METHOD_CALL:
+            return super()._dispatch(message)
+
+        if message.interface != BENCHMARK_IFACE:
+            self.call_count += 1
+
+        handler = self.methods.get((message.interface, message.member))
+        if handler is None and message.interface is None:
+            handler = next((
+                method for (_, member), method in self.methods.items()
+                if member == message.member
+            ), None)
+
+        try:
+            if handler is None:
+                raise FakeError(
+                    ERROR_UNKNOWN_METHOD,
+                    f'No such method {message.interface}.{message.member}'
+                )
+            signature, body = handler(message.path, *message.body)
+            reply = Message(
+                METHOD_RETURN,
+                next(self._serials),
+                destination=message.sender,
+                reply_serial=message.serial,
+                signature=signature or None,
+                body=body
+            )
+        except FakeError as exc:
+            reply = Message(
+                ERROR,
+                next(self._serials),
+                destination=message.sender,
+                reply_serial=message.serial,
+                error_name=exc.name,
+                signature='s',
+                body=[str(exc)]
+            )
+        self.sock.sendall(reply.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--address', required=True)
+    parser.add_argument('--devices', type=int, default=10)
+    parser.add_argument('--profiles', type=int, default=10)
+    parser.add_argument('--access-points', type=int, default=10)
+    parser.add_argument('--radios', type=int, default=1)
+    args = parser.parse_args()
+
+    service = FakeNetworkManager(
+        args.address,
+        args.devices,
+        args.profiles,
+        args.access_points,
+        args.radios
+    )
+    # tells the harness the service is ready
+    print('ready', flush=True)
+    try:
+        service.serve()
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmarks rendering an access point table.
+
+Times wypy.utils.table.Table against PrettyTable fed with values
+colored one by one, as wypy used to, on the same generated rows.
+PrettyTable is only compared when it is installed.
+
+    python -m benchmarks.render --rows 1000,10000,100000
+"""
+import argparse
+import statistics
+import time
+from termcolor import colored
+from wypy.utils.table import Table
+
+FIELDS = ['SSID', 'MODE', 'RATE', 'SIGNAL', 'BARS']
+COLORS = ['cyan', 'magenta', 'yellow', 'green']
+
+
+def generate_rows(count):
+    return [
+        (
+            [f'network-{i}', 'Infra', f'{54 * (i % 5 + 1)} Mbit/s', i % 101,
+             '*' * (i % 4 + 1)],
+            COLORS[i % 4]
+        )
+        for i in range(count)
+    ]
+
+
+def render_table(rows):
+    table = Table(
+        FIELDS,
+        sortby='SIGNAL',
+        border=False,
+        left_padding_width=0,
+        right_padding_width=8,
+        color=True
+    )
+    for row, color in rows:
+        table.add_row(row, color=color)
+    return str(table)
+
+
+def render_prettytable(rows):
+    from prettytable import PrettyTable
+
+    table = PrettyTable(FIELDS)
+    table.align = 'l'
+    table.border = False
+    table.sortby = 'SIGNAL'
+    table.left_padding_width = 0
+    table.right_padding_width = 8
+    for row, color in rows:
+        table.add_row([colored(value, color) for value in row])
+    return str(table)
+
+
+def measure(render, rows, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(rows)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--rows',
+        default='1000,10000,100000',
+        help='comma separated numbers of rows'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import prettytable  # noqa F401
+    except ImportError:
+        renderers = [('Table', render_table)]
+    else:
+        renderers = [
+            ('Table', render_table),
+            ('PrettyTable', render_prettytable)
+        ]
+
+    for count in map(int, args.rows.split(',')):
+        rows = generate_rows(count)
+        timings = {
+            name: measure(render, rows, args.repeat)
+            for name, render in renderers
+        }
+        print(
+            f'rows={count:<7} ' + '  '.join(
+                f'{name} {duration * 1000:9.1f} ms'
+                for name, duration in timings.items()
+            )
+            + (
+                f'  ({timings["PrettyTable"] / timings["Table"]:.1f}x)'
+                if 'PrettyTable' in timings else ''
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+Benchmarks wypy commands against a fake NetworkManager.
+
+A private dbus-daemon and benchmarks.fake_nm are started for every
+inventory size, then each command is run `--repeat` times in a fresh
+interpreter. Wall time, the number of method calls NetworkManager
+received and the peak RSS of the command are appended to `--output`,
+one JSON object per line, tagged with the current commit so runs can
+be compared with benchmarks.compare.
+
+    python -m benchmarks.run --sizes 10,1000,10000
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from wypy.wire import WireBus
+from benchmarks.fake_nm import BENCHMARK_OBJ_PATH, BENCHMARK_IFACE
+from wypy.utils.constants import NM_BUS_NAME
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    'device status': ['device', 'status'],
+    'device list': ['device', 'list'],
+    'connection list': ['connection', 'list'],
+    'connection active': ['connection', 'active'],
+    'wifi list': ['wifi', 'list'],
+    'device list ndjson': ['--output', 'ndjson', 'device', 'list'],
+    'connection list ndjson': ['--output', 'ndjson', 'connection', 'list'],
+    'wifi list ndjson': ['--output', 'ndjson', 'wifi', 'list']
+}
+
+BUS_CONFIG = """<!DOCTYPE busconfig PUBLIC
+ "-//freedesktop//DTD D-BUS Bus Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/dbus/1.0/busconfig.dtd">
+<busconfig>
+  <type>session</type>
+  <listen>{address}</listen>
+  <auth>EXTERNAL</auth>
+  <policy context="default">
+    <allow send_destination="*" eavesdrop="true"/>
+    <allow eavesdrop="true"/>
+    <allow own="*"/>
+  </policy>
+</busconfig>
+"""
+
+CLI = 'import sys; from wypy.cli import cli; cli(sys.argv[1:])'
+
+
+@contextmanager
+def private_bus():
+    """
+    Runs a dbus-daemon listening on a temporary unix socket.
+
+    Yields:
+        string -- the bus address
+    """
+    dbus_daemon = shutil.which('dbus-daemon')
+    if dbus_daemon is None:
+        sys.exit('dbus-daemon is required to run the benchmarks.')
+
+    with tempfile.TemporaryDirectory(prefix='wypy-bench-') as tmp:
+        address = f'unix:path={os.path.join(tmp, "bus")}'
+        config = os.path.join(tmp, 'bus.conf')
+        with open(config, 'w') as f:
+            f.write(BUS_CONFIG.format(address=address))
+
+        process = subprocess.Popen(
+            [dbus_daemon, f'--config-file={config}', '--nofork', '--print-address'],  # noqa E501
+            stdout=subprocess.PIPE,
+            universal_newlines=True
+        )
+        try:
+            process.stdout.readline()
+            yield address
+        finally:
+            process.terminate()
+            process.wait()
+
+
+@contextmanager
+def fake_network_manager(address, size, radios=1):
+    """
+    Runs benchmarks.fake_nm with `size` devices, profiles and
+    access points, `radios` of the devices being wireless, on the
+    bus at `address`.
+
+    Yields:
+        WireBus -- a connection to read the service's call count with
+    """
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'benchmarks.fake_nm',
+            '--address', address,
+            '--devices', str(size),
+            '--profiles', str(size),
+            '--access-points', str(size),
+            '--radios', str(radios)
+        ],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        universal_newlines=True
+    )
+    try:
+        if process.stdout.readline().strip() != 'ready':
+            sys.exit('The fake NetworkManager failed to start.')
+        control = WireBus(address=address)
+        yield control
+        control.close()
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def call_count(control, method):
+    return control.call_blocking(
+        NM_BUS_NAME, BENCHMARK_OBJ_PATH, BENCHMARK_IFACE, method, '', ()
+    )
+
+
+def run_command(args, address, backend):
+    """
+    Runs one wypy command line in a fresh interpreter, exiting
+    with its error output if it fails.
+
+    Returns:
+        tuple -- (wall time in seconds, peak RSS in KiB)
+    """
+    env = dict(
+        os.environ,
+        DBUS_SYSTEM_BUS_ADDRESS=address,
+        WYPY_DAEMON_SOCKET='',
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [ROOT, os.environ.get('PYTHONPATH')])
+        )
+    )
+    with tempfile.TemporaryFile(mode='w+') as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-c', CLI, '--backend', backend, *args],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr
+        )
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        if os.WIFEXITED(status):
+            process.returncode = os.WEXITSTATUS(status)
+        else:
+            process.returncode = -os.WTERMSIG(status)
+
+        if process.returncode != 0:
+            stderr.seek(0)
+            sys.exit(
+                f'`wypy --backend {backend} {" ".join(args)}` failed with '
+                f'exit code {process.returncode}:\n{stderr.read()}'
+            )
+    return elapsed, usage.ru_maxrss
+
+
+def get_commit():
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT,
+            universal_newlines=True
+        ).strip()
+        dirty = subprocess.call(
+            ['git', 'diff', '--quiet', 'HEAD', '--', 'wypy'],
+            cwd=ROOT
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('-dirty' if dirty else '')
+
+
+def benchmark(sizes, commands, backend, repeat, output, radios=1):
+    commit = get_commit()
+
+    for size in sizes:
+        with private_bus() as address, \
+                fake_network_manager(address, size, radios) as control:
+            for name in commands:
+                wall_times, peaks, calls = [], [], []
+
+                for _ in range(repeat):
+                    call_count(control, 'ResetCallCount')
+                    elapsed, peak = run_command(
+                        COMMANDS[name], address, backend
+                    )
+                    calls.append(call_count(control, 'GetCallCount'))
+                    wall_times.append(elapsed)
+                    peaks.append(peak)
+
+                record = {
+                    'commit': commit,
+                    'timestamp': int(time.time()),
+                    'python': platform.python_version(),
+                    'backend': backend,
+                    'command': name,
+                    'size': size,
+                    'radios': radios,
+                    'repeat': repeat,
+                    'wall_time': statistics.median(wall_times),
+                    'wall_times': wall_times,
+                    'dbus_calls': max(calls),
+                    'peak_memory_kb': max(peaks)
+                }
+                output.write(json.dumps(record) + '\n')
+                output.flush()
+                print(
+                    f'{name:<24} size={size:<6} '
+                    f'{record["wall_time"] * 1000:9.1f} ms '
+                    f'{record["dbus_calls"]:7d} calls '
+                    f'{record["peak_memory_kb"] / 1024:7.1f} MiB'
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes',
+        default='10,1000,10000',
+        help='comma separated numbers of devices / profiles / access points'
+    )
+    parser.add_argument(
+        '--commands',
+        default=','.join(COMMANDS),
+        help=f'comma separated commands among: {", ".join(COMMANDS)}'
+    )
+    parser.add_argument('--backend', choices=['dbus', 'wire'], default='dbus')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--radios',
+        type=int,
+        default=1,
+        help='how many of the devices are wireless'
+    )
+    parser.add_argument(
+        '--output',
+        default=os.path.join(ROOT, 'bench_output.txt'),
+        help='file the results are appended to'
+    )
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    commands = [name.strip() for name in args.commands.split(',')]
+    unknown = [name for name in commands if name not in COMMANDS]
+    if unknown:
+        parser.error(f'unknown commands: {", ".join(unknown)}')
+
+    with open(args.output, 'a') as output:
+        benchmark(
+            sizes, commands, args.backend, args.repeat, output, args.radios
+        )
+
+
+if __name__ == '__main__':
+    main()
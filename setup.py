@@ -11,7 +11,7 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type='text/markdown',
     packages=setuptools.find_packages(
-        exclude=['docs', 'tests']
+        exclude=['docs', 'tests', 'benchmarks', 'benchmarks.*']
     ),
     url="https://github.com/Zabanaa/wypy",
     author="Karim C",
@@ -29,9 +29,11 @@ setuptools.setup(
     install_requires=[
         'click',
         'termcolor',
-        'prettytable',
         'dbus-python'
     ],
+    extras_require={
+        'asyncio': ['dbus-next']
+    },
     entry_points={
         'console_scripts': [
             'wypy=wypy.cli:cli'
@@ -0,0 +1,6 @@
+from .wypy import AsyncWyPy  # noqa F401
+from .connection import AsyncConnection  # noqa F401
+from .device import AsyncDevice  # noqa F401
+from .general import AsyncGeneral  # noqa F401
+from .networking import AsyncNetwork  # noqa F401
+from .wifi import AsyncWiFi  # noqa F401
@@ -0,0 +1,122 @@
+from wypy.aio.wypy import AsyncWyPy
+from wypy.utils.helpers import is_valid_uuid
+from wypy.utils.constants import (
+    NM_IFACE,
+    NM_OBJ_PATH,
+    NM_SETTINGS_IFACE,
+    NM_SETTINGS_OBJ_PATH,
+    NM_ACTIVE_CONN_IFACE,
+    NM_DEVICE_IFACE,
+    NM_CONNECTION_IFACE,
+    DBUS_PROPERTIES_IFACE
+)
+
+
+class AsyncConnection(AsyncWyPy):
+
+    async def active(self):
+        """
+        Returns the active connections along with their device.
+        Connections and devices are fetched concurrently, each
+        device only once.
+
+        Returns:
+            list -- one dict per active connection
+        """
+        conn_paths = await self.get_property(
+            NM_OBJ_PATH,
+            NM_IFACE,
+            'ActiveConnections'
+        )
+        conns = await self.call_many([
+            (path, DBUS_PROPERTIES_IFACE, 'GetAll', (NM_ACTIVE_CONN_IFACE,))
+            for path in conn_paths
+        ])
+        device_paths = list({
+            conn['Devices'][0] for conn in conns if conn.get('Devices')
+        })
+        devices = dict(zip(device_paths, await self.call_many([
+            (path, DBUS_PROPERTIES_IFACE, 'GetAll', (NM_DEVICE_IFACE,))
+            for path in device_paths
+        ])))
+
+        result = []
+        for path, conn in zip(conn_paths, conns):
+            device_path = conn['Devices'][0] if conn.get('Devices') else '/'
+            device = devices.get(device_path, {})
+            result.append({
+                'name': conn.get('Id'),
+                'uuid': conn.get('Uuid'),
+                'type': self.translate_device_type(int(device.get('DeviceType', 0))),  # noqa E501
+                'device': device.get('Interface', '--'),
+                'path': path
+            })
+        return result
+
+    async def connections(self):
+        """
+        Returns the 'connection' settings of every connection profile,
+        fetched concurrently.
+
+        Returns:
+            list -- one dict per connection profile
+        """
+        conn_paths = await self.call(
+            NM_SETTINGS_OBJ_PATH,
+            NM_SETTINGS_IFACE,
+            'ListConnections'
+        )
+        all_settings = await self.call_many([
+            (path, NM_CONNECTION_IFACE, 'GetSettings', ())
+            for path in conn_paths
+        ])
+        return [
+            dict(settings['connection'], path=path)
+            for path, settings in zip(conn_paths, all_settings)
+        ]
+
+    async def deactivate(self, conn):
+        """
+        Deactivates an active connection.
+        Raises ValueError if the connection is unknown or inactive.
+
+        Arguments:
+            conn {string} -- uuid / name of the connection
+        """
+        filter_key = 'uuid' if is_valid_uuid(conn) else 'name'
+        active = await self.active()
+        match = next(filter(lambda c: c[filter_key] == conn, active), None)
+
+        if match is None:
+            raise ValueError(f'Connection "{conn}" unknown or inactive')
+
+        await self.call(
+            NM_OBJ_PATH,
+            NM_IFACE,
+            'DeactivateConnection',
+            match['path']
+        )
+
+    async def delete(self, conn):
+        """
+        Deletes a connection profile.
+        Raises ValueError if the connection is unknown.
+
+        Arguments:
+            conn {string} -- uuid / name of the connection
+        """
+        if is_valid_uuid(conn):
+            conn_path = await self.call(
+                NM_SETTINGS_OBJ_PATH,
+                NM_SETTINGS_IFACE,
+                'GetConnectionByUuid',
+                conn
+            )
+        else:
+            connections = await self.connections()
+            match = next(filter(lambda c: c['id'] == conn, connections), None)
+            if match is None:
+                raise ValueError(f'Connection "{conn}" unknown')
+            conn_path = match['path']
+
+        await self.call(conn_path, NM_CONNECTION_IFACE, 'Delete')
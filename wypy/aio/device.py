@@ -0,0 +1,120 @@
+from wypy.aio.wypy import AsyncWyPy, DBusError
+from wypy.utils.helpers import format_list
+from wypy.utils.constants import (
+    NM_OBJ_PATH,
+    NM_IFACE,
+    NM_DEVICE_IFACE,
+    NM_ACTIVE_CONN_IFACE,
+    IP4_CONFIG_IFACE
+)
+
+
+class AsyncDevice(AsyncWyPy):
+
+    async def status(self):
+        """
+        Returns the status of every device, read from a single
+        GetManagedObjects call.
+
+        Returns:
+            list -- one dict per device
+        """
+        objects = await self.get_managed_objects()
+        return [
+            self._get_device_status(objects, path)
+            for path, ifaces in objects.items()
+            if NM_DEVICE_IFACE in ifaces
+        ]
+
+    async def details(self, ifname):
+        """
+        Returns the status, mtu and ipv4 information of a device.
+
+        Arguments:
+            ifname {string} -- the device's interface name
+
+        Returns:
+            dict -- the device's details
+        """
+        device_path = await self.get_device_path(ifname)
+        objects = await self.get_managed_objects()
+        details = self._get_device_status(objects, device_path)
+        props = objects[device_path][NM_DEVICE_IFACE]
+        ip4props = objects.get(props['Ip4Config'], {}).get(IP4_CONFIG_IFACE, {})  # noqa E501
+
+        details['mtu'] = int(props.get('Mtu', 0))
+        details['ipv4_addresses'] = format_list(ip4props.get('AddressData', []))  # noqa E501
+        details['ipv4_dns'] = format_list(ip4props.get('NameserverData', []))
+        details['ipv4_gateway'] = ip4props.get('Gateway') or '--'
+        details['ipv4_domains'] = ' / '.join(ip4props.get('Domains', [])) or '--'  # noqa E501
+        return details
+
+    async def get_device_path(self, ifname):
+        """
+        Resolves an interface name to the device's object path.
+        Raises ValueError if the device does not exist.
+        """
+        try:
+            return await self.call(
+                NM_OBJ_PATH,
+                NM_IFACE,
+                'GetDeviceByIpIface',
+                ifname
+            )
+        except DBusError:
+            raise ValueError(f'Unknown device "{ifname}"')
+
+    async def disconnect(self, ifname):
+        device_path = await self.get_device_path(ifname)
+        await self.call(device_path, NM_DEVICE_IFACE, 'Disconnect')
+
+    async def delete(self, ifname):
+        device_path = await self.get_device_path(ifname)
+        await self.call(device_path, NM_DEVICE_IFACE, 'Delete')
+
+    async def reapply(self, ifname):
+        device_path = await self.get_device_path(ifname)
+        await self.call(device_path, NM_DEVICE_IFACE, 'Reapply', {}, 0, 0)
+
+    async def manage(self, ifname, flag=True):
+        device_path = await self.get_device_path(ifname)
+        await self.set_property(
+            device_path, NM_DEVICE_IFACE, 'Managed', 'b', flag
+        )
+
+    async def autoconnect(self, ifname, flag=True):
+        device_path = await self.get_device_path(ifname)
+        await self.set_property(
+            device_path, NM_DEVICE_IFACE, 'Autoconnect', 'b', flag
+        )
+
+    # --------------- #
+    # Private methods #
+    # --------------- #
+
+    def _get_device_status(self, objects, device_path):
+        """
+        Builds a device's status from the NetworkManager object tree.
+
+        Arguments:
+            objects {dict} -- the result of get_managed_objects
+            device_path {string} -- the device's own d-bus object path
+
+        Returns:
+            dict -- the device's status information
+        """
+        props = objects[device_path][NM_DEVICE_IFACE]
+        conn_path = props.get('ActiveConnection', '/')
+        conn = objects.get(conn_path, {}).get(NM_ACTIVE_CONN_IFACE, {})
+        state = int(props.get('State', 0))
+
+        return {
+            'name': props.get('Interface', 'Unknown'),
+            'type': self.translate_device_type(int(props.get('DeviceType', 0))),  # noqa E501
+            'device_status': self.translate_device_state(state),
+            'connection': conn.get('Id', '--'),
+            'state': state,
+            'managed': bool(props.get('Managed', False)),
+            'connection_path': conn_path,
+            'device_path': device_path
+        }
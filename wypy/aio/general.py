@@ -0,0 +1,32 @@
+from wypy.aio.wypy import AsyncWyPy
+from wypy.utils.constants import (
+    NM_SETTINGS_IFACE,
+    NM_SETTINGS_OBJ_PATH,
+    NM_OBJ_PATH,
+    NM_IFACE,
+    DBUS_GENERAL_PROPS
+)
+
+
+class AsyncGeneral(AsyncWyPy):
+
+    async def status(self):
+        """
+        Returns the general status of NetworkManager.
+
+        Returns:
+            dict -- status codes keyed by WyPy's property names
+            (STATE, CONNECTIVITY, WIFI ...)
+        """
+        props = await self.get_all_properties(NM_OBJ_PATH, NM_IFACE)
+        return {
+            name: int(props[prop])
+            for prop, name in DBUS_GENERAL_PROPS.items()
+        }
+
+    async def hostname(self):
+        return await self.get_property(
+            NM_SETTINGS_OBJ_PATH,
+            NM_SETTINGS_IFACE,
+            'Hostname'
+        )
@@ -0,0 +1,34 @@
+from wypy.aio.wypy import AsyncWyPy
+from wypy.utils.constants import NM_IFACE, NM_OBJ_PATH
+
+
+class AsyncNetwork(AsyncWyPy):
+
+    async def connectivity(self):
+        """
+        Returns the current connectivity state code.
+        """
+        state = await self.get_property(NM_OBJ_PATH, NM_IFACE, 'Connectivity')
+        return int(state)
+
+    async def check_connectivity(self):
+        """
+        Forces NetworkManager to perform a connectivity check
+        and returns the resulting state code.
+        """
+        state = await self.call(NM_OBJ_PATH, NM_IFACE, 'CheckConnectivity')
+        return int(state)
+
+    async def is_enabled(self):
+        enabled = await self.get_property(
+            NM_OBJ_PATH,
+            NM_IFACE,
+            'NetworkingEnabled'
+        )
+        return bool(enabled)
+
+    async def enable(self):
+        await self.call(NM_OBJ_PATH, NM_IFACE, 'Enable', True)
+
+    async def disable(self):
+        await self.call(NM_OBJ_PATH, NM_IFACE, 'Enable', False)
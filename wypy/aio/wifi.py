@@ -0,0 +1,148 @@
+import asyncio
+from wypy.aio.wypy import AsyncWyPy, DBusError
+from wypy.wifi.access_point import decode_ssid
+from wypy.utils.constants import (
+    NM_BUS_NAME,
+    NM_OBJ_PATH,
+    NM_IFACE,
+    NM_DEVICE_IFACE,
+    NM_WIRELESS_IFACE,
+    NM_ACCESS_POINT_IFACE,
+    DBUS_PROPERTIES_IFACE,
+    SCAN_TIMEOUT
+)
+
+
+class AsyncWiFi(AsyncWyPy):
+
+    async def status(self):
+        """
+        Returns whether wireless is enabled.
+        """
+        enabled = await self.get_property(
+            NM_OBJ_PATH,
+            NM_IFACE,
+            'WirelessEnabled'
+        )
+        return bool(enabled)
+
+    async def enable(self):
+        await self.set_property(
+            NM_OBJ_PATH, NM_IFACE, 'WirelessEnabled', 'b', True
+        )
+
+    async def disable(self):
+        await self.set_property(
+            NM_OBJ_PATH, NM_IFACE, 'WirelessEnabled', 'b', False
+        )
+
+    async def wireless_devices(self):
+        """
+        Returns the object paths of every real wireless device.
+        """
+        objects = await self.get_managed_objects()
+        return [
+            path for path, ifaces in objects.items()
+            if NM_WIRELESS_IFACE in ifaces
+            and ifaces.get(NM_DEVICE_IFACE, {}).get('Real', True)
+        ]
+
+    async def scan(self, timeout=SCAN_TIMEOUT):
+        """
+        Requests a scan on every wireless device concurrently,
+        waits for each device's LastScan property to change, then
+        returns the visible access points.
+
+        Keyword Arguments:
+            timeout {int} -- seconds to wait for the scans to complete
+
+        Returns:
+            list -- one dict per access point
+        """
+        devices = await self.wireless_devices()
+        await asyncio.gather(*[
+            self._scan_device(path, timeout) for path in devices
+        ])
+        return await self.access_points(devices)
+
+    async def access_points(self, devices=None):
+        """
+        Returns the access points currently known to NetworkManager,
+        without scanning. Their properties are fetched concurrently.
+
+        Keyword Arguments:
+            devices {list} -- the wireless devices to list the access
+            points of (default: {every wireless device})
+
+        Returns:
+            list -- one dict per access point
+        """
+        if devices is None:
+            devices = await self.wireless_devices()
+
+        ap_paths = await self.call_many([
+            (path, NM_WIRELESS_IFACE, 'GetAllAccessPoints', ())
+            for path in devices
+        ])
+        tagged = [
+            (device, ap_path)
+            for device, paths in zip(devices, ap_paths)
+            for ap_path in paths
+        ]
+        all_props = await self.call_many([
+            (ap_path, DBUS_PROPERTIES_IFACE, 'GetAll', (NM_ACCESS_POINT_IFACE,))  # noqa E501
+            for _, ap_path in tagged
+        ], return_exceptions=True)
+
+        return [
+            self._get_ap_info(device, ap_path, props)
+            for (device, ap_path), props in zip(tagged, all_props)
+            if not isinstance(props, Exception)
+        ]
+
+    # --------------- #
+    # Private methods #
+    # --------------- #
+
+    async def _scan_device(self, device_path, timeout):
+        """
+        Requests a scan on one device and waits until its LastScan
+        property changes, or `timeout` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        match = (
+            f"type='signal',sender='{NM_BUS_NAME}',"
+            f"interface='{DBUS_PROPERTIES_IFACE}',"
+            f"member='PropertiesChanged',path='{device_path}'"
+        )
+
+        def on_properties_changed(message):
+            if len(message.body) < 2 or not isinstance(message.body[1], dict):  # noqa E501
+                return
+            iface_name, changed = message.body[0], message.body[1]
+            if iface_name == NM_WIRELESS_IFACE and 'LastScan' in changed:
+                if not done.done():
+                    done.set_result(None)
+
+        await self.add_match(match, on_properties_changed)
+        try:
+            await self.call(device_path, NM_WIRELESS_IFACE, 'RequestScan', {})
+            await asyncio.wait_for(done, timeout)
+        except (DBusError, asyncio.TimeoutError):
+            # Rate-limited or slow scans: use the current results.
+            pass
+        finally:
+            await self.remove_match(match, on_properties_changed)
+
+    def _get_ap_info(self, device_path, ap_path, props):
+        return {
+            'ssid': decode_ssid(props.get('Ssid', b'')),
+            'bssid': props.get('HwAddress', '--'),
+            'mode': int(props.get('Mode', 0)),
+            'rate': int(props.get('MaxBitrate', 0)) // 1000,
+            'signal': int(props.get('Strength', 0)),
+            'frequency': int(props.get('Frequency', 0)),
+            'device': device_path,
+            'dbus_path': ap_path
+        }
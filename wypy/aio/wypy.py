@@ -0,0 +1,275 @@
+import asyncio
+import re
+from wypy.wypy import WyPy
+from wypy.utils.signatures import get_method_signature
+from wypy.utils.constants import (
+    NM_BUS_NAME,
+    NM_OBJ_MANAGER_PATH,
+    DBUS_BUS_NAME,
+    DBUS_OBJ_PATH,
+    DBUS_IFACE,
+    DBUS_PROPERTIES_IFACE,
+    DBUS_OBJ_MANAGER_IFACE,
+    DBUS_MAX_IN_FLIGHT,
+    DBUS_CALL_TIMEOUT
+)
+
+try:
+    from dbus_next import BusType, Message, MessageType, Variant
+    from dbus_next.aio import MessageBus
+    from dbus_next.errors import DBusError
+except ImportError:
+    MessageBus = None
+
+    class DBusError(Exception):
+        pass
+
+
+MATCH_RULE_ITEM = re.compile(r"(\w+)='([^']*)'")
+
+
+def parse_match_rule(match):
+    """
+    Returns the keys of a d-bus match rule mapped to their value,
+    e.g. {'type': 'signal', 'path': '/some/path'}.
+    """
+    return dict(MATCH_RULE_ITEM.findall(match))
+
+
+def matches_rule(rule, message):
+    """
+    Whether a signal message has the path, interface and member of a
+    parsed match rule. The sender is filtered by the bus itself,
+    since messages carry the sender's unique name.
+
+    Arguments:
+        rule {dict} -- as returned by parse_match_rule
+        message {Message} -- the signal message
+
+    Returns:
+        bool -- whether the message fulfils the rule
+    """
+    return all(
+        getattr(message, key) == rule[key]
+        for key in ('path', 'interface', 'member')
+        if key in rule
+    )
+
+
+def unwrap(value):
+    """
+    Recursively replaces dbus-next Variants with their value.
+
+    Arguments:
+        value {object} -- a value returned by dbus-next
+
+    Returns:
+        object -- the same value made of plain python types
+    """
+    if MessageBus is not None and isinstance(value, Variant):
+        return unwrap(value.value)
+    if isinstance(value, list):
+        return [unwrap(val) for val in value]
+    if isinstance(value, dict):
+        return {key: unwrap(val) for key, val in value.items()}
+    return value
+
+
+class AsyncWyPy(object):
+    """
+    Base class of the asyncio API.
+    It talks to NetworkManager through dbus-next, using the same
+    static method signatures as WyPy, and returns plain python data.
+    Several subsystems can share one connection by passing `bus`.
+    """
+
+    translate_device_type = WyPy.translate_device_type
+    translate_device_state = WyPy.translate_device_state
+
+    def __init__(self, bus=None):
+        self.bus = bus
+        self.bus_name = NM_BUS_NAME
+        self.max_in_flight = DBUS_MAX_IN_FLIGHT
+        self.call_timeout = DBUS_CALL_TIMEOUT
+        self._signal_handlers = {}
+
+    async def connect(self):
+        """
+        Connects to the system bus, unless a bus was given.
+
+        Returns:
+            MessageBus -- the connected bus
+        """
+        if MessageBus is None:
+            raise RuntimeError(
+                'The asyncio API requires dbus-next: '
+                'pip install wypy[asyncio]'
+            )
+        if self.bus is None:
+            self.bus = await MessageBus(bus_type=BusType.SYSTEM).connect()
+        return self.bus
+
+    def disconnect(self):
+        if self.bus is not None:
+            self.bus.disconnect()
+            self.bus = None
+
+    async def call(
+        self,
+        object_path,
+        iface_name,
+        method_name,
+        *args,
+        destination=None
+    ):
+        """
+        Calls a d-bus method and waits for its reply.
+
+        Arguments:
+            object_path {string} -- the object's d-bus path
+            iface_name {string} -- the interface the method belongs to
+            method_name {string} -- the method's name
+            args -- the method's arguments
+
+        Keyword Arguments:
+            destination {string} -- the bus name to call
+            (default: {NetworkManager})
+
+        Returns:
+            object -- the reply's value, a tuple if there are several
+        """
+        bus = await self.connect()
+        signature = get_method_signature(iface_name, method_name)
+        message = Message(
+            destination=destination or self.bus_name,
+            path=str(object_path),
+            interface=iface_name,
+            member=method_name,
+            signature=signature or '',
+            body=list(args)
+        )
+        reply = await asyncio.wait_for(bus.call(message), self.call_timeout)
+
+        if reply.message_type == MessageType.ERROR:
+            text = reply.body[0] if reply.body else ''
+            raise DBusError(reply.error_name, text, reply)
+
+        body = unwrap(reply.body)
+        if len(body) == 0:
+            return None
+        return body[0] if len(body) == 1 else tuple(body)
+
+    async def call_many(self, calls, return_exceptions=False):
+        """
+        Runs several calls concurrently, with at most
+        `max_in_flight` of them pending at any time.
+
+        Arguments:
+            calls {list} -- (object_path, iface_name, method_name, args)
+            tuples describing each call
+
+        Keyword Arguments:
+            return_exceptions {bool} -- return failed calls' exceptions
+            in place of their result instead of raising (default: {False})
+
+        Returns:
+            list -- the replies, in the same order as `calls`
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def bounded(path, iface_name, method_name, args):
+            async with semaphore:
+                return await self.call(path, iface_name, method_name, *args)
+
+        return await asyncio.gather(
+            *[bounded(*call) for call in calls],
+            return_exceptions=return_exceptions
+        )
+
+    async def get_property(self, object_path, iface_name, prop_name):
+        return await self.call(
+            object_path,
+            DBUS_PROPERTIES_IFACE,
+            'Get',
+            iface_name,
+            prop_name
+        )
+
+    async def set_property(
+        self,
+        object_path,
+        iface_name,
+        prop_name,
+        signature,
+        value
+    ):
+        return await self.call(
+            object_path,
+            DBUS_PROPERTIES_IFACE,
+            'Set',
+            iface_name,
+            prop_name,
+            Variant(signature, value)
+        )
+
+    async def get_all_properties(self, object_path, iface_name):
+        return await self.call(
+            object_path,
+            DBUS_PROPERTIES_IFACE,
+            'GetAll',
+            iface_name
+        )
+
+    async def get_managed_objects(self):
+        """
+        Fetches the whole NetworkManager object tree in one call.
+
+        Returns:
+            dict -- object paths mapped to their interfaces' properties
+        """
+        return await self.call(
+            NM_OBJ_MANAGER_PATH,
+            DBUS_OBJ_MANAGER_IFACE,
+            'GetManagedObjects'
+        )
+
+    async def add_match(self, match, handler):
+        """
+        Subscribes to the signals matching `match`.
+        `handler` is called with the signal messages whose path,
+        interface and member match the rule: the connection delivers
+        the signals of every subscription to every message handler.
+
+        Arguments:
+            match {string} -- the d-bus match rule
+            handler {callable} -- the signal handler
+        """
+        bus = await self.connect()
+        rule = parse_match_rule(match)
+
+        def on_message(message):
+            if message.message_type == MessageType.SIGNAL \
+                    and matches_rule(rule, message):
+                handler(message)
+
+        self._signal_handlers[(match, handler)] = on_message
+        bus.add_message_handler(on_message)
+        await self.call(
+            DBUS_OBJ_PATH, DBUS_IFACE, 'AddMatch', match,
+            destination=DBUS_BUS_NAME
+        )
+
+    async def remove_match(self, match, handler):
+        """
+        Undoes add_match.
+
+        Arguments:
+            match {string} -- the d-bus match rule
+            handler {callable} -- the signal handler
+        """
+        on_message = self._signal_handlers.pop((match, handler))
+        self.bus.remove_message_handler(on_message)
+        await self.call(
+            DBUS_OBJ_PATH, DBUS_IFACE, 'RemoveMatch', match,
+            destination=DBUS_BUS_NAME
+        )
@@ -1,35 +1,134 @@
 import click
-import sys
-from termcolor import colored
-from wypy.utils.helpers import nm_is_installed
-from wypy.device.commands import device as device_commands
-from wypy.general.commands import general as general_commands
-from wypy.networking.commands import network as network_commands
-from wypy.wifi.commands import wifi as wifi_commands
-from wypy.connection.commands import connection as conn_commands
-from wypy.utils.constants import VERSION
-
-
-@click.group()
+import importlib
+import time
+from wypy.utils.constants import VERSION, BACKENDS, OUTPUT_FORMATS
+from wypy.utils.profiler import profiler
+
+# Subcommands are only imported when invoked, along with
+# the d-bus / table libraries their module depends on.
+SUBCOMMANDS = {
+    'general': 'wypy.general.commands:general',
+    'network': 'wypy.networking.commands:network',
+    'wifi': 'wypy.wifi.commands:wifi',
+    'connection': 'wypy.connection.commands:connection',
+    'device': 'wypy.device.commands:device',
+    'daemon': 'wypy.daemon.commands:daemon'
+}
+
+
+class LazyGroup(click.Group):
+    """
+    A click group whose subcommands are given as 'module:attribute'
+    strings and imported on first lookup.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        commands = super().list_commands(ctx)
+        return sorted(set(commands) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, attr = self.lazy_commands[cmd_name].split(':')
+            with profiler.measure(f'import {module_name}', 'import'):
+                module = importlib.import_module(module_name)
+            self.add_command(getattr(module, attr), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+
+def enable_profiler(ctx, param, value):
+    """
+    Starts the profiler as soon as --profile or --trace is parsed,
+    so that loading the subcommand is recorded as well.
+    The results are output once the command has run.
+    """
+    if not value:
+        return value
+
+    if not profiler.enabled:
+        profiler.enable()
+        ctx.call_on_close(lambda: output_profile(ctx))
+    if param.name == 'trace':
+        profiler.tracing = True
+    return value
+
+
+def output_profile(ctx):
+    command = ' '.join(filter(None, ['wypy', ctx.invoked_subcommand]))
+    profiler.record(
+        command,
+        time.perf_counter() - profiler.started,
+        start=profiler.started,
+        category='command'
+    )
+    profiler.disable()
+
+    if ctx.params.get('trace'):
+        profiler.write_trace(
+            ctx.params['trace'],
+            {'command': command, 'backend': ctx.params.get('backend')}
+        )
+    if ctx.params.get('profile'):
+        click.echo(profiler.report(), err=True)
+
+
+@click.group(cls=LazyGroup, lazy_commands=SUBCOMMANDS)
 @click.version_option(version=VERSION, message=f'WyPy - Version {VERSION}')
-def cli():
+@click.option(
+    '--backend',
+    type=click.Choice(BACKENDS),
+    envvar='WYPY_BACKEND',
+    default='dbus',
+    show_default=True,
+    help='How to talk to the system bus: dbus-python or the built-in '
+         'wire protocol implementation.'
+)
+@click.option(
+    '--output',
+    type=click.Choice(OUTPUT_FORMATS),
+    envvar='WYPY_OUTPUT',
+    default='table',
+    show_default=True,
+    help='How to output records: as tables, or as JSON, newline '
+         'delimited JSON or CSV, written as they are fetched.'
+)
+@click.option(
+    '--profile',
+    is_flag=True,
+    is_eager=True,
+    callback=enable_profiler,
+    help='Print per-method d-bus call counts, latencies and sizes '
+         'once the command has run.'
+)
+@click.option(
+    '--trace',
+    type=click.Path(dir_okay=False, writable=True),
+    is_eager=True,
+    callback=enable_profiler,
+    help='Write a timeline of the command\'s phases, d-bus calls and '
+         'signal callbacks to FILE, in the Chrome trace event format.'
+)
+@click.pass_context
+def cli(ctx, backend, output, profile, trace):
     """
     wypy is a command line utility for NetworkManager.
     """
-    pass
+    ctx.meta['wypy.backend'] = backend
+    ctx.meta['wypy.output'] = output
 
 
-cli.add_command(general_commands)
-cli.add_command(network_commands)
-cli.add_command(wifi_commands)
-cli.add_command(conn_commands)
-cli.add_command(device_commands)
-
 if __name__ == "__main__":
+    import sys
+    from termcolor import colored
+    from wypy.utils.helpers import nm_is_installed
+
     is_nm_installed = nm_is_installed()
     if is_nm_installed:
-        from dbus.mainloop.glib import DBusGMainLoop
-        DBusGMainLoop(set_as_default=True)
+        # The dbus backend attaches the GLib main loop to its own
+        # connection (see WyPy.bus), the wire backend needs none.
         cli()
     else:
         msg = """
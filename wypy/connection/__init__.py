@@ -1 +1,5 @@
-from .connection import Connection  # noqa F408
\ No newline at end of file
+from wypy.utils.helpers import lazy_exports
+
+__all__ = ['Connection']
+
+__getattr__ = lazy_exports(__name__, {'Connection': '.connection:Connection'})
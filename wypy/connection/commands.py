@@ -1,12 +1,17 @@
 import click
-from .connection import Connection
+from wypy.utils.helpers import LazySubsystem, fields_option
+from wypy.utils.constants import CONNECTION_FIELDS
 
 
 @click.group('connection')
 @click.pass_context
 def connection(ctx):
     """Connection related subcommands"""
-    ctx.obj = Connection()
+    ctx.obj = LazySubsystem(
+        'wypy.connection.connection:Connection',
+        backend=ctx.meta.get('wypy.backend'),
+        output=ctx.meta.get('wypy.output')
+    )
 
 
 @click.command('down')
@@ -18,17 +23,19 @@ def down(conn, name):
 
 
 @click.command('list')
+@fields_option(CONNECTION_FIELDS)
 @click.pass_obj
-def _list(conn):
+def _list(conn, fields):
     """List connections"""
-    conn.show_all()
+    conn.show_all(fields=fields)
 
 
 @click.command('active')
+@fields_option(CONNECTION_FIELDS)
 @click.pass_obj
-def list_active(conn):
+def list_active(conn, fields):
     """List active connections"""
-    conn.show_active()
+    conn.show_active(fields=fields)
 
 
 @click.command('delete')
@@ -1,39 +1,68 @@
-from wypy.utils.helpers import is_valid_uuid
-from prettytable import PrettyTable
-from termcolor import colored
+from wypy.utils.helpers import (
+    echo_lines,
+    echo_table,
+    is_valid_uuid,
+    lazy_property
+)
+from wypy.utils.table import Table
 from wypy.utils.constants import (
     NM_IFACE,
-    NM_BUS_NAME,
     NM_OBJ_PATH,
     NM_SETTINGS_IFACE,
     NM_SETTINGS_OBJ_PATH,
     NM_ACTIVE_CONN_IFACE,
     NM_DEVICE_IFACE,
-    NM_CONNECTION_IFACE
+    NM_CONNECTION_IFACE,
+    CONNECTION_FIELDS,
+    UUID_WIDTH,
+    IFNAME_WIDTH
 )
 from wypy.wypy import WyPy
-import click
-import dbus
 import sys
 
 
 class Connection(WyPy):
 
-    def __init__(self):
-        super().__init__()
-        self.proxy = self.bus.get_object(NM_BUS_NAME, NM_OBJ_PATH)
-        self.nm_iface = dbus.Interface(self.proxy, NM_IFACE)
+    def __init__(self, backend=None, output=None):
+        super().__init__(backend=backend, output=output)
         self.active_conns_prop = 'ActiveConnections'
         self.conn_props = ['Id', 'Uuid', 'Type', 'Devices']
-        self.table = PrettyTable(['NAME', 'UUID', 'TYPE', 'DEVICE'])
-        self.table.sortby = 'TYPE'
-        self.table.align = 'l'
+        self.table_keys = [field.upper() for field in CONNECTION_FIELDS]
+        # --fields names of the columns, mapped to the keys
+        # of the active connections' dictionaries.
+        self.active_columns = {
+            'name': 'Id',
+            'uuid': 'Uuid',
+            'type': 'Type',
+            'device': 'Device'
+        }
         self.active_connections = []
-        self.settings_obj = self.bus.get_object(NM_BUS_NAME, NM_SETTINGS_OBJ_PATH)  # noqa E501
-        self.settings_iface = dbus.Interface(self.settings_obj, NM_SETTINGS_IFACE)  # noqa E501
+
+    @lazy_property
+    def proxy(self):
+        return self.get_proxy(NM_OBJ_PATH)
+
+    @lazy_property
+    def nm_iface(self):
+        return self.get_interface(NM_OBJ_PATH, NM_IFACE)
+
+    @lazy_property
+    def settings_obj(self):
+        return self.get_proxy(NM_SETTINGS_OBJ_PATH)
+
+    @lazy_property
+    def settings_iface(self):
+        return self.get_interface(NM_SETTINGS_OBJ_PATH, NM_SETTINGS_IFACE)
+
+    @lazy_property
+    def table(self):
+        return Table(
+            self.table_keys,
+            sortby='TYPE' if 'TYPE' in self.table_keys else None
+        )
 
     def activate(self):
-        click.echo('Activating connection ...')
+        self.echo('Activating connection ...')
         """
             TODO:
                 - list all connections
@@ -51,8 +80,8 @@ class Connection(WyPy):
         Arguments:
             conn {string} -- uuid / name of the connection to delete
         """
-        click.echo('Deactivating connection ...')
-        self._get_active_connections()
+        self.echo('Deactivating connection ...')
+        self._get_active_connections(devices=False)
         filter_key = 'Uuid' if is_valid_uuid(conn) else 'Id'
         conn_ids = [str(c[filter_key]) for c in self.active_connections]
 
@@ -73,7 +102,7 @@ class Connection(WyPy):
         Arguments:
             conn {[string]} -- [uuid / name of the connection to delete]
         """
-        click.echo(f'Deleting connection profile {conn}')
+        self.echo(f'Deleting connection profile {conn}')
         if is_valid_uuid(conn):
             uuid = conn
         else:
@@ -86,32 +115,76 @@ class Connection(WyPy):
 
         self._delete_connection(uuid)
 
-    def show_all(self):
+    def show_all(self, fields=None):
         """
         Echos the list of all available connections to the user.
+        Active connections are shown in green, their devices are
+        not looked up.
+        Without the 'type' column, which the table is sorted on,
+        rows are output as the connections are fetched.
+
+        Keyword Arguments:
+            fields {list} -- the columns to show, among
+            CONNECTION_FIELDS (default: {None}, all of them)
         """
-        click.echo('Showing all connections ...')
-        self._get_active_connections()
-        connections = self._list_connections_info()
-        rows = list(map(self._create_row, connections))
-
-        for row in rows:
-            self.table.add_row(row)
-
-        click.echo(self.table)
-
-    def show_active(self):
+        self.echo('Showing all connections ...')
+        fields = fields or CONNECTION_FIELDS
+        self._get_active_connections(devices=False)
+
+        if self.machine_output:
+            with self.record_writer(fields + ['active']) as writer:
+                for conn in self._iter_connections_info():
+                    record = self._get_connection_record(conn)
+                    active = self._is_connection_active(record['uuid'])
+                    writer.write(dict(record, active=active))
+            return
+
+        self.table_keys = [field.upper() for field in fields]
+        if self.table.sortby is None:
+            rows = (
+                (self._create_row(conn, fields), self._get_row_color(conn))
+                for conn in self._iter_connections_info()
+            )
+            width_hints = {'UUID': UUID_WIDTH, 'DEVICE': IFNAME_WIDTH}
+            echo_lines(self.table.stream(rows, width_hints=width_hints))
+            return
+
+        for conn in self._list_connections_info():
+            self.table.add_row(
+                self._create_row(conn, fields),
+                color=self._get_row_color(conn)
+            )
+
+        echo_table(self.table)
+
+    def show_active(self, fields=None):
         """
         Echos the list of active connections to the user.
+        The connections' devices are only looked up for the
+        'type' and 'device' columns.
+
+        Keyword Arguments:
+            fields {list} -- the columns to show, among
+            CONNECTION_FIELDS (default: {None}, all of them)
         """
-        click.echo('Showing active connections ...')
-        self._get_active_connections()
-        conn_values = [conn.values() for conn in self.active_connections]
+        self.echo('Showing active connections ...')
+        fields = fields or CONNECTION_FIELDS
+        self._get_active_connections(
+            devices='type' in fields or 'device' in fields
+        )
+        conn_values = [
+            [conn[self.active_columns[field]] for field in fields]
+            for conn in self.active_connections
+        ]
 
-        for i, vals in enumerate(conn_values):
-            conn_values[i] = list(map(lambda val: colored(val, "green"), vals))
+        if self.machine_output:
+            with self.record_writer(fields) as writer:
+                for values in conn_values:
+                    writer.write(dict(zip(fields, values)))
+            return
 
-        self._print_conns(conn_values)
+        self.table_keys = [field.upper() for field in fields]
+        self._print_conns(conn_values, color='green')
 
     #   ---------------
     #
@@ -129,8 +202,7 @@ class Connection(WyPy):
             uuid {string} -- the uuid of the connection to delete
         """
         _conn = self.settings_iface.GetConnectionByUuid(uuid)
-        conn_obj = self.bus.get_object(NM_BUS_NAME, _conn)
-        conn_iface = dbus.Interface(conn_obj, NM_CONNECTION_IFACE)
+        conn_iface = self.get_interface(_conn, NM_CONNECTION_IFACE)
         conn_iface.Delete()
 
     def _deactivate_connection(self, conn_path):
@@ -143,44 +215,81 @@ class Connection(WyPy):
         """
         self.nm_iface.DeactivateConnection(conn_path)
 
-    def _create_row(self, conn):
+    def _get_connection_record(self, conn):
+        """
+        Picks the listed information out of a connection's settings.
+
+        Arguments:
+            conn {dict} -- the connection's 'connection' settings
 
-        conn_info = {
-            'id': str(conn.get('id', '')),
+        Returns:
+            dict -- the connection's CONNECTION_FIELDS
+        """
+        return {
+            'name': str(conn.get('id', '')),
             'uuid': str(conn.get('uuid', '')),
-            'type': conn.get('type', ''),
-            'name': str(conn.get('interface-name', '--')),
+            'type': str(conn.get('type', '')),
+            'device': str(conn.get('interface-name', '--')),
         }
-        values = conn_info.values()
 
-        if self._is_connection_active(conn_info['uuid']):
-            values = list(map(lambda val: colored(val, "green"), values))
+    def _create_row(self, conn, fields=CONNECTION_FIELDS):
 
-        return values
+        conn_info = self._get_connection_record(conn)
+        return [conn_info[field] for field in fields]
 
-    def _get_active_connections(self):
+    def _get_row_color(self, conn):
+        """
+        Returns the color of a connection's row,
+        green if it is active.
+
+        Arguments:
+            conn {dict} -- the connection's 'connection' settings
+        """
+        if self._is_connection_active(str(conn.get('uuid', ''))):
+            return 'green'
+        return None
+
+    def _get_active_connections(self, devices=True):
         """
         Retrieves the list of active connection on the system.
         For each active connection found, a dict containing only
         the necessary information is created and appended to
         self.active_connections.
+        Connection and device properties are read from the
+        NetworkManager snapshot, anything missing from it is
+        fetched with a single call_many fan-out.
+
+        Keyword Arguments:
+            devices {bool} -- look up each connection's device, for its
+            name and type (default: {True})
         """
+        self.load_snapshot()
         active_conns_paths = self.get_object_property(
             proxy=self.proxy,
             prop_name=self.active_conns_prop
         )
+        self.prefetch_all_properties(active_conns_paths, NM_ACTIVE_CONN_IFACE)
+        if devices:
+            device_paths = [
+                self._properties_cache.get(
+                    (str(conn), NM_ACTIVE_CONN_IFACE), {}
+                ).get('Devices', ['/'])[0]
+                for conn in active_conns_paths
+            ]
+            self.prefetch_all_properties(device_paths, NM_DEVICE_IFACE)
 
         for conn in active_conns_paths:
             all_props = self.get_all_properties(conn, NM_ACTIVE_CONN_IFACE)
             conn_props = {
                 prop: str(all_props[prop])
                 for prop in self.conn_props
-                if not isinstance(all_props[prop], dbus.Array)
+                if not isinstance(all_props[prop], list)
             }
 
-            device_name, device_type = self._get_device_info(all_props)
-            conn_props['Device'] = device_name
-            conn_props['Type'] = self.translate_device_type(device_type)
+            if devices:
+                device_name, device_type = self._get_device_info(all_props)
+                conn_props['Device'] = device_name
+                conn_props['Type'] = self.translate_device_type(device_type)
             conn_props['Path'] = conn
 
             self.active_connections.append(conn_props)
@@ -200,17 +309,20 @@ class Connection(WyPy):
         device_props = self.get_all_properties(device_obj, NM_DEVICE_IFACE)
         return (device_props['Interface'], int(device_props['DeviceType']))
 
-    def _print_conns(self, data):
+    def _print_conns(self, data, color=None):
         """
         Populates self.table with the connection information.
         Displays the table to the user.
 
         Arguments:
             data {[list]} -- [the list of available connections]
+
+        Keyword Arguments:
+            color {string} -- the rows' color (default: {None})
         """
         for row in data:
-            self.table.add_row(row)
-        click.echo(self.table)
+            self.table.add_row(row, color=color)
+        echo_table(self.table)
 
     def _is_connection_active(self, uuid):
         """
@@ -224,22 +336,12 @@ class Connection(WyPy):
         active_conn_uuids = [conn['Uuid'] for conn in self.active_connections]
         return uuid in active_conn_uuids
 
-    def _color_data(self, conn):
-        """
-        Colors the values of the given connection dictionary.
-
-        Arguments:
-            conn {[dict]} -- [the connection whose values are to be colored]
-        """
-        for key, val in conn.items():
-            conn[key] = colored(val, "green")
-
     def _list_connections_info(self):
         """
         Calls ListConnections available on the settings
         d-bus interface provided by NetworkManager.
-        For each connection path, an connection interface is
-        created and the GetSettings method is called.
+        GetSettings is then called on every connection path
+        at once through call_many.
         The 'connection' property is then accessed and assigned to
         a dictionary, which is itself appended to the result list.
 
@@ -248,12 +350,28 @@ class Connection(WyPy):
             about the available connections.]
         """
         connections = self.settings_iface.ListConnections()
-        result = []
+        calls = [
+            (conn, NM_CONNECTION_IFACE, 'GetSettings', ())
+            for conn in connections
+        ]
+        all_settings = self.call_many(calls)
 
-        for conn in connections:
-            conn_obj = self.bus.get_object(NM_BUS_NAME, conn)
-            conn_iface = dbus.Interface(conn_obj,  NM_CONNECTION_IFACE)
-            conn_info = conn_iface.GetSettings()['connection']
-            result.append(conn_info)
+        return [settings['connection'] for settings in all_settings]
 
-        return result
+    def _iter_connections_info(self):
+        """
+        Same as _list_connections_info, GetSettings being called
+        `max_in_flight` connections at a time so that the first
+        connections are yielded before the last ones are fetched.
+
+        Yields:
+            dict -- each connection's 'connection' settings
+        """
+        connections = self.settings_iface.ListConnections()
+        for start in range(0, len(connections), self.max_in_flight):
+            calls = [
+                (conn, NM_CONNECTION_IFACE, 'GetSettings', ())
+                for conn in connections[start:start + self.max_in_flight]
+            ]
+            for settings in self.call_many(calls):
+                yield settings['connection']
@@ -0,0 +1,5 @@
+from wypy.utils.helpers import lazy_exports
+
+__all__ = ['Daemon']
+
+__getattr__ = lazy_exports(__name__, {'Daemon': '.daemon:Daemon'})
@@ -0,0 +1,23 @@
+import click
+from wypy.utils.helpers import LazySubsystem
+
+
+@click.command('daemon')
+@click.option(
+    '--socket',
+    'socket_path',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help='Unix socket to serve on (default: $XDG_RUNTIME_DIR/wypy.sock).'
+)
+@click.pass_context
+def daemon(ctx, socket_path):
+    """
+    Keep NetworkManager's state in memory and answer
+    the other wypy commands from it
+    """
+    LazySubsystem(
+        'wypy.daemon.daemon:Daemon',
+        socket_path=socket_path,
+        backend=ctx.meta.get('wypy.backend')
+    ).serve()
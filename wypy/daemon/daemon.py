@@ -0,0 +1,190 @@
+import json
+import os
+import socketserver
+import sys
+import threading
+import click
+from termcolor import colored
+from wypy.wypy import WyPy
+from wypy.utils.daemon import encode, get_socket_path, request
+from wypy.utils.profiler import profiler
+from wypy.utils.constants import (
+    DBUS_PROPERTIES_IFACE,
+    DBUS_OBJ_MANAGER_IFACE
+)
+
+
+class Daemon(WyPy):
+    """
+    Keeps one system bus connection and an in-memory copy of the
+    NetworkManager object tree, updated from its signals, and serves
+    it to other wypy commands over a unix socket.
+    """
+
+    def __init__(self, socket_path=None, backend=None):
+        super().__init__(backend=backend)
+        self.socket_path = socket_path or get_socket_path()
+        # The daemon reads NetworkManager's state from d-bus only.
+        self.daemon_socket = None
+        self.lock = threading.Lock()
+        self.generation = 0
+        self._encoded_snapshot = None
+        self.server = None
+
+    def serve(self):
+        """
+        Loads the object tree, subscribes to its changes and serves it
+        until interrupted.
+        """
+        if not self.socket_path:
+            msg = '[Error]: No socket path given, set XDG_RUNTIME_DIR or use --socket.'  # noqa E501
+            sys.exit(colored(msg, 'red'))
+
+        if request('ping', self.socket_path) is not None:
+            msg = f'[Error]: wypy daemon is already running on {self.socket_path}'  # noqa E501
+            sys.exit(colored(msg, 'red'))
+
+        self.load_snapshot()
+        self._subscribe()
+        self._start_server()
+        click.echo(f'Serving NetworkManager state on {self.socket_path}')
+
+        try:
+            self.create_main_loop().run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop_server()
+
+    def handle_request(self, message):
+        """
+        Answers one client request.
+
+        Arguments:
+            message {dict} -- the decoded request, {'method': ...}
+
+        Returns:
+            bytes -- the encoded response
+        """
+        method = message.get('method') if isinstance(message, dict) else None
+
+        if method == 'ping':
+            return encode({'ok': True, 'pid': os.getpid()})
+
+        if method == 'snapshot':
+            with self.lock:
+                if self._encoded_snapshot is None:
+                    self._encoded_snapshot = encode({
+                        'ok': True,
+                        'generation': self.generation,
+                        'snapshot': self.snapshot
+                    })
+                return self._encoded_snapshot
+
+        return encode({'ok': False, 'error': f'Unknown method {method}'})
+
+    #   ---------------
+    #
+    #   Private Methods
+    #
+    #   ---------------
+
+    def _subscribe(self):
+        """
+        Subscribes to the signals NetworkManager emits when its
+        objects are added, removed or their properties change.
+        """
+        self.bus.add_signal_receiver(
+            self._handle_properties_changed,
+            'PropertiesChanged',
+            DBUS_PROPERTIES_IFACE,
+            self.bus_name,
+            path_keyword='path'
+        )
+        self.bus.add_signal_receiver(
+            self._handle_interfaces_added,
+            'InterfacesAdded',
+            DBUS_OBJ_MANAGER_IFACE,
+            self.bus_name
+        )
+        self.bus.add_signal_receiver(
+            self._handle_interfaces_removed,
+            'InterfacesRemoved',
+            DBUS_OBJ_MANAGER_IFACE,
+            self.bus_name
+        )
+
+    @profiler.profile('Daemon._handle_properties_changed', 'signal')
+    def _handle_properties_changed(self, iface_name, changed, invalidated,
+                                   path=None):
+        with self.lock:
+            ifaces = self.snapshot.get(str(path))
+            if ifaces is None:
+                # Not an object exported by the object manager.
+                return
+            props = ifaces.setdefault(str(iface_name), {})
+            props.update(changed)
+            for prop in invalidated:
+                props.pop(prop, None)
+            self._changed()
+
+    @profiler.profile('Daemon._handle_interfaces_added', 'signal')
+    def _handle_interfaces_added(self, object_path, ifaces):
+        with self.lock:
+            self.snapshot.setdefault(str(object_path), {}).update(ifaces)
+            self._changed()
+
+    @profiler.profile('Daemon._handle_interfaces_removed', 'signal')
+    def _handle_interfaces_removed(self, object_path, iface_names):
+        with self.lock:
+            ifaces = self.snapshot.get(str(object_path), {})
+            for iface_name in iface_names:
+                ifaces.pop(iface_name, None)
+            if not ifaces:
+                self.snapshot.pop(str(object_path), None)
+            self._changed()
+
+    def _changed(self):
+        self.generation += 1
+        self._encoded_snapshot = None
+
+    def _start_server(self):
+        """
+        Starts answering requests on the unix socket, in a thread,
+        replacing any stale socket file.
+        """
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        old_umask = os.umask(0o177)
+        try:
+            self.server = _Server(self.socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+        self.server.wypy_daemon = self
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def _stop_server(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            message = json.loads(self.rfile.readline())
+        except ValueError:
+            message = None
+        self.wfile.write(self.server.wypy_daemon.handle_request(message))
@@ -1 +1,5 @@
-from .device import Device  # noqa F401
\ No newline at end of file
+from wypy.utils.helpers import lazy_exports
+
+__all__ = ['Device']
+
+__getattr__ = lazy_exports(__name__, {'Device': '.device:Device'})
@@ -1,34 +1,82 @@
 import click
-from .device import Device
+from wypy.utils.helpers import LazySubsystem, fields_option
+from wypy.utils.constants import (
+    DEVICE_STATUS_FIELDS,
+    DEVICE_DETAILS_FIELDS,
+    DEVICE_IP4_FIELDS
+)
 
 
 @click.group('device')
 @click.pass_context
 def device(ctx):
     """Perform actions on the available device(s)"""
-    ctx.obj = Device()
+    ctx.obj = LazySubsystem(
+        'wypy.device.device:Device',
+        backend=ctx.meta.get('wypy.backend'),
+        output=ctx.meta.get('wypy.output')
+    )
+
+
+def device_filters(command):
+    """
+    Adds the options filtering the devices a command shows.
+    """
+    options = [
+        click.option(
+            '--type',
+            'types',
+            multiple=True,
+            help='Only show devices of this type, e.g. ethernet, wifi.'
+        ),
+        click.option(
+            '--state',
+            'states',
+            multiple=True,
+            help='Only show devices in this state, e.g. connected.'
+        ),
+        click.option(
+            '--name',
+            'names',
+            multiple=True,
+            help='Only show devices whose name matches this pattern, e.g. "wl*".'  # noqa E501
+        ),
+        click.option(
+            '--managed/--unmanaged',
+            default=None,
+            help='Only show devices (not) managed by NetworkManager.'
+        )
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
 
 
 @click.command('status')
+@device_filters
+@fields_option(DEVICE_STATUS_FIELDS)
 @click.pass_obj
-def status(dev):
+def status(dev, **filters):
     """Print general device status information"""
-    dev.print_status()
+    dev.print_status(**filters)
 
 
 @click.command('list')
+@device_filters
+@fields_option(DEVICE_DETAILS_FIELDS)
 @click.pass_obj
-def list_all(dev):
+def list_all(dev, **filters):
     """List detailed device information"""
-    dev.list_all()
+    dev.list_all(**filters)
 
 
 @click.command('get')
 @click.argument('name', type=str, required=True)
+@fields_option(DEVICE_DETAILS_FIELDS + DEVICE_IP4_FIELDS)
 @click.pass_obj
-def get(dev, name):
+def get(dev, name, fields):
     """List detailed device information for a given device"""
-    dev.print_details(name)
+    dev.print_details(name, fields=fields)
 
 
 @click.command('update')
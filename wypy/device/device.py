@@ -1,81 +1,190 @@
-from wypy.utils.helpers import format_list, format_table_key
-from prettytable import PrettyTable
+from wypy.utils.helpers import (
+    echo_table,
+    format_list,
+    format_table_key,
+    lazy_property
+)
+from wypy.utils.table import Table
 from termcolor import colored
 from wypy.wypy import WyPy
 from wypy.utils.constants import (
-    NM_BUS_NAME,
     NM_OBJ_PATH,
     NM_IFACE,
     NM_DEVICE_IFACE,
     NM_ACTIVE_CONN_IFACE,
-    IP4_CONFIG_IFACE
+    IP4_CONFIG_IFACE,
+    DEVICE_STATUS_FIELDS,
+    DEVICE_DETAILS_FIELDS,
+    DEVICE_IP4_FIELDS
 )
 import sys
 import click
-import dbus
-from dbus.exceptions import DBusException
+from fnmatch import fnmatchcase
 
 
 class Device(WyPy):
 
-    def __init__(self):
-        super().__init__()
-        self.nm = self.bus.get_object(NM_BUS_NAME, NM_OBJ_PATH)
+    def __init__(self, backend=None, output=None):
+        super().__init__(backend=backend, output=output)
         self.status_table_keys = ['DEVICE', 'TYPE', 'STATE', 'CONNECTION']
-        self.status_table = PrettyTable(self.status_table_keys)
-        self.status_table.align = 'l'
-        self.all_devices = self.get_object_property(
+        # --fields names of the status columns, mapped to
+        # the keys of _get_device_status' result.
+        self.status_columns = {
+            'device': 'name',
+            'type': 'type',
+            'state': 'device_status',
+            'connection': 'connection'
+        }
+
+    @lazy_property
+    def nm(self):
+        return self.get_proxy(NM_OBJ_PATH)
+
+    @lazy_property
+    def all_devices(self):
+        return self.get_object_property(
             proxy=self.nm,
             bus_name=NM_IFACE,
             prop_name='AllDevices'
         )
-        self.known_device_names = []
-        self.details_table = PrettyTable(['PROPERTY', 'VALUE'])
-        self.details_table.align = 'l'
 
-    def print_status(self):
+    @lazy_property
+    def device_index(self):
         """
-        Displays general device status information to the user.
+        Device interface names mapped to their object paths,
+        built from the NetworkManager snapshot.
         """
-        click.echo('Showing status ...')
-        device_status = list(map(self._get_device_status, self.all_devices))  # noqa E501
+        return {
+            str(self.snapshot[path][NM_DEVICE_IFACE].get('Interface')): path
+            for path in self.get_snapshot_paths(NM_DEVICE_IFACE)
+        }
+
+    @lazy_property
+    def status_table(self):
+        return Table(self.status_table_keys)
+
+    @lazy_property
+    def details_table(self):
+        return Table(['PROPERTY', 'VALUE'])
+
+    def print_status(self, types=(), states=(), names=(), managed=None,
+                     fields=None):
+        """
+        Displays general device status information to the user.
+        Only the devices matching the given filters are shown, and
+        only those are looked at beyond their own properties.
+        Active connections are only looked up for the 'connection'
+        column.
+
+        Keyword Arguments:
+            types {tuple} -- device types to show, e.g. 'ethernet'
+            states {tuple} -- device states to show, e.g. 'connected'
+            names {tuple} -- interface name patterns, e.g. 'wl*'
+            managed {bool} -- only show (un)managed devices
+            (default: {None}, any)
+            fields {list} -- the columns to show, among
+            DEVICE_STATUS_FIELDS (default: {None}, all of them)
+        """
+        self.echo('Showing status ...')
+        with_connection = fields is None or 'connection' in fields
+        self.load_snapshot()
+        devices = self._filter_devices(
+            self.all_devices, types, states, names, managed
+        )
+        self._prefetch_devices(devices, connections=with_connection)
+
+        if self.machine_output:
+            fields = fields or DEVICE_STATUS_FIELDS
+            with self.record_writer(fields) as writer:
+                for device in devices:
+                    status = self._get_device_status(
+                        device,
+                        connection=with_connection
+                    )
+                    writer.write({
+                        field: status[self.status_columns[field]]
+                        for field in fields
+                    })
+            return
+
+        device_status = [
+            self._get_device_status(device, connection=with_connection)
+            for device in devices
+        ]
         sorted_status = sorted(device_status, key=lambda k: (k['connection'], k['type']), reverse=True)  # noqa E501
-        rows = list(map(self._create_row, sorted_status))
 
-        for row in rows:
-            self.status_table.add_row(row)
+        if fields is not None:
+            self.status_table_keys = [field.upper() for field in fields]
+
+        for status in sorted_status:
+            self.status_table.add_row(
+                self._create_row(status, fields),
+                color=self.get_device_state_row_color(int(status['state']))
+            )
 
-        click.echo(self.status_table)
+        echo_table(self.status_table)
 
-    def list_all(self):
+    def list_all(self, types=(), states=(), names=(), managed=None,
+                 fields=None):
         """
-        Prints a table with detailed information for each known device.
+        Prints a table with detailed information for each known device
+        matching the given filters, see print_status.
+        `fields` are the rows of each table, among DEVICE_DETAILS_FIELDS.
         """
-        click.echo('Listing all devices ...')
-        for device in self.all_devices:
-            details = self._get_device_details(device)
+        self.echo('Listing all devices ...')
+        with_connection = fields is None or 'connection' in fields
+        self.load_snapshot()
+        devices = self._filter_devices(
+            self.all_devices, types, states, names, managed
+        )
+        self._prefetch_devices(devices, connections=with_connection)
+
+        if self.machine_output:
+            with self.record_writer(fields or DEVICE_DETAILS_FIELDS) as writer:  # noqa E501
+                for device in devices:
+                    writer.write(
+                        self._get_device_details(device, fields=fields)
+                    )
+            return
+
+        for device in devices:
+            details = self._get_device_details(device, fields=fields)
             self._fill_details_table(details)
 
-            click.echo(self.details_table)
+            echo_table(self.details_table)
             self.details_table.clear_rows()
 
-    def print_details(self, ifname):
+    def print_details(self, ifname, fields=None):
         """
         Prints a table with details information for the given device.
 
         Arguments:
             ifname {[string]} -- [the device to display the details for]
+
+        Keyword Arguments:
+            fields {list} -- the rows to show, among DEVICE_DETAILS_FIELDS
+            and DEVICE_IP4_FIELDS (default: {None}, all of them)
         """
         try:
             device_path = self._get_known_device_object_path(ifname)
         except ValueError as exc:
             sys.exit(colored(str(exc), "red"))
         else:
-            device_details = self._get_device_details(device_path, show_all=True)  # noqa E501
+            device_details = self._get_device_details(
+                device_path,
+                show_all=True,
+                fields=fields
+            )
+
+        if self.machine_output:
+            fields = fields or DEVICE_DETAILS_FIELDS + DEVICE_IP4_FIELDS
+            with self.record_writer(fields) as writer:
+                writer.write(device_details)
+            return
 
         self._fill_details_table(device_details)
 
-        click.echo(self.details_table)
+        echo_table(self.details_table)
 
     def update_ifname_connection(self, ifname):
         """
@@ -136,7 +245,7 @@ class Device(WyPy):
         except ValueError as exc:
             sys.exit(colored(exc.args, "red"))
         else:
-            proxy = self.bus.get_object(NM_BUS_NAME, device_path)
+            proxy = self.get_proxy(device_path)
             self.set_object_property(
                 proxy,
                 bus_name=NM_DEVICE_IFACE,
@@ -160,7 +269,7 @@ class Device(WyPy):
         except ValueError as exc:
             sys.exit(colored(exc.args, "red"))
         else:
-            proxy = self.bus.get_object(NM_BUS_NAME, device_path)
+            proxy = self.get_proxy(device_path)
             self.set_object_property(
                 proxy,
                 bus_name=NM_DEVICE_IFACE,
@@ -175,30 +284,112 @@ class Device(WyPy):
     def _get_known_device_object_path(self, ifname):
         """
         Returns the device's d-bus object path.
+        When NetworkManager's snapshot is already at hand (e.g. from
+        `wypy daemon`), the name is looked up in the device index.
+        Otherwise NetworkManager resolves it with GetDeviceByIpIface,
+        and the device index only serves devices without an IP
+        interface name. Either way, finding the device takes at most
+        two calls, whatever the number of devices.
         If the given device name is not known to the system,
-        the program will exit with an error message.
+        a ValueError is raised.
 
         Arguments:
-            device_obj_path {string} -- the device's own dbus object path
+            ifname {string} -- the device's interface name
 
         Returns:
-            dbus.Interface -- dbus interface for the given device
+            string -- the device's own d-bus object path
         """
-        known_devices = list(map(self._get_device_status, self.all_devices))  # noqa E501
-        self.known_device_names = list(map(lambda x: str(x['name']), known_devices))  # noqa E501
+        self._seed_from_daemon()
+
+        if self.snapshot is None:
+            nm = self.get_interface(NM_OBJ_PATH, NM_IFACE)
+            try:
+                return str(nm.GetDeviceByIpIface(ifname))
+            except self.dbus_exception:
+                pass
 
-        if ifname not in self.known_device_names:
+        device_path = self.device_index.get(ifname)
+        if device_path is None:
             err_msg = f"""
             [Error]: Could not perform the desired operation on "{ifname}".
             The requested device does not appear to exist.
             """.replace("  ", "")
             raise ValueError(err_msg)
 
-        device_info = next(filter(lambda x: str(x['name']) == ifname, known_devices), None)  # noqa E501
-        device_path = device_info['device_path']
-
         return device_path
 
+    def _filter_devices(self, device_paths, types=(), states=(), names=(),
+                        managed=None):
+        """
+        Returns the devices whose own properties match the filters.
+        Only the devices' properties are fetched to decide, so
+        filtered out devices never cost another d-bus call.
+        An empty filter matches every device.
+
+        Arguments:
+            device_paths {list} -- the devices' own d-bus object paths
+
+        Keyword Arguments:
+            types {tuple} -- device types, e.g. 'ethernet', 'wifi'
+            states {tuple} -- device states, e.g. 'connected'
+            names {tuple} -- interface name glob patterns, e.g. 'wl*'
+            managed {bool} -- the required Managed value
+            (default: {None}, any)
+
+        Returns:
+            list -- the matching devices' paths
+        """
+        if not (types or states or names or managed is not None):
+            return list(device_paths)
+
+        types = {_type.lower() for _type in types}
+        states = {state.lower() for state in states}
+        self.prefetch_all_properties(device_paths, NM_DEVICE_IFACE)
+        result = []
+
+        for path in device_paths:
+            props = self.get_all_properties(path, NM_DEVICE_IFACE)
+            dev_type = self.translate_device_type(props.get('DeviceType'))
+            dev_state = self.translate_device_state(props.get('State'))
+            name = str(props.get('Interface', ''))
+
+            if types and str(dev_type).lower() not in types:
+                continue
+            if states and str(dev_state).lower() not in states:
+                continue
+            if names and not any(fnmatchcase(name, p) for p in names):
+                continue
+            if managed is not None and bool(props.get('Managed')) != managed:  # noqa E501
+                continue
+            result.append(path)
+
+        return result
+
+    def _prefetch_devices(self, device_paths, connections=True):
+        """
+        Fetches the properties of the given devices, then those of
+        their active connections, with one call_many fan-out each,
+        ahead of the per-device loops.
+        Objects already in the snapshot are not fetched again.
+
+        Arguments:
+            device_paths {list} -- the devices' own d-bus object paths
+
+        Keyword Arguments:
+            connections {bool} -- also fetch the active connections
+            (default: {True})
+        """
+        self.prefetch_all_properties(device_paths, NM_DEVICE_IFACE)
+        if not connections:
+            return
+        conn_paths = [
+            self._properties_cache.get(
+                (str(path), NM_DEVICE_IFACE), {}
+            ).get('ActiveConnection', '/')
+            for path in device_paths
+        ]
+        self.prefetch_all_properties(conn_paths, NM_ACTIVE_CONN_IFACE)
+
     def _get_device_dbus_interface(self, device_obj_path):
         """
         Creates and returns a dbus interface for the device.
@@ -209,9 +400,7 @@ class Device(WyPy):
         Returns:
             dbus.Interface -- dbus interface for the given device
         """
-        device_obj = self.bus.get_object(NM_BUS_NAME, device_obj_path)
-        device_iface = dbus.Interface(device_obj, NM_DEVICE_IFACE)
-        return device_iface
+        return self.get_interface(device_obj_path, NM_DEVICE_IFACE)
 
     def _update_connection(self, device_path, ifname):
         """
@@ -225,7 +414,7 @@ class Device(WyPy):
         device = self._get_device_dbus_interface(device_path)
         try:
             device.Reapply({}, 0, 0)
-        except DBusException:
+        except self.dbus_exception:
             err_msg = f"""
             [Error]: Could not update active connection info for "{ifname}".
             The device is not activated.
@@ -234,7 +423,7 @@ class Device(WyPy):
             sys.exit(colored(err_msg, "red"))
         else:
             msg = f'Successfully updated connection information for "{ifname}"'
-            click.echo(msg)
+            self.echo(msg)
 
     def _disconnect_device(self, device_path, ifname):
         """
@@ -249,7 +438,7 @@ class Device(WyPy):
         device = self._get_device_dbus_interface(device_path)
         try:
             device.Disconnect()
-        except DBusException:
+        except self.dbus_exception:
             err_msg = f"""
             [Error]: Could not disconnect {ifname}.
             The device is either not active or is already disconnected.
@@ -257,7 +446,7 @@ class Device(WyPy):
             """.replace("  ", "")
             sys.exit(colored(err_msg, "red"))
         else:
-            click.echo(f'Device "{ifname}" was successfully disconnected')
+            self.echo(f'Device "{ifname}" was successfully disconnected')
 
     def _delete_iface(self, device_path, ifname):
         """
@@ -272,14 +461,14 @@ class Device(WyPy):
         device = self._get_device_dbus_interface(device_path)
         try:
             device.Delete()
-        except DBusException as exc:
+        except self.dbus_exception as exc:
             err_msg = exc.get_dbus_message()
             err_msg = f'[Error]: Device - "{ifname}"\n{err_msg}'
             sys.exit(colored(err_msg, "red"))
         else:
-            click.echo(f"Successfully deleted {ifname}")
+            self.echo(f"Successfully deleted {ifname}")
 
-    def _get_device_status(self, obj_path):
+    def _get_device_status(self, obj_path, connection=True):
         """
         Retrieve general status related information
         about a device.
@@ -287,6 +476,10 @@ class Device(WyPy):
         Arguments:
             obj_path {string} -- the device's own d-bus object path
 
+        Keyword Arguments:
+            connection {bool} -- look up the active connection's name,
+            '--' is used otherwise (default: {True})
+
         Returns:
             dict -- the device's status information
         """
@@ -302,33 +495,33 @@ class Device(WyPy):
             'name': dev_name,
             'type':  self.translate_device_type(dev_type),
             'device_status': self.translate_device_state(dev_state),
-            'connection': self._get_connection_name(dev_conn),
+            'connection': self._get_connection_name(dev_conn) if connection else '--',  # noqa E501
             'state':  dev_state,
             'connection_path': dev_conn,
             'device_path': obj_path
         }
 
-    def _create_row(self, device_details):
+    def _create_row(self, device_status, fields=None):
         """
-        Maps over the values of `device_details` and
-        applies the correct color to each value.
+        Picks the status columns' values out of `device_status`.
+        The row is colored as a whole by the table, according
+        to the device's state.
 
         Arguments:
-            device_details {dict} -- the device's
-            *detailed* information (ipv4, dns ...)
+            device_status {dict} -- the device's status information,
+            see _get_device_status
+
+        Keyword Arguments:
+            fields {list} -- the status columns to keep, in order
+            (default: {None}, all of them)
 
         Returns:
-            list -- colored values
+            list -- the row's values
         """
-        state = int(device_details['state'])
-        values = device_details.values()
-        row_color = self.get_device_state_row_color(state)
-
-        del device_details['device_path']
-        del device_details['connection_path']
-        del device_details['state']
-
-        return list(map(lambda val: colored(val, row_color), values))
+        return [
+            device_status[self.status_columns[field]]
+            for field in fields or DEVICE_STATUS_FIELDS
+        ]
 
     def _get_connection_name(self, connection_path):
         """
@@ -346,7 +539,7 @@ class Device(WyPy):
                 connection_path,
                 NM_ACTIVE_CONN_IFACE
             )
-        except DBusException:
+        except self.dbus_exception:
             return '--'
         except Exception as e:
             click.echo('An error occured', str(e))
@@ -357,13 +550,16 @@ class Device(WyPy):
         # move that method to WyPy
         map(lambda val: str(val), _dict.values())
 
-    def _get_device_details(self, device_obj, show_all=False):
+    def _get_device_details(self, device_obj, show_all=False, fields=None):
         """
         Retrives detailed information about the given device.
         By default, the program only returns the status information
         along with an additional 'Mtu' property.
         If the show_all flag is enabled, WyPy will gather even more
         details.
+        With `fields`, only those details are returned, and the active
+        connection and Ip4Config objects are only looked up when one
+        of their details is requested.
 
         Arguments:
             device_obj {string} -- the device's own d-bus object path
@@ -371,20 +567,27 @@ class Device(WyPy):
         Keyword Arguments:
             show_all {bool} -- whether to
             show all details or not (default: {False})
+            fields {list} -- the details to return, in order
+            (default: {None}, all of them)
 
         Returns:
             dict -- the device's details
         """
+        if fields is None:
+            fields = DEVICE_DETAILS_FIELDS + DEVICE_IP4_FIELDS
         dev_props = self.get_all_properties(device_obj, NM_DEVICE_IFACE)
         self._stringify_dbus_values(dev_props)
-        dev_status = self._get_device_status(device_obj)
+        dev_status = self._get_device_status(
+            device_obj,
+            connection='connection' in fields
+        )
 
         general_dev_info = {
             'mtu': dev_props.get('Mtu', 'Unknown'),
         }
         result = dict(dev_status, **general_dev_info)
 
-        if show_all:
+        if show_all and any(field in fields for field in DEVICE_IP4_FIELDS):
             ip4_path = dev_props['Ip4Config']
             ip4props = self.get_all_properties(ip4_path, IP4_CONFIG_IFACE)
 
@@ -402,14 +605,14 @@ class Device(WyPy):
 
             result = dict(result, **ip_info)
 
-        return result
+        return {field: result[field] for field in fields if field in result}
 
     def _fill_details_table(self, data):
         """
         Iterates over `data`'s items
         Uppercases / colors the key in yellow
         Passes the newly formatted key and its associated value to
-        PrettyTable.add_row()
+        Table.add_row()
 
         Arguments:
             data {dict} -- the device's properties
@@ -1 +1,5 @@
-from .general import General  # noqa: F401
+from wypy.utils.helpers import lazy_exports
+
+__all__ = ['General']
+
+__getattr__ = lazy_exports(__name__, {'General': '.general:General'})
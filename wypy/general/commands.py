@@ -1,12 +1,16 @@
 import click
-from .general import General
+from wypy.utils.helpers import LazySubsystem
 
 
 @click.group('general')
 @click.pass_context
 def general(ctx):
     """Gather general system information"""
-    ctx.obj = General()
+    ctx.obj = LazySubsystem(
+        'wypy.general.general:General',
+        backend=ctx.meta.get('wypy.backend'),
+        output=ctx.meta.get('wypy.output')
+    )
 
 
 @click.command()
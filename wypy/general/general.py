@@ -1,5 +1,6 @@
 import click
 from wypy.wypy import WyPy
+from wypy.utils.helpers import lazy_property
 from wypy.utils.constants import (
     NM_SETTINGS_IFACE,
     NM_SETTINGS_OBJ_PATH,
@@ -11,19 +12,36 @@ from wypy.utils.constants import (
 
 class General(WyPy):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, backend=None, output=None):
+        super().__init__(backend=backend, output=output)
         self.status_properties = [
             'State', 'Connectivity', 'WirelessEnabled',
             'WirelessHardwareEnabled', 'WwanEnabled',
             'WwanHardwareEnabled'
         ]
 
+    @lazy_property
+    def settings_proxy(self):
+        return self.get_proxy(NM_SETTINGS_OBJ_PATH)
+
     def show_status(self):
         """
         Display the general status of NetworkManager
         """
         status_info = self._get_status_info()
+
+        if self.machine_output:
+            with self.record_writer() as writer:
+                writer.write({
+                    prop['name'].lower(): self.translate_status_code(
+                        prop['name'],
+                        prop['status_code'],
+                        color=False
+                    )
+                    for prop in status_info
+                })
+            return
+
         click.echo('WyPy - General status report \n')
         for prop in status_info:
             name = prop['name']
@@ -35,12 +53,17 @@ class General(WyPy):
         Get the 'Hostname' property on the main NetworkManager
         d-bus interface and echo it to the user.
         """
-        proxy = self.bus.get_object(self.bus_name, NM_SETTINGS_OBJ_PATH)
         hostname = self.get_object_property(
-            proxy=proxy,
+            proxy=self.settings_proxy,
             bus_name=NM_SETTINGS_IFACE,
             prop_name='Hostname'
         )
+
+        if self.machine_output:
+            with self.record_writer() as writer:
+                writer.write({'hostname': str(hostname)})
+            return
+
         click.echo(f'Hostname: {hostname}')
 
     #   ---------------
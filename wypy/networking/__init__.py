@@ -1 +1,5 @@
-from .networking import Network  # noqa F401
+from wypy.utils.helpers import lazy_exports
+
+__all__ = ['Network']
+
+__getattr__ = lazy_exports(__name__, {'Network': '.networking:Network'})
@@ -1,12 +1,16 @@
 import click
-from .networking import Network
+from wypy.utils.helpers import LazySubsystem
 
 
 @click.group('network')
 @click.pass_context
 def network(ctx):
     """Perform networking actions"""
-    ctx.obj = Network()
+    ctx.obj = LazySubsystem(
+        'wypy.networking.networking:Network',
+        backend=ctx.meta.get('wypy.backend'),
+        output=ctx.meta.get('wypy.output')
+    )
 
 
 @click.command('on')
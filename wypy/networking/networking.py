@@ -1,30 +1,33 @@
 import click
-import dbus
 from wypy.wypy import WyPy
+from wypy.utils.helpers import lazy_property
 from wypy.utils.constants import (
     DBUS_GENERAL_PROPS,
     NM_IFACE,
-    NM_OBJ_PATH,
-    NM_BUS_NAME
+    NM_OBJ_PATH
 )
 
 
 class Network(WyPy):
 
-    def __init__(self):
-        super().__init__()
-        self.proxy = self.bus.get_object(NM_BUS_NAME, NM_OBJ_PATH)
-        self.iface = dbus.Interface(self.proxy, NM_IFACE)
+    def __init__(self, backend=None, output=None):
+        super().__init__(backend=backend, output=output)
         self.connectivity_prop_name = 'Connectivity'
 
+    @lazy_property
+    def proxy(self):
+        return self.get_proxy(NM_OBJ_PATH)
+
+    @lazy_property
+    def iface(self):
+        return self.get_interface(NM_OBJ_PATH, NM_IFACE)
+
     def get_connectivity_state(self):
         """
         Retrieve general connectivity information from dbus.
         """
         status_code = self._get_connectivity_status_code()
-        prop = DBUS_GENERAL_PROPS[self.connectivity_prop_name]
-        connectivity_state = self.translate_status_code(prop, status_code)
-        self._print_connectivity_state(connectivity_state)
+        self._print_connectivity_state(status_code)
 
     def turn_on(self):
         """
@@ -36,7 +39,7 @@ class Network(WyPy):
         if not networking_enabled:
             self._enable_networking()
         else:
-            click.echo('Networking is already enabled. Skipping.')
+            self.echo('Networking is already enabled. Skipping.')
 
     def turn_off(self):
         """
@@ -48,17 +51,15 @@ class Network(WyPy):
         if networking_enabled:
             self._disable_networking()
         else:
-            click.echo('Networking is already disabled. Skipping.')
+            self.echo('Networking is already disabled. Skipping.')
 
     def check_connectivity(self):
-        click.echo('Performing connectivity check ...')
+        self.echo('Performing connectivity check ...')
         """
         Forces NetworkManager to perform a connectivity check
         """
         status_code = self._check_connectivity_state()
-        prop = DBUS_GENERAL_PROPS[self.connectivity_prop_name]
-        connectivity_state = self.translate_status_code(prop, status_code)
-        self._print_connectivity_state(connectivity_state)
+        self._print_connectivity_state(status_code)
 
     #   ---------------
     #
@@ -80,13 +81,22 @@ class Network(WyPy):
         )
         return int(status_code)
 
-    def _print_connectivity_state(self, status):
+    def _print_connectivity_state(self, status_code):
         """
         Echo the current connectivity state to the user.
 
         Arguments:
-            status {string} -- the current connectivity status
+            status_code {int} -- the current connectivity status code
         """
+        prop = DBUS_GENERAL_PROPS[self.connectivity_prop_name]
+
+        if self.machine_output:
+            status = self.translate_status_code(prop, status_code, color=False)
+            with self.record_writer() as writer:
+                writer.write({'connectivity': status})
+            return
+
+        status = self.translate_status_code(prop, status_code)
         click.echo(f'Connectivity state: {status}')
 
     def _check_connectivity_state(self):
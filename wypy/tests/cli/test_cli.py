@@ -1,3 +1,4 @@
+import json
 from click.testing import CliRunner
 from wypy.cli import cli
 from wypy.utils.constants import VERSION
@@ -8,3 +9,222 @@ def test_wypy_version():
     result = runner.invoke(cli, ['--version'])
     assert result.exit_code == 0
     assert result.output == f'WyPy - Version {VERSION}\n'
+
+
+def test_subcommand_help_makes_no_dbus_call(mocker):
+    system_bus_mock = mocker.patch('dbus.SystemBus')
+    runner = CliRunner()
+    for args in (['device', 'status', '--help'], ['wifi', 'status', '--help']):
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0
+    system_bus_mock.assert_not_called()
+
+
+def test_backend_option(mocker):
+    device_mock = mocker.patch('wypy.device.device.Device')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['--backend', 'wire', 'device', 'status'])
+
+    assert result.exit_code == 0
+    device_mock.assert_called_once_with(backend='wire', output='table')
+    device_mock.return_value.print_status.assert_called_once()
+
+
+def test_profile_option(mocker):
+    device_mock = mocker.patch('wypy.device.device.Device')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['--profile', 'device', 'status'])
+
+    assert result.exit_code == 0
+    assert 'CALL' in result.output and 'wypy device' in result.output
+    device_mock.return_value.print_status.assert_called_once()
+
+
+def test_trace_option(mocker, tmp_path):
+    mocker.patch('wypy.device.device.Device')
+    trace_path = tmp_path / 'trace.json'
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['--trace', str(trace_path), 'device', 'status'])  # noqa E501
+
+    assert result.exit_code == 0
+    assert 'CALL' not in result.output
+    trace = json.loads(trace_path.read_text())
+    names = [event['name'] for event in trace['traceEvents']]
+    assert 'wypy device' in names
+    assert 'Device.__init__' in names
+    assert trace['otherData']['command'] == 'wypy device'
+
+
+def test_device_filter_options(mocker):
+    device_mock = mocker.patch('wypy.device.device.Device')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [
+        'device', 'list', '--type', 'ethernet', '--type', 'wifi',
+        '--name', 'wl*', '--unmanaged'
+    ])
+
+    assert result.exit_code == 0
+    device_mock.return_value.list_all.assert_called_once_with(
+        types=('ethernet', 'wifi'),
+        states=(),
+        names=('wl*',),
+        managed=False,
+        fields=None
+    )
+
+
+def test_fields_option(mocker):
+    device_mock = mocker.patch('wypy.device.device.Device')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['device', 'get', 'eth0', '--fields', 'name, ipv4_addresses'])  # noqa E501
+
+    assert result.exit_code == 0
+    device_mock.return_value.print_details.assert_called_once_with(
+        'eth0',
+        fields=['name', 'ipv4_addresses']
+    )
+
+    result = runner.invoke(cli, ['device', 'status', '--fields', 'name,mtu'])
+
+    assert result.exit_code == 2
+    assert 'choose among device, type, state, connection' in result.output
+
+
+def test_fields_option_connection_and_wifi(mocker):
+    connection_mock = mocker.patch('wypy.connection.connection.Connection')
+    wifi_mock = mocker.patch('wypy.wifi.wifi.WiFi')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['connection', 'active', '--fields', 'name,device'])  # noqa E501
+    assert result.exit_code == 0
+    connection_mock.return_value.show_active.assert_called_once_with(
+        fields=['name', 'device']
+    )
+
+    result = runner.invoke(cli, ['wifi', 'list', '--fields', 'ssid,signal'])
+    assert result.exit_code == 0
+    wifi_mock.return_value.list_access_points.assert_called_once_with(
+        fields=['ssid', 'signal'],
+        top=None,
+        sort=None,
+        max_age=None,
+        group=False
+    )
+
+
+def test_output_option(mocker):
+    wifi_mock = mocker.patch('wypy.wifi.wifi.WiFi')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['--output', 'ndjson', 'wifi', 'list'])
+
+    assert result.exit_code == 0
+    wifi_mock.assert_called_once_with(backend='dbus', output='ndjson')
+
+    result = runner.invoke(cli, ['--output', 'yaml', 'wifi', 'list'])
+    assert result.exit_code == 2
+
+
+def test_wifi_list_top_option(mocker):
+    wifi_mock = mocker.patch('wypy.wifi.wifi.WiFi')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['wifi', 'list', '--top', '5', '--sort', 'rate'])  # noqa E501
+
+    assert result.exit_code == 0
+    wifi_mock.return_value.list_access_points.assert_called_once_with(
+        fields=None,
+        top=5,
+        sort='rate',
+        max_age=None,
+        group=False
+    )
+
+    result = runner.invoke(cli, ['wifi', 'list', '--top', '0'])
+    assert result.exit_code == 2
+
+
+def test_wifi_list_max_age_option(mocker):
+    wifi_mock = mocker.patch('wypy.wifi.wifi.WiFi')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['wifi', 'list', '--max-age', '30'])
+
+    assert result.exit_code == 0
+    wifi_mock.return_value.list_access_points.assert_called_once_with(
+        fields=None,
+        top=None,
+        sort=None,
+        max_age=30.0,
+        group=False
+    )
+
+    result = runner.invoke(cli, ['wifi', 'list', '--max-age', '-1'])
+    assert result.exit_code == 2
+
+
+def test_wifi_list_group_option(mocker):
+    wifi_mock = mocker.patch('wypy.wifi.wifi.WiFi')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['wifi', 'list', '--group', '--fields', 'ssid,bssids'])  # noqa E501
+
+    assert result.exit_code == 0
+    wifi_mock.return_value.list_access_points.assert_called_once_with(
+        fields=['ssid', 'bssids'],
+        top=None,
+        sort=None,
+        max_age=None,
+        group=True
+    )
+
+    result = runner.invoke(cli, ['wifi', 'list', '--fields', 'ssid,bssids'])
+    assert result.exit_code == 2
+    assert 'only available with --group' in result.output
+
+
+def test_wifi_monitor(mocker):
+    wifi_mock = mocker.patch('wypy.wifi.wifi.WiFi')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['wifi', 'monitor'])
+
+    assert result.exit_code == 0
+    wifi_mock.return_value.monitor.assert_called_once_with(
+        window=60,
+        interval=1,
+        duration=None
+    )
+
+    wifi_mock.reset_mock()
+    result = runner.invoke(cli, ['wifi', 'monitor', '--window', '5', '--interval', '0.5', '--duration', '10'])  # noqa E501
+
+    assert result.exit_code == 0
+    wifi_mock.return_value.monitor.assert_called_once_with(
+        window=5,
+        interval=0.5,
+        duration=10
+    )
+
+
+def test_wifi_rescan_ssid_option(mocker):
+    wifi_mock = mocker.patch('wypy.wifi.wifi.WiFi')
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['wifi', 'rescan'])
+    assert result.exit_code == 0
+    wifi_mock.return_value.rescan.assert_called_once_with(ssids=None)
+
+    wifi_mock.reset_mock()
+    result = runner.invoke(cli, ['wifi', 'rescan', '--ssid', 'home', '--ssid', 'work'])  # noqa E501
+    assert result.exit_code == 0
+    wifi_mock.return_value.rescan.assert_called_once_with(ssids=['home', 'work'])  # noqa E501
+
+    result = runner.invoke(cli, ['wifi', 'rescan', '--ssid', 'x' * 33])
+    assert result.exit_code == 2
+    assert 'is not an SSID' in result.output
@@ -0,0 +1,139 @@
+import os
+import subprocess
+import sys
+import pytest
+from wypy.tests.test_wire import FakeBus, default_handler, reply_to
+from wypy.utils.constants import (
+    NM_OBJ_PATH,
+    NM_IFACE,
+    NM_DEVICE_IFACE
+)
+from wypy.wire import Variant
+
+# Total import time budget, in milliseconds, of each command line
+# (interpreter startup imports included).
+IMPORT_TIME_BUDGET_MS = {
+    ('--version',): 150,
+    ('--help',): 150,
+    ('device', 'status', '--help'): 150,
+    ('wifi', 'list', '--help'): 150
+}
+
+# Same, for commands run against a stubbed NetworkManager.
+RUN_IMPORT_TIME_BUDGET_MS = {
+    ('--backend', 'wire', 'device', 'status'): 200
+}
+
+# Modules which must only be imported once a subsystem is used.
+HEAVY_MODULES = ['dbus', 'gi', 'prettytable', 'termcolor']
+
+# Modules the wire backend must never import.
+DBUS_MODULES = ['dbus', 'gi']
+
+NM_DEVICE_PATH = f'{NM_OBJ_PATH}/Devices/1'
+
+NM_OBJECTS = {
+    NM_OBJ_PATH: {
+        NM_IFACE: {
+            'AllDevices': Variant('ao', [NM_DEVICE_PATH])
+        }
+    },
+    NM_DEVICE_PATH: {
+        NM_DEVICE_IFACE: {
+            'Interface': Variant('s', 'eth0'),
+            'DeviceType': Variant('u', 1),
+            'State': Variant('u', 30),
+            'ActiveConnection': Variant('o', '/')
+        }
+    }
+}
+
+
+def network_manager_handler(message):
+    """
+    Answers as a NetworkManager knowing the objects in NM_OBJECTS.
+    """
+    if message.member == 'GetManagedObjects':
+        return [reply_to(message, 'a{oa{sa{sv}}}', [NM_OBJECTS])]
+    if message.member == 'Get':
+        iface_name, prop_name = message.body
+        value = NM_OBJECTS[message.path][iface_name][prop_name]
+        return [reply_to(message, 'v', [value])]
+    if message.member == 'GetAll':
+        props = NM_OBJECTS[message.path][message.body[0]]
+        return [reply_to(message, 'a{sv}', [props])]
+    return default_handler(message)
+
+
+@pytest.fixture
+def nm_env(tmp_path):
+    """
+    Starts a stubbed NetworkManager and returns the environment
+    for a cli run to reach it.
+    """
+    path = str(tmp_path / 'bus.sock')
+    FakeBus(path, network_manager_handler)
+    return dict(
+        os.environ,
+        DBUS_SYSTEM_BUS_ADDRESS=f'unix:path={path}',
+        WYPY_DAEMON_SOCKET=''
+    )
+
+
+def import_times(args, env=None):
+    """
+    Runs the cli with `python -X importtime` and returns
+    (module, cumulative time in microseconds, is top level) tuples.
+    """
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime', '-c',
+            'import sys; from wypy.cli import cli; cli(sys.argv[1:])',
+            *args
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        timeout=30
+    )
+    assert result.returncode == 0, result.stderr
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        top_level = not name[1:].startswith(' ')
+        times.append((name.strip(), int(cumulative), top_level))
+    return times
+
+
+def total_import_ms(times):
+    return sum(time for _, time, top_level in times if top_level) / 1000
+
+
+@pytest.mark.parametrize('args', IMPORT_TIME_BUDGET_MS.keys())
+def test_import_time_budget(args):
+    total_ms = total_import_ms(import_times(args))
+
+    assert total_ms <= IMPORT_TIME_BUDGET_MS[args], \
+        f'`wypy {" ".join(args)}` spent {total_ms:.1f}ms importing modules'
+
+
+@pytest.mark.parametrize('args', IMPORT_TIME_BUDGET_MS.keys())
+def test_heavy_modules_not_imported(args):
+    imported = {name.split('.')[0] for name, _, _ in import_times(args)}
+
+    assert [name for name in HEAVY_MODULES if name in imported] == []
+
+
+@pytest.mark.parametrize('args', RUN_IMPORT_TIME_BUDGET_MS.keys())
+def test_run_import_time_budget(args, nm_env):
+    times = import_times(args, env=nm_env)
+    total_ms = total_import_ms(times)
+    imported = {name.split('.')[0] for name, _, _ in times}
+
+    assert total_ms <= RUN_IMPORT_TIME_BUDGET_MS[args], \
+        f'`wypy {" ".join(args)}` spent {total_ms:.1f}ms importing modules'
+    assert [name for name in DBUS_MODULES if name in imported] == []
@@ -2,10 +2,19 @@ from wypy.wypy import WyPy
 from wypy.general import General
 from wypy.device import Device
 from wypy.wifi import WiFi
+from wypy.connection import Connection
 from wypy.networking import Network
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def no_daemon(monkeypatch):
+    """
+    Keeps the tests from reading a running `wypy daemon`.
+    """
+    monkeypatch.setenv('WYPY_DAEMON_SOCKET', '')
+
+
 @pytest.fixture(scope='function')
 def general():
     general = General()
@@ -34,3 +43,9 @@ def network():
 def wifi():
     wifi = WiFi()
     yield wifi
+
+
+@pytest.fixture(scope='function')
+def connection():
+    connection = Connection()
+    yield connection
@@ -0,0 +1,80 @@
+import pytest
+from wypy.wifi.access_point import (
+    AccessPoint,
+    decode_ssid,
+    get_band,
+    get_band_rank,
+    get_bars
+)
+
+
+def test_access_point_from_properties():
+    props = {
+        'Ssid': b'Paris Wi-Fi',
+        'HwAddress': '00:11:22:33:44:55',
+        'Mode': 2,
+        'MaxBitrate': 134000,
+        'Strength': 71,
+        'Frequency': 5180
+    }
+
+    ap = AccessPoint.from_properties('/ap/1', props, 'wlan0')
+
+    assert ap.ssid == 'Paris Wi-Fi'
+    assert ap.bssid == '00:11:22:33:44:55'
+    assert ap.mode == 'Infra'
+    assert ap.rate == '134 Mbit/s'
+    assert ap.signal == 71
+    assert ap.bars == '***'
+    assert ap.band == '5 GHz'
+    assert ap.device == 'wlan0'
+    assert ap.bssids == 1
+
+
+def test_access_point_fields():
+    ap = AccessPoint('/ap/1', 'home', signal=42)
+
+    assert ap['ssid'] == 'home'
+    assert ap.get('signal') == 42
+    assert ap.get('nope') is None
+    assert not hasattr(ap, '__dict__')
+    with pytest.raises(KeyError):
+        ap['nope']
+
+
+def test_access_point_mode():
+    modes = {
+        0: 'Unknown',
+        1: 'Ad Hoc',
+        2: 'Infra',
+        3: 'Access Point',
+        4: 'Mesh',
+        9: '--'
+    }
+    for code, mode in modes.items():
+        assert AccessPoint('/ap/1', 'home', mode_code=code).mode == mode
+
+
+def test_decode_ssid():
+    raw_ssid = [0x50, 0x61, 0x72, 0x69, 0x73, 0x20, 0x57, 0x69, 0x2d, 0x46, 0x69]
+    assert decode_ssid(raw_ssid) == "Paris Wi-Fi"
+    assert decode_ssid([]) == '--'
+    assert decode_ssid(b'') == '--'
+    assert decode_ssid('café'.encode('utf-8')) == 'café'
+    assert decode_ssid(b'caf\xe9') == 'café'
+
+
+def test_get_bars():
+    assert get_bars('2') == '*'
+    assert get_bars('41') == '**'
+    assert get_bars('71') == '***'
+    assert get_bars('100') == '****'
+    assert get_bars('23420') == '--'
+
+
+def test_get_band():
+    assert get_band(2437) == '2.4 GHz'
+    assert get_band(5500) == '5 GHz'
+    assert get_band(5955) == '6 GHz'
+    assert get_band(0) == '--'
+    assert get_band_rank(5955) > get_band_rank(5180) > get_band_rank(2412)
@@ -0,0 +1,205 @@
+import asyncio
+import pytest
+import time
+from types import SimpleNamespace
+from wypy.aio import AsyncDevice, AsyncConnection, AsyncGeneral, AsyncWyPy
+from wypy.aio.wifi import AsyncWiFi
+from wypy.utils.constants import (
+    NM_DEVICE_IFACE,
+    NM_WIRELESS_IFACE,
+    NM_ACCESS_POINT_IFACE,
+    DBUS_PROPERTIES_IFACE,
+    NM_ACTIVE_CONN_IFACE,
+    DBUS_GENERAL_PROPS
+)
+
+objects = {
+    '/dev/1': {
+        NM_DEVICE_IFACE: {
+            'Interface': 'eth0', 'DeviceType': 1, 'State': 100,
+            'Managed': True, 'ActiveConnection': '/conn/1'
+        }
+    },
+    '/dev/2': {
+        NM_DEVICE_IFACE: {
+            'Interface': 'lo', 'DeviceType': 14, 'State': 10,
+            'Managed': False, 'ActiveConnection': '/'
+        }
+    },
+    '/conn/1': {NM_ACTIVE_CONN_IFACE: {'Id': 'Wired connection 1'}}
+}
+
+
+def test_call_many_keeps_order(mocker):
+    wypy = AsyncWyPy()
+
+    async def fake_call(path, iface_name, method_name, *args):
+        await asyncio.sleep(0.01 * args[0])
+        return args[0]
+
+    mocker.patch.object(wypy, 'call', side_effect=fake_call)
+    wypy.max_in_flight = 2
+
+    calls = [('/obj', 'iface', 'Method', (delay,)) for delay in [3, 1, 2]]
+    result = asyncio.run(wypy.call_many(calls))
+
+    assert result == [3, 1, 2]
+
+
+def test_device_status(mocker):
+    device = AsyncDevice()
+    mocker.patch.object(device, 'get_managed_objects', return_value=objects)
+
+    result = asyncio.run(device.status())
+
+    assert [dev['name'] for dev in result] == ['eth0', 'lo']
+    assert result[0]['connection'] == 'Wired connection 1'
+    assert result[0]['device_status'] == 'connected'
+    assert result[1]['connection'] == '--'
+    assert result[1]['type'] == 'Generic / Loopback'
+
+
+def test_device_unknown(mocker):
+    device = AsyncDevice()
+    mocker.patch.object(device, 'call', side_effect=Exception('boom'))
+    mocker.patch('wypy.aio.device.DBusError', Exception)
+
+    with pytest.raises(ValueError):
+        asyncio.run(device.get_device_path('nope0'))
+
+
+def test_connection_active(mocker):
+    conn = AsyncConnection()
+    mocker.patch.object(
+        conn,
+        'get_property',
+        return_value=['/conn/1', '/conn/2']
+    )
+    call_many_mock = mocker.patch.object(conn, 'call_many', side_effect=[
+        [
+            {'Id': 'a', 'Uuid': 'u1', 'Devices': ['/dev/1']},
+            {'Id': 'b', 'Uuid': 'u2', 'Devices': ['/dev/1']}
+        ],
+        [{'Interface': 'eth0', 'DeviceType': 1}]
+    ])
+
+    result = asyncio.run(conn.active())
+
+    # both connections share a device, which is only fetched once
+    assert len(call_many_mock.call_args_list[1][0][0]) == 1
+    assert [c['device'] for c in result] == ['eth0', 'eth0']
+    assert result[1]['path'] == '/conn/2'
+
+
+def test_general_status(mocker):
+    general = AsyncGeneral()
+    props = {prop: 1 for prop in DBUS_GENERAL_PROPS}
+    mocker.patch.object(general, 'get_all_properties', return_value=props)
+
+    result = asyncio.run(general.status())
+
+    assert sorted(result.keys()) == sorted(DBUS_GENERAL_PROPS.values())
+
+
+def _signal(path, body, member='PropertiesChanged',
+            interface=DBUS_PROPERTIES_IFACE):
+    return SimpleNamespace(
+        message_type='signal',
+        path=path,
+        interface=interface,
+        member=member,
+        body=body
+    )
+
+
+def test_wifi_access_points_ssid(mocker):
+    """
+    Assert SSIDs are decoded like the sync API's, Latin-1 ones included.
+    """
+    wifi = AsyncWiFi()
+    access_points = {
+        '/ap/1': {'Ssid': b'caf\xe9', 'Strength': 70},
+        '/ap/2': {'Ssid': 'caf\xe9'.encode('utf-8'), 'Strength': 60},
+        '/ap/3': {'Ssid': b'', 'Strength': 50}
+    }
+
+    async def fake_call_many(calls, return_exceptions=False):
+        if calls[0][2] == 'GetAllAccessPoints':
+            return [list(access_points)]
+        assert calls[0][1:] == (DBUS_PROPERTIES_IFACE, 'GetAll', (NM_ACCESS_POINT_IFACE,))  # noqa E501
+        return [access_points[path] for path, *_ in calls]
+
+    mocker.patch.object(wifi, 'call_many', side_effect=fake_call_many)
+
+    result = asyncio.run(wifi.access_points(['/dev/wlan0']))
+
+    assert [ap['ssid'] for ap in result] == ['caf\xe9', 'caf\xe9', '--']
+
+
+def test_add_match_filters_signals(mocker):
+    """
+    Assert handlers only get the signals matching their own rule,
+    the connection delivering every signal to every handler.
+    """
+    wypy = AsyncWyPy()
+    bus = mocker.Mock()
+    mocker.patch.object(wypy, 'connect', return_value=bus)
+    mocker.patch.object(wypy, 'call')
+    mocker.patch(
+        'wypy.aio.wypy.MessageType',
+        SimpleNamespace(SIGNAL='signal'),
+        create=True
+    )
+    handler = mocker.Mock()
+    match = (
+        f"type='signal',sender='org.freedesktop.NetworkManager',"
+        f"interface='{DBUS_PROPERTIES_IFACE}',"
+        f"member='PropertiesChanged',path='/dev/wlan0'"
+    )
+
+    asyncio.run(wypy.add_match(match, handler))
+    (on_message,) = bus.add_message_handler.call_args[0]
+
+    matching = _signal('/dev/wlan0', [NM_WIRELESS_IFACE, {}, []])
+    on_message(matching)
+    on_message(_signal('/dev/wlan1', [NM_WIRELESS_IFACE, {}, []]))
+    on_message(_signal('/dev/wlan0', ['/ap/1'], member='AccessPointAdded'))
+    on_message(SimpleNamespace(**dict(vars(matching), message_type='call')))
+
+    handler.assert_called_once_with(matching)
+
+
+def test_scan_device_ignores_other_signals(mocker):
+    """
+    Assert signals without the PropertiesChanged body, or about
+    another interface, leave the scan pending until its timeout,
+    and the LastScan change completes it.
+    """
+    wifi = AsyncWiFi()
+    handlers = []
+    signals = [
+        _signal('/dev/wlan0', ['/ap/1']),
+        _signal('/dev/wlan0', [NM_DEVICE_IFACE, {'LastScan': 1}, []])
+    ]
+
+    async def add_match(match, handler):
+        handlers.append(handler)
+
+    async def request_scan(*args):
+        for signal in signals:
+            handlers[-1](signal)
+
+    mocker.patch.object(wifi, 'add_match', side_effect=add_match)
+    mocker.patch.object(wifi, 'remove_match')
+    mocker.patch.object(wifi, 'call', side_effect=request_scan)
+
+    start = time.monotonic()
+    asyncio.run(wifi._scan_device('/dev/wlan0', timeout=0.2))
+    assert time.monotonic() - start >= 0.2
+
+    signals.append(
+        _signal('/dev/wlan0', [NM_WIRELESS_IFACE, {'LastScan': 1}, []])
+    )
+    start = time.monotonic()
+    asyncio.run(wifi._scan_device('/dev/wlan0', timeout=5))
+    assert time.monotonic() - start < 1
@@ -0,0 +1,79 @@
+from wypy.utils.constants import NM_ACTIVE_CONN_IFACE, NM_DEVICE_IFACE
+
+
+def test_create_row(connection, mocker):
+    mocker.patch.object(connection, '_is_connection_active', return_value=False)  # noqa E501
+    conn = {
+        'id': 'Home',
+        'uuid': 'ba4a3f9e-6bd5-4c12-9bba-4a9ab6a3f2d1',
+        'type': '802-11-wireless',
+        'interface-name': 'wlan0'
+    }
+
+    assert connection._create_row(conn) == [
+        'Home',
+        'ba4a3f9e-6bd5-4c12-9bba-4a9ab6a3f2d1',
+        '802-11-wireless',
+        'wlan0'
+    ]
+    assert connection._create_row(conn, ['device', 'name']) == ['wlan0', 'Home']  # noqa E501
+
+
+def test_show_active_skips_devices(connection, mocker):
+    """
+    Assert devices are not looked up when neither
+    the type nor the device column is shown.
+    """
+    mocker.patch.object(connection, 'load_snapshot')
+    mocker.patch.object(connection, 'get_proxy')
+    mocker.patch.object(
+        connection,
+        'get_object_property',
+        return_value=['/active/1']
+    )
+    prefetch_mock = mocker.patch.object(connection, 'prefetch_all_properties')
+    mocker.patch.object(connection, 'get_all_properties', return_value={
+        'Id': 'Home',
+        'Uuid': 'ba4a3f9e-6bd5-4c12-9bba-4a9ab6a3f2d1',
+        'Type': '802-11-wireless',
+        'Devices': ['/dev/1']
+    })
+    print_conns = mocker.patch.object(connection, '_print_conns')
+    mocker.patch('click.echo')
+
+    connection.show_active(fields=['name', 'uuid'])
+
+    prefetch_mock.assert_called_once_with(['/active/1'], NM_ACTIVE_CONN_IFACE)
+    rows = print_conns.call_args[0][0]
+    assert len(rows) == 1 and len(rows[0]) == 2
+    assert connection.table.field_names == ['NAME', 'UUID']
+    assert connection.table.sortby is None
+
+
+def test_show_active_with_devices(connection, mocker):
+    mocker.patch.object(connection, 'load_snapshot')
+    mocker.patch.object(connection, 'get_proxy')
+    mocker.patch.object(
+        connection,
+        'get_object_property',
+        return_value=['/active/1']
+    )
+    prefetch_mock = mocker.patch.object(connection, 'prefetch_all_properties')
+    mocker.patch.object(connection, 'get_all_properties', side_effect=[
+        {
+            'Id': 'Home',
+            'Uuid': 'ba4a3f9e-6bd5-4c12-9bba-4a9ab6a3f2d1',
+            'Type': '802-11-wireless',
+            'Devices': ['/dev/1']
+        },
+        {'Interface': 'wlan0', 'DeviceType': 2}
+    ])
+    print_conns = mocker.patch.object(connection, '_print_conns')
+    mocker.patch('click.echo')
+
+    connection.show_active()
+
+    assert prefetch_mock.call_args_list[1][0][1] == NM_DEVICE_IFACE
+    rows = print_conns.call_args[0][0]
+    assert len(rows[0]) == 4
+    assert 'wlan0' in rows[0][3]
@@ -0,0 +1,136 @@
+import os
+import pytest
+from wypy.daemon import Daemon
+from wypy.utils.daemon import (
+    fetch_snapshot,
+    get_socket_path,
+    is_trusted_socket,
+    request
+)
+from wypy.utils.constants import (
+    NM_DEVICE_IFACE,
+    NM_WIRELESS_IFACE,
+    NM_ACCESS_POINT_IFACE
+)
+
+snapshot = {
+    '/dev/1': {NM_DEVICE_IFACE: {'Interface': 'eth0', 'State': 100}},
+    '/ap/1': {NM_ACCESS_POINT_IFACE: {'Ssid': b'home', 'Strength': 70}}
+}
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = Daemon(socket_path=str(tmp_path / 'wypy.sock'))
+    daemon._set_snapshot({
+        path: {iface: dict(props) for iface, props in ifaces.items()}
+        for path, ifaces in snapshot.items()
+    })
+    daemon._start_server()
+    yield daemon
+    daemon._stop_server()
+
+
+def test_serves_snapshot(daemon):
+    result = fetch_snapshot(daemon.socket_path)
+
+    assert result['/dev/1'][NM_DEVICE_IFACE] == {'Interface': 'eth0', 'State': 100}  # noqa E501
+    # byte arrays are sent as lists of integers
+    assert result['/ap/1'][NM_ACCESS_POINT_IFACE]['Ssid'] == list(b'home')
+    assert request('ping', daemon.socket_path)['ok'] is True
+
+
+def test_not_running(tmp_path):
+    assert fetch_snapshot(str(tmp_path / 'missing.sock')) is None
+    assert request('ping', '') is None
+
+
+def test_socket_ownership(daemon, mocker, tmp_path):
+    assert is_trusted_socket(daemon.socket_path)
+
+    # owned by another user
+    mocker.patch('os.geteuid', return_value=os.geteuid() + 1)
+    assert not is_trusted_socket(daemon.socket_path)
+    assert request('ping', daemon.socket_path) is None
+    assert fetch_snapshot(daemon.socket_path) is None
+
+
+def test_socket_mode(daemon, tmp_path):
+    os.chmod(daemon.socket_path, 0o660)
+    assert request('ping', daemon.socket_path) is None
+
+    regular_file = tmp_path / 'regular'
+    regular_file.write_text('')
+    regular_file.chmod(0o600)
+    assert not is_trusted_socket(str(regular_file))
+
+
+def test_socket_path(monkeypatch):
+    monkeypatch.delenv('WYPY_DAEMON_SOCKET')
+    monkeypatch.setenv('XDG_RUNTIME_DIR', '/run/user/1000')
+    assert get_socket_path() == '/run/user/1000/wypy.sock'
+
+    # never fall back to a shared directory
+    monkeypatch.delenv('XDG_RUNTIME_DIR')
+    assert get_socket_path() == ''
+
+
+def test_properties_changed(daemon):
+    daemon._handle_properties_changed(
+        NM_DEVICE_IFACE,
+        {'State': 30},
+        ['Interface'],
+        path='/dev/1'
+    )
+    daemon._handle_properties_changed(NM_DEVICE_IFACE, {'State': 1}, [], path='/unknown')  # noqa E501
+
+    result = fetch_snapshot(daemon.socket_path)
+
+    assert result['/dev/1'][NM_DEVICE_IFACE] == {'State': 30}
+    assert '/unknown' not in result
+    assert daemon.generation == 1
+
+
+def test_interfaces_added_removed(daemon):
+    daemon._handle_interfaces_added(
+        '/dev/2',
+        {NM_DEVICE_IFACE: {'Interface': 'wlan0'}, NM_WIRELESS_IFACE: {}}
+    )
+    assert '/dev/2' in fetch_snapshot(daemon.socket_path)
+
+    daemon._handle_interfaces_removed('/dev/2', [NM_WIRELESS_IFACE])
+    assert list(fetch_snapshot(daemon.socket_path)['/dev/2']) == [NM_DEVICE_IFACE]  # noqa E501
+
+    daemon._handle_interfaces_removed('/dev/2', [NM_DEVICE_IFACE])
+    assert '/dev/2' not in fetch_snapshot(daemon.socket_path)
+
+
+def test_unknown_method(daemon):
+    assert request('reboot', daemon.socket_path) is None
+
+
+def test_commands_read_from_daemon(daemon, wypy, mocker):
+    """
+    Assert WyPy reads the object tree from a running daemon
+    instead of calling GetManagedObjects.
+    """
+    iface_mock = mocker.patch.object(wypy, 'get_interface')
+    wypy.daemon_socket = daemon.socket_path
+
+    props = wypy.get_all_properties('/dev/1', NM_DEVICE_IFACE)
+    wypy.load_snapshot()
+
+    assert props['Interface'] == 'eth0'
+    assert wypy.get_snapshot_paths(NM_ACCESS_POINT_IFACE) == ['/ap/1']
+    iface_mock.assert_not_called()
+
+
+def test_daemon_falls_back_to_dbus(wypy, mocker, tmp_path):
+    iface_mock = mocker.patch.object(wypy, 'get_interface')
+    iface_mock.return_value.GetManagedObjects.return_value = snapshot
+    wypy.daemon_socket = str(tmp_path / 'missing.sock')
+
+    wypy.load_snapshot()
+
+    assert wypy.snapshot == snapshot
+    iface_mock.return_value.GetManagedObjects.assert_called_once()
@@ -1,11 +1,39 @@
 import pytest
 from unittest.mock import call
+from dbus.exceptions import DBusException
+from wypy.device import Device
 from wypy.utils.constants import NM_BUS_NAME, NM_DEVICE_IFACE
 
 fmt_mock_path = 'wypy.device.device.format_table_key'
 colored_mock_path = 'wypy.device.device.colored'
 
 
+def mock_unknown_device(device, mocker):
+    """
+    Makes NetworkManager answer that no device has the requested name.
+    """
+    iface_mock = mocker.patch.object(device, 'get_interface')
+    iface_mock.return_value.GetDeviceByIpIface.side_effect = DBusException(
+        'No device found for the requested iface.',
+        name='org.freedesktop.NetworkManager.UnknownDevice'
+    )
+    device.device_index = {'eth0': '/dev/1', 'wlan0': '/dev/2'}
+
+
+def test_init_is_lazy(mocker):
+    """
+    Assert building a Device makes no D-Bus call: the bus,
+    proxies, device list and tables are created on first use.
+    """
+    system_bus_mock = mocker.patch('dbus.SystemBus')
+
+    device = Device()
+
+    system_bus_mock.assert_not_called()
+    assert 'all_devices' not in vars(device)
+    assert 'status_table' not in vars(device)
+
+
 def test_fill_details_table(device, mocker):
 
     data = {
@@ -79,32 +107,21 @@ def test_get_connection_name_exc(device, mocker):
     echo_mock.assert_called_once()
 
 
-def test_create_row(device, mocker):
-    row_color_mock = mocker.patch.object(
-        device, 
-        'get_device_state_row_color',
-        return_value="green"
-    )
-
-    state = 10
-
+def test_create_row(device):
     data = {
-        'name': 'karim',
-        'location': 'paris',
-        'player': 'benzema',
-        'birth_place': 'lyon',
-        'device_path': 'hello',
-        'connection_path': 'hello',
-        'state': state
+        'name': 'wlan0',
+        'type': 'WiFi',
+        'device_status': 'connected',
+        'connection': 'Home',
+        'state': 100,
+        'connection_path': '/active/1',
+        'device_path': '/dev/1'
     }
 
-    initial_values = len(data.values())
-
     result = device._create_row(data)
 
-    row_color_mock.assert_called_once_with(10)
-
-    assert len(result) == initial_values - 3
+    assert result == ['wlan0', 'WiFi', 'connected', 'Home']
+    assert device._create_row(data, ['state', 'device']) == ['connected', 'wlan0']  # noqa E501
 
 
 def test_get_device_status(device, mocker):
@@ -134,6 +151,8 @@ def test_print_status(device, mocker):
     echo_mock = mocker.patch('click.echo')
     add_row_mock = mocker.patch.object(device.status_table, 'add_row')
     dev_status_mock = mocker.patch.object(device, '_get_device_status')
+    snapshot_mock = mocker.patch.object(device, 'load_snapshot')
+    prefetch_mock = mocker.patch.object(device, '_prefetch_devices')
     create_row_mock = mocker.patch.object(
         device,
         '_create_row',
@@ -143,6 +162,8 @@ def test_print_status(device, mocker):
 
     device.print_status()
 
+    snapshot_mock.assert_called_once()
+    prefetch_mock.assert_called_once_with(device.all_devices, connections=True)  # noqa E501
     assert len(echo_mock.call_args_list) == 2
     assert len(add_row_mock.call_args_list) == len(device.all_devices)
     assert len(create_row_mock.call_args_list) == len(device.all_devices)
@@ -154,11 +175,15 @@ def test_list_all(device, mocker):
     fill_details_mock = mocker.patch.object(device, '_fill_details_table')
     echo_mock = mocker.patch('click.echo')
     clear_rows_mock = mocker.patch.object(device.details_table, 'clear_rows')
+    snapshot_mock = mocker.patch.object(device, 'load_snapshot')
+    prefetch_mock = mocker.patch.object(device, '_prefetch_devices')
 
     device.all_devices = ['/dev/1', '/dev/2', '/dev/3']
 
     device.list_all()
 
+    snapshot_mock.assert_called_once()
+    prefetch_mock.assert_called_once_with(device.all_devices, connections=True)  # noqa E501
     assert len(echo_mock.call_args_list) == len(device.all_devices) + 1
     assert len(clear_rows_mock.call_args_list) == len(device.all_devices)
     assert len(dev_details_mock.call_args_list) == len(device.all_devices)
@@ -185,7 +210,11 @@ def test_manage_device_on(device, mocker):
     device.manage(dummy_iface)
 
     dev_path_mock.assert_called_once_with(dummy_iface)
-    get_obj_mock.assert_called_once_with(NM_BUS_NAME, dummy_path)
+    get_obj_mock.assert_called_once_with(
+        NM_BUS_NAME,
+        dummy_path,
+        introspect=False
+    )
     set_prop_mock.assert_called_once_with(
         dummy_obj,
         bus_name=NM_DEVICE_IFACE,
@@ -214,7 +243,11 @@ def test_manage_device_off(device, mocker):
     device.manage(dummy_iface, flag=False)
 
     dev_path_mock.assert_called_once_with(dummy_iface)
-    get_obj_mock.assert_called_once_with(NM_BUS_NAME, dummy_path)
+    get_obj_mock.assert_called_once_with(
+        NM_BUS_NAME,
+        dummy_path,
+        introspect=False
+    )
     set_prop_mock.assert_called_once_with(
         dummy_obj,
         bus_name=NM_DEVICE_IFACE,
@@ -224,7 +257,7 @@ def test_manage_device_off(device, mocker):
 
 
 def test_manage_device_unknown(device, mocker):
-    device.known_device_names = ['/dev/1', '/dev/2', '/dev/3']
+    mock_unknown_device(device, mocker)
     dummy_iface = 'unknown_iface'
 
     with pytest.raises(SystemExit) as exc:
@@ -253,7 +286,11 @@ def test_autoconnect_device_on(device, mocker):
     device.autoconnect(dummy_iface)
 
     dev_path_mock.assert_called_once_with(dummy_iface)
-    get_obj_mock.assert_called_once_with(NM_BUS_NAME, dummy_path)
+    get_obj_mock.assert_called_once_with(
+        NM_BUS_NAME,
+        dummy_path,
+        introspect=False
+    )
     set_prop_mock.assert_called_once_with(
         dummy_obj,
         bus_name=NM_DEVICE_IFACE,
@@ -282,7 +319,11 @@ def test_autoconnect_device_off(device, mocker):
     device.autoconnect(dummy_iface, flag=False)
 
     dev_path_mock.assert_called_once_with(dummy_iface)
-    get_obj_mock.assert_called_once_with(NM_BUS_NAME, dummy_path)
+    get_obj_mock.assert_called_once_with(
+        NM_BUS_NAME,
+        dummy_path,
+        introspect=False
+    )
     set_prop_mock.assert_called_once_with(
         dummy_obj,
         bus_name=NM_DEVICE_IFACE,
@@ -292,7 +333,7 @@ def test_autoconnect_device_off(device, mocker):
 
 
 def test_autoconnect_device_unknown(device, mocker):
-    device.known_device_names = ['/dev/1', '/dev/2', '/dev/3']
+    mock_unknown_device(device, mocker)
     dummy_iface = 'unknown_iface'
 
     with pytest.raises(SystemExit) as exc:
@@ -318,7 +359,7 @@ def test_disconnect_device(device, mocker):
 
 
 def test_disconnect_device_unknown(device, mocker):
-    device.known_device_names = ['/dev/1', '/dev/2', '/dev/3']
+    mock_unknown_device(device, mocker)
     dummy_iface = 'unknown_iface'
 
     with pytest.raises(SystemExit) as exc:
@@ -345,7 +386,7 @@ def test_update_device(device, mocker):
 
 
 def test_update_device_unknown(device, mocker):
-    device.known_device_names = ['/dev/1', '/dev/2', '/dev/3']
+    mock_unknown_device(device, mocker)
     dummy_iface = 'unknown_iface'
 
     with pytest.raises(SystemExit) as exc:
@@ -372,7 +413,7 @@ def test_delete_device(device, mocker):
 
 
 def test_delete_device_unknown(device, mocker):
-    device.known_device_names = ['/dev/1', '/dev/2', '/dev/3']
+    mock_unknown_device(device, mocker)
     dummy_iface = 'unknown_iface'
 
     with pytest.raises(SystemExit) as exc:
@@ -384,3 +425,120 @@ def test_delete_device_unknown(device, mocker):
 # def test_disconnect_device_already_down(device, mocker):
 #     """need dbus for that one"""
 #     pass
+
+
+def test_get_known_device_object_path(device, mocker):
+    """
+    Assert a device is resolved with a single GetDeviceByIpIface
+    call instead of reading every device's status.
+    """
+    iface_mock = mocker.patch.object(device, 'get_interface')
+    iface_mock.return_value.GetDeviceByIpIface.return_value = '/dev/2'
+    snapshot_mock = mocker.patch.object(device, 'load_snapshot')
+    status_mock = mocker.patch.object(device, '_get_device_status')
+
+    assert device._get_known_device_object_path('wlan0') == '/dev/2'
+
+    iface_mock.return_value.GetDeviceByIpIface.assert_called_once_with('wlan0')
+    snapshot_mock.assert_not_called()
+    status_mock.assert_not_called()
+
+
+def test_get_known_device_from_snapshot(device, mocker):
+    """
+    Assert the device index is used, without any d-bus call,
+    when the snapshot is already loaded.
+    """
+    iface_mock = mocker.patch.object(device, 'get_interface')
+    device.snapshot = {
+        '/dev/1': {NM_DEVICE_IFACE: {'Interface': 'eth0'}},
+        '/dev/2': {NM_DEVICE_IFACE: {'Interface': 'wlan0'}},
+        '/ap/1': {}
+    }
+
+    assert device._get_known_device_object_path('wlan0') == '/dev/2'
+    assert device.device_index == {'eth0': '/dev/1', 'wlan0': '/dev/2'}
+    iface_mock.assert_not_called()
+
+
+def test_get_known_device_without_ip_iface(device, mocker):
+    """
+    Assert devices NetworkManager cannot find by IP interface
+    are looked up in the device index.
+    """
+    mock_unknown_device(device, mocker)
+
+    assert device._get_known_device_object_path('wlan0') == '/dev/2'
+    with pytest.raises(ValueError):
+        device._get_known_device_object_path('unknown_iface')
+
+
+def test_filter_devices(device, mocker):
+    """
+    Assert devices are filtered on their own properties only.
+    """
+    device.snapshot = {}
+    device._properties_cache = {
+        ('/dev/1', NM_DEVICE_IFACE): {'Interface': 'eth0', 'DeviceType': 1, 'State': 100, 'Managed': True},  # noqa E501
+        ('/dev/2', NM_DEVICE_IFACE): {'Interface': 'wlan0', 'DeviceType': 2, 'State': 30, 'Managed': True},  # noqa E501
+        ('/dev/3', NM_DEVICE_IFACE): {'Interface': 'wlp3s0', 'DeviceType': 2, 'State': 100, 'Managed': False}  # noqa E501
+    }
+    iface_mock = mocker.patch.object(device, 'get_interface')
+    paths = ['/dev/1', '/dev/2', '/dev/3']
+
+    assert device._filter_devices(paths) == paths
+    assert device._filter_devices(paths, types=('WIFI',)) == ['/dev/2', '/dev/3']  # noqa E501
+    assert device._filter_devices(paths, states=('connected',)) == ['/dev/1', '/dev/3']  # noqa E501
+    assert device._filter_devices(paths, names=('wl*', 'eth1')) == ['/dev/2', '/dev/3']  # noqa E501
+    assert device._filter_devices(paths, names=('wl*',), managed=True) == ['/dev/2']  # noqa E501
+    assert device._filter_devices(paths, types=('bond',)) == []
+    iface_mock.assert_not_called()
+
+
+def test_print_status_filters(device, mocker):
+    """
+    Assert devices filtered out are never looked at any further.
+    """
+    mocker.patch('click.echo')
+    mocker.patch.object(device, 'load_snapshot')
+    mocker.patch.object(device, '_create_row', return_value=['a', 'b', 'c', 'd'])  # noqa E501
+    filter_mock = mocker.patch.object(device, '_filter_devices', return_value=['/dev/2'])  # noqa E501
+    prefetch_mock = mocker.patch.object(device, '_prefetch_devices')
+    dev_status_mock = mocker.patch.object(device, '_get_device_status')
+    device.all_devices = ['/dev/1', '/dev/2', '/dev/3']
+
+    device.print_status(types=('wifi',), managed=True)
+
+    filter_mock.assert_called_once_with(device.all_devices, ('wifi',), (), (), True)  # noqa E501
+    prefetch_mock.assert_called_once_with(['/dev/2'], connections=True)
+    dev_status_mock.assert_called_once_with('/dev/2', connection=True)
+
+
+def test_print_status_machine_output(device, mocker):
+    """
+    Assert records are written without building the table.
+    """
+    device.output = 'ndjson'
+    mocker.patch.object(device, 'load_snapshot')
+    mocker.patch.object(device, 'get_proxy')
+    mocker.patch.object(device, 'get_object_property', return_value=['/dev/1'])
+    mocker.patch.object(device, '_prefetch_devices')
+    mocker.patch.object(device, '_get_device_status', return_value={
+        'name': 'wlan0',
+        'type': 'WiFi',
+        'device_status': 'connected',
+        'connection': 'Home',
+        'state': 100,
+        'connection_path': '/active/1',
+        'device_path': '/dev/1'
+    })
+    writer = mocker.patch.object(device, 'record_writer')
+    mocker.patch('click.echo')
+
+    device.print_status(fields=['device', 'state'])
+
+    writer.assert_called_once_with(['device', 'state'])
+    writer.return_value.__enter__.return_value.write.assert_called_once_with(
+        {'device': 'wlan0', 'state': 'connected'}
+    )
+    assert 'status_table' not in device.__dict__
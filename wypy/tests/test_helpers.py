@@ -1,7 +1,11 @@
+import pytest
 from wypy.utils.helpers import (
     is_valid_uuid,
     format_list,
-    format_table_key
+    format_table_key,
+    lazy_property,
+    lazy_exports,
+    LazySubsystem
 )
 
 
@@ -43,3 +47,45 @@ def test_is_valid_uuid():
 
     _str = '67a548de-8383-4330-abf8-ce60544c5366'
     assert is_valid_uuid(_str) == True
+
+
+def test_lazy_property():
+    class Dummy(object):
+        calls = 0
+
+        @lazy_property
+        def value(self):
+            Dummy.calls += 1
+            return 'computed'
+
+    dummy = Dummy()
+    assert dummy.value == 'computed'
+    assert dummy.value == 'computed'
+    assert Dummy.calls == 1
+
+    dummy.value = 'overridden'
+    assert dummy.value == 'overridden'
+
+
+def test_lazy_subsystem(mocker):
+    device_mock = mocker.patch('wypy.device.device.Device')
+
+    subsystem = LazySubsystem('wypy.device.device:Device', backend='wire')
+    device_mock.assert_not_called()
+
+    subsystem.print_status()
+    subsystem.list_all()
+
+    device_mock.assert_called_once_with(backend='wire')
+    device_mock.return_value.print_status.assert_called_once()
+
+
+def test_lazy_exports():
+    __getattr__ = lazy_exports('wypy.utils', {
+        'VERSION': '.constants:VERSION'
+    })
+
+    from wypy.utils.constants import VERSION
+    assert __getattr__('VERSION') == VERSION
+    with pytest.raises(AttributeError, match="'wypy.utils' has no attribute 'Missing'"):  # noqa E501
+        __getattr__('Missing')
@@ -0,0 +1,42 @@
+import dbus
+from unittest.mock import Mock
+from wypy.utils.interfaces import StaticInterface
+from wypy.utils.signatures import get_method_signature
+from wypy.utils.constants import NM_IFACE, NM_WIRELESS_IFACE
+
+
+def test_get_method_signature():
+    assert get_method_signature(NM_IFACE, 'ActivateConnection') == 'ooo'
+    assert get_method_signature(NM_WIRELESS_IFACE, 'RequestScan') == 'a{sv}'
+    assert get_method_signature(dbus.PROPERTIES_IFACE, 'Set') == 'ssv'
+    assert get_method_signature(NM_IFACE, 'Unknown') is None
+    assert get_method_signature('org.example.Unknown', 'Get') is None
+
+
+def test_static_interface_passes_signature():
+    """
+    Assert StaticInterface calls the proxy's method with the
+    signature taken from the bundled table.
+    """
+    proxy = Mock()
+    iface = StaticInterface(proxy, NM_WIRELESS_IFACE)
+
+    iface.RequestScan({})
+
+    proxy.get_dbus_method.assert_called_once_with(
+        'RequestScan',
+        NM_WIRELESS_IFACE
+    )
+    proxy.get_dbus_method.return_value.assert_called_once_with(
+        {},
+        signature='a{sv}'
+    )
+
+
+def test_static_interface_unknown_method():
+    proxy = Mock()
+    iface = StaticInterface(proxy, NM_IFACE)
+
+    iface.SomethingNew('arg')
+
+    proxy.get_dbus_method.return_value.assert_called_once_with('arg')
@@ -0,0 +1,31 @@
+from wypy.wifi.monitor import SignalHistory
+
+
+def test_signal_history():
+    history = SignalHistory(3)
+
+    assert len(history) == 0
+    assert history.latest is None
+    assert history.average is None
+
+    for timestamp, strength in enumerate([40, 60, 80]):
+        history.add(timestamp, strength)
+
+    assert len(history) == 3
+    assert history.latest == 80
+    assert history.minimum == 40
+    assert history.maximum == 80
+    assert history.average == 60
+
+
+def test_signal_history_window():
+    history = SignalHistory(3)
+
+    for timestamp, strength in enumerate([10, 90, 50, 70, 30]):
+        history.add(timestamp, strength)
+
+    assert list(history.samples) == [(2, 50), (3, 70), (4, 30)]
+    assert history.total == 150
+    assert history.minimum == 30
+    assert history.maximum == 70
+    assert history.average == 50
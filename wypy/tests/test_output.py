@@ -0,0 +1,64 @@
+import io
+import json
+import pytest
+from wypy.utils.output import get_writer
+
+
+def test_ndjson_writer():
+    """
+    Assert each record is written, and flushed, as soon as it is given.
+    """
+    stream = io.StringIO()
+
+    with get_writer('ndjson', stream=stream) as writer:
+        writer.write({'device': 'wlan0', 'state': 100})
+        assert stream.getvalue() == '{"device": "wlan0", "state": 100}\n'
+        writer.write({'device': 'eth0', 'state': 30})
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)['device'] for line in lines] == ['wlan0', 'eth0']
+
+
+def test_json_writer():
+    stream = io.StringIO()
+
+    with get_writer('json', fields=['ssid', 'signal'], stream=stream) as writer:  # noqa E501
+        writer.write({'ssid': 'Home', 'signal': 72, 'bars': '***'})
+        writer.write({'ssid': 'Office', 'signal': 40})
+
+    assert json.loads(stream.getvalue()) == [
+        {'ssid': 'Home', 'signal': 72},
+        {'ssid': 'Office', 'signal': 40}
+    ]
+
+
+def test_json_writer_empty():
+    stream = io.StringIO()
+
+    with get_writer('json', stream=stream):
+        pass
+
+    assert json.loads(stream.getvalue()) == []
+
+
+def test_csv_writer():
+    stream = io.StringIO()
+
+    with get_writer('csv', fields=['name', 'uuid'], stream=stream) as writer:
+        writer.write({'name': 'Home, sweet home', 'uuid': 'abc'})
+
+    assert stream.getvalue().splitlines() == ['name,uuid', '"Home, sweet home",abc']  # noqa E501
+
+
+def test_csv_writer_empty():
+    stream = io.StringIO()
+
+    with get_writer('csv', fields=['name', 'uuid'], stream=stream):
+        pass
+
+    assert stream.getvalue().splitlines() == ['name,uuid']
+
+
+def test_unknown_writer():
+    with pytest.raises(ValueError):
+        get_writer('yaml')
@@ -0,0 +1,160 @@
+import json
+import pytest
+from unittest.mock import Mock
+from wypy.utils.helpers import echo_table
+from wypy.utils.profiler import Profiler, CallStats, profiler as _profiler
+from wypy.utils.constants import NM_DEVICE_IFACE, NM_WIRELESS_IFACE
+
+
+@pytest.fixture
+def profiler():
+    _profiler.enable()
+    yield _profiler
+    _profiler.disable()
+
+
+def test_disabled_profiler_returns_method():
+    profiler = Profiler()
+    method = Mock()
+
+    assert profiler.wrap_method(NM_WIRELESS_IFACE, 'RequestScan', method) is method  # noqa E501
+    with profiler.measure('output.format'):
+        pass
+    assert profiler.stats == {}
+
+
+def test_wrap_method(profiler):
+    method = Mock(return_value='/org/freedesktop/NetworkManager/Devices/1')
+    wrapped = profiler.wrap_method(NM_WIRELESS_IFACE, 'RequestScan', method, 'a{sv}')  # noqa E501
+
+    result = wrapped({}, signature='a{sv}')
+
+    method.assert_called_once_with({}, signature='a{sv}')
+    assert result == '/org/freedesktop/NetworkManager/Devices/1'
+    stats = profiler.stats['Wireless.RequestScan']
+    assert stats.count == 1
+    # an empty a{sv} is its length padded to 8 bytes,
+    # the reply string 4 + 41 + 1 bytes
+    assert stats.nbytes == 8 + 46
+
+
+def test_wrap_method_async(profiler):
+    """
+    Assert asynchronous calls are recorded when their reply arrives,
+    and the caller's handlers still run.
+    """
+    method = Mock()
+    reply_handler, error_handler = Mock(), Mock()
+    wrapped = profiler.wrap_method(NM_DEVICE_IFACE, 'Disconnect', method)
+
+    wrapped(reply_handler=reply_handler, error_handler=error_handler)
+    assert profiler.stats == {}
+
+    kwargs = method.call_args[1]
+    kwargs['reply_handler']()
+    kwargs['error_handler'](Exception('failed'))
+
+    reply_handler.assert_called_once_with()
+    error_handler.assert_called_once()
+    assert profiler.stats['Device.Disconnect'].count == 2
+
+
+def test_wrap_method_error(profiler):
+    method = Mock(side_effect=ValueError)
+    wrapped = profiler.wrap_method(NM_DEVICE_IFACE, 'Delete', method)
+
+    with pytest.raises(ValueError):
+        wrapped()
+    assert profiler.stats['Device.Delete'].count == 1
+
+
+def test_percentile():
+    stats = CallStats()
+    stats.durations = [0.005, 0.001, 0.003, 0.002, 0.004]
+
+    assert stats.percentile(50) == 0.003
+    assert stats.percentile(90) == 0.005
+    assert stats.percentile(0) == 0.001
+    assert stats.total == pytest.approx(0.015)
+
+
+def test_report(profiler):
+    profiler.record('Properties.GetAll', 0.002, 120)
+    profiler.record('Properties.GetAll', 0.004, 120)
+    profiler.record('output.format', 0.010)
+
+    lines = profiler.report().splitlines()
+
+    assert 'CALL' in lines[1] and 'BYTES' in lines[1]
+    assert 'output.format' in lines[3]
+    assert 'Properties.GetAll' in lines[4] and '240' in lines[4]
+
+
+def test_annotations(profiler, tmp_path):
+    profiler.annotate('WiFi.scan_cache', 'hit')
+    profiler.record('Properties.GetAll', 0.002, 120)
+
+    assert profiler.report().splitlines()[-1] == 'WiFi.scan_cache: hit'
+
+    path = tmp_path / 'trace.json'
+    profiler.write_trace(str(path), {'command': 'wypy wifi list'})
+    trace = json.loads(path.read_text())
+    assert trace['otherData'] == {
+        'WiFi.scan_cache': 'hit',
+        'command': 'wypy wifi list'
+    }
+
+    profiler.disable()
+    profiler.annotate('WiFi.scan_cache', 'miss')
+    assert profiler.annotations['WiFi.scan_cache'] == 'hit'
+
+
+def test_echo_table(profiler, mocker):
+    echo_mock = mocker.patch('click.echo')
+
+    echo_table('+---+')
+
+    echo_mock.assert_called_once_with('+---+')
+    assert profiler.stats['output.format'].count == 1
+
+
+def test_property_helpers_are_recorded(profiler, wypy, mocker):
+    iface_mock = mocker.patch.object(wypy, 'get_interface')
+    iface_mock.return_value.GetAll.return_value = {'State': 100}
+
+    wypy.get_all_properties('/dev/1', NM_DEVICE_IFACE)
+    wypy.get_all_properties('/dev/1', NM_DEVICE_IFACE)
+
+    assert profiler.stats['WyPy.get_all_properties'].count == 2
+
+
+def test_write_trace(profiler, tmp_path):
+    """
+    Assert phases are written as complete events and d-bus calls,
+    which may overlap, as async begin / end pairs.
+    """
+    profiler.tracing = True
+    method = Mock(return_value=None)
+    wrapped = profiler.wrap_method(NM_DEVICE_IFACE, 'Disconnect', method)
+
+    with profiler.measure('WyPy.load_snapshot'):
+        wrapped()
+
+    path = tmp_path / 'trace.json'
+    profiler.write_trace(str(path), {'command': 'wypy device'})
+    trace = json.loads(path.read_text())
+
+    phase, begin, end = trace['traceEvents']
+    assert trace['otherData'] == {'command': 'wypy device'}
+    assert (phase['name'], phase['ph']) == ('WyPy.load_snapshot', 'X')
+    assert (begin['name'], begin['ph'], begin['cat']) == ('Device.Disconnect', 'b', 'dbus')  # noqa E501
+    assert (end['ph'], end['id']) == ('e', begin['id'])
+    assert phase['ts'] <= begin['ts'] <= end['ts'] <= phase['ts'] + phase['dur']  # noqa E501
+
+
+def test_no_trace_events_unless_tracing(profiler):
+    with profiler.measure('WyPy.load_snapshot'):
+        pass
+
+    assert profiler.stats['WyPy.load_snapshot'].count == 1
+    assert profiler.events == []
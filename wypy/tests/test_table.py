@@ -0,0 +1,100 @@
+import pytest
+from termcolor import colored
+from wypy.utils.table import Table, visible_width
+
+
+def test_table():
+    table = Table(['NAME', 'UUID'])
+    table.add_row(['a', 1])
+    table.add_row(['bbbbbbb', 22])
+
+    assert str(table).splitlines() == [
+        '+---------+------+',
+        '| NAME    | UUID |',
+        '+---------+------+',
+        '| a       | 1    |',
+        '| bbbbbbb | 22   |',
+        '+---------+------+'
+    ]
+
+
+def test_table_without_border():
+    table = Table(
+        ['SSID', 'SIGNAL'],
+        border=False,
+        left_padding_width=0,
+        right_padding_width=8
+    )
+    table.add_row(['Home', 72])
+
+    assert str(table).splitlines() == [
+        'SSID        SIGNAL        ',
+        'Home        72            '
+    ]
+
+
+def test_sort_on_typed_values():
+    """
+    Assert numbers are sorted as numbers, not as strings.
+    """
+    table = Table(['SSID', 'SIGNAL'], sortby='SIGNAL', reversesort=True)
+    for signal in (9, 100, 10):
+        table.add_row(['Home', signal])
+
+    lines = str(table).splitlines()
+
+    assert [line.split('|')[2].strip() for line in lines[3:6]] == ['100', '10', '9']  # noqa E501
+
+
+def test_row_color():
+    """
+    Assert rows are colored as a whole, only when colors are enabled,
+    and that colored values do not widen their column.
+    """
+    table = Table(['NAME'], color=True)
+    table.add_row(['wlan0'], color='green')
+    table.add_row([colored('eth0', 'red')])
+
+    lines = str(table).splitlines()
+    assert lines[3] == '|' + colored(' wlan0 ', 'green') + '|'
+    assert visible_width(lines[4]) == len(lines[0])
+
+    table.color = False
+    assert str(table).splitlines()[3] == '| wlan0 |'
+
+
+def test_clear_rows():
+    table = Table(['NAME'])
+    table.add_row(['a very long name'])
+    table.clear_rows()
+
+    assert table.rows == []
+    assert str(table).splitlines()[0] == '+------+'
+
+
+def test_add_row_length():
+    table = Table(['NAME', 'UUID'])
+    with pytest.raises(ValueError):
+        table.add_row(['a'])
+
+
+def test_stream():
+    """
+    Assert rows are sized from the width hints and the sample,
+    and that later rows widen their column.
+    """
+    table = Table(['NAME', 'UUID'])
+    rows = iter([(['a', 1], None), (['bb', 2], None), (['cccccc', 3], None)])
+
+    lines = table.stream(rows, width_hints={'UUID': 4, 'TYPE': 10}, sample=2)
+
+    assert next(lines) == '+------+------+'
+    assert list(lines) == [
+        '| NAME | UUID |',
+        '+------+------+',
+        '| a    | 1    |',
+        '| bb   | 2    |',
+        '| cccccc | 3    |',
+        '+--------+------+'
+    ]
+    assert table.rows == []
@@ -2,7 +2,29 @@ import pytest
 import dbus
 from termcolor import colored
 from unittest.mock import call
-from wypy.utils.constants import DBUS_GENERAL_PROPS, NM_DEVICE_IFACE
+from dbus.exceptions import DBusException
+from wypy.wifi import WiFi
+from wypy.wifi.access_point import AccessPoint
+from wypy.utils.constants import (
+    DBUS_GENERAL_PROPS,
+    NM_DEVICE_IFACE,
+    NM_WIRELESS_IFACE,
+    NM_ACCESS_POINT_IFACE
+)
+
+
+def test_init_is_lazy(mocker):
+    """
+    Assert building a WiFi object neither connects to the bus
+    nor looks for the wireless device.
+    """
+    system_bus_mock = mocker.patch('dbus.SystemBus')
+    wireless_path_mock = mocker.patch.object(WiFi, '_get_wireless_devices')
+
+    WiFi()
+
+    system_bus_mock.assert_not_called()
+    wireless_path_mock.assert_not_called()
 
 
 def test_turn_on_wifi(wifi, mocker):
@@ -144,67 +166,6 @@ def test_get_wifi_status_code(wifi, mocker):
     )
 
 
-# TODO:
-def test_format_bitrate(wifi):
-    bitrate = 134000.00
-    result = wifi._format_bitrate(bitrate)
-    assert result == '134 Mbit/s'
-
-
-def test_get_mode(wifi):
-    mode = '4'
-    result = wifi._get_mode(mode)
-    assert result == 'Mesh'
-
-    mode = '3'
-    result = wifi._get_mode(mode)
-    assert result == 'Access Point'
-
-    mode = '2'
-    result = wifi._get_mode(mode)
-    assert result == 'Infra'
-
-    mode = '1'
-    result = wifi._get_mode(mode)
-    assert result == 'Ad Hoc'
-
-    mode = '0'
-    result = wifi._get_mode(mode)
-    assert result == 'Unknown'
-
-
-def test_get_bars(wifi):
-    signal = '2'
-    result = wifi._get_bars(signal)
-    assert result == '*'
-
-    signal = '41'
-    result = wifi._get_bars(signal)
-    assert result == '**'
-
-    signal = '71'
-    result = wifi._get_bars(signal)
-    assert result == '***'
-
-    signal = '100'
-    result = wifi._get_bars(signal)
-    assert result == '****'
-
-    signal = '23420'
-    result = wifi._get_bars(signal)
-    assert result == '--'
-
-
-def test_get_ssid(wifi):
-    raw_ssid = [0x50, 0x61, 0x72, 0x69, 0x73, 0x20, 0x57, 0x69, 0x2d, 0x46, 0x69]
-    result = wifi._get_ssid(raw_ssid)
-    assert result == "Paris Wi-Fi"
-
-    raw_ssid = []
-    result = wifi._get_ssid(raw_ssid)
-    assert result == '--'
-
-
 def test_extract_access_point_info(wifi, mocker):
     access_point_props = {
         'hello': 'world',
@@ -218,10 +179,8 @@ def test_extract_access_point_info(wifi, mocker):
         'age': 32,
         'current_club': 'Real Madrid CF'
     }
-    expected_keys = [
-        'ssid', 'mode', 'rate',
-        'signal', 'bars', 'dbus_path'
-    ]
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0'}
+    wifi._ap_devices = {'/some/path': '/dev/wlan0'}
     get_all_props_mock = mocker.patch.object(
         wifi,
         'get_all_properties',
@@ -231,12 +190,21 @@ def test_extract_access_point_info(wifi, mocker):
     result = wifi._extract_ap_info('/some/path')
 
     get_all_props_mock.assert_called_once()
-    assert sorted(expected_keys) == sorted(result.keys())
+    assert isinstance(result, AccessPoint)
+    assert result.dbus_path == '/some/path'
+    assert result.ssid == '--'
+    assert result.mode == 'Infra'
+    assert result.rate == '982 Mbit/s'
+    assert result.signal == 92
+    assert result.bars == '****'
+    assert result.device == 'wlan0'
 
 
 def test_get_all_access_points(wifi, mocker):
     dummy_ap_paths = ['/ap/1', '/ap/2', '/ap/3']
-    request_scan = mocker.patch.object(wifi, '_request_scan')
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0'}
+    wait_for_scan = mocker.patch.object(wifi, '_wait_for_scan')
+    prefetch_mock = mocker.patch.object(wifi, 'prefetch_all_properties')
     list_ap_paths = mocker.patch.object(
         wifi,
         '_list_ap_paths',
@@ -252,12 +220,314 @@ def test_get_all_access_points(wifi, mocker):
 
     result = wifi._get_all_access_points()
 
-    request_scan.assert_called_once()
+    wait_for_scan.assert_called_once()
     list_ap_paths.assert_called_once()
+    prefetch_mock.assert_called_once_with(
+        dummy_ap_paths,
+        NM_ACCESS_POINT_IFACE,
+        refresh=True
+    )
     extract_ap_info.assert_has_calls(dummy_ap_paths_calls)
     assert isinstance(result, list) == True
 
 
+def test_scan_unless_recent_rate_limited(wifi, mocker):
+    """
+    Assert a refused scan is not waited for, and is followed
+    by a refresh of the access points.
+    """
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0'}
+    mocker.patch.object(wifi, '_wait_for_scan', side_effect=SystemExit)
+
+    assert wifi._scan_unless_recent() is True
+
+
+def test_scan_unless_recent(wifi, mocker):
+    """
+    Assert the access points are reused without scanning when the
+    last scan is recent enough, and that the profiler reports it.
+    """
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0'}
+    profiler = mocker.patch('wypy.wifi.wifi.profiler')
+    wait_for_scan = mocker.patch.object(wifi, '_wait_for_scan')
+    get_age = mocker.patch.object(wifi, '_get_last_scan_age', return_value=12.5)  # noqa E501
+
+    assert wifi._scan_unless_recent(max_age=30) is False
+    get_age.assert_called_once_with('/dev/wlan0')
+    wait_for_scan.assert_not_called()
+    profiler.annotate.assert_has_calls([
+        call('WiFi.scan_cache', 'hit'),
+        call('WiFi.scan_cache.age', 'wlan0 12.5 s')
+    ])
+
+    assert wifi._scan_unless_recent(max_age=10) is True
+    wait_for_scan.assert_called_once_with(['/dev/wlan0'], ssids=None)
+    profiler.annotate.assert_any_call('WiFi.scan_cache', 'miss')
+
+
+def test_list_access_points_scan_message(wifi, mocker, capsys):
+    """
+    Assert "Scanning" is only printed when a scan is requested,
+    the reused results' age being printed otherwise.
+    """
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0'}
+    wait_for_scan = mocker.patch.object(wifi, '_wait_for_scan')
+    mocker.patch.object(wifi, '_get_last_scan_age', return_value=12.4)
+    mocker.patch.object(wifi, '_list_ap_paths', return_value=[])
+    mocker.patch.object(wifi, 'prefetch_all_properties')
+    mocker.patch('wypy.wifi.wifi.echo_table')
+
+    wifi.list_access_points(max_age=30)
+
+    output = capsys.readouterr().out
+    assert output == 'Using access points from a scan 12 s ago\n'
+    wait_for_scan.assert_not_called()
+
+    wifi.list_access_points(max_age=10)
+
+    output = capsys.readouterr().out
+    assert output == 'Scanning for available access points ...\n'
+    wait_for_scan.assert_called_once()
+
+
+def test_scan_unless_recent_stale_radios(wifi, mocker):
+    """
+    Assert only the radios whose last scan is too old scan.
+    """
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0', '/dev/wlan1': 'wlan1'}
+    profiler = mocker.patch('wypy.wifi.wifi.profiler')
+    wait_for_scan = mocker.patch.object(wifi, '_wait_for_scan')
+    mocker.patch.object(wifi, '_get_last_scan_age', side_effect=[5.0, None])
+
+    assert wifi._scan_unless_recent(max_age=30) is True
+    wait_for_scan.assert_called_once_with(['/dev/wlan1'], ssids=None)
+    profiler.annotate.assert_any_call(
+        'WiFi.scan_cache.age',
+        'wlan0 5.0 s, wlan1 never scanned'
+    )
+
+
+def test_get_last_scan_age(wifi, mocker):
+    wifi.wifi_dev_path = '/dev/wlan0'
+    get_all_props = mocker.patch.object(
+        wifi,
+        'get_all_properties',
+        return_value={'LastScan': 5000}
+    )
+    mocker.patch('time.clock_gettime', return_value=8.5)
+
+    assert wifi._get_last_scan_age() == 3.5
+    get_all_props.assert_called_once_with(
+        '/dev/wlan0',
+        'org.freedesktop.NetworkManager.Device.Wireless'
+    )
+
+    get_all_props.return_value = {'LastScan': -1}
+    assert wifi._get_last_scan_age('/dev/wlan1') is None
+
+
+def _mock_scan_signals(wifi, mocker, wireless_props, devices=('/dev/wlan0',)):  # noqa E501
+    """
+    Mocks the wireless devices' signals and the main loop: running the
+    loop calls the `emit` function set on the returned handlers, which
+    are kept by device and signal name.
+    """
+    wifi.wifi_devices = {device: device.rsplit('/', 1)[-1] for device in devices}  # noqa E501
+    mocker.patch.object(wifi, 'get_all_properties', return_value=wireless_props)
+    mocker.patch.object(wifi, 'timeout_add', side_effect=[1, 2, 3])
+    source_remove = mocker.patch.object(wifi, 'source_remove')
+    loop = mocker.Mock()
+    mocker.patch.object(wifi, 'create_main_loop', return_value=loop)
+
+    handlers = {'matches': []}
+
+    def get_proxy(device):
+        def connect_to_signal(signal_name, handler, dbus_interface):
+            handlers[(device, signal_name)] = handler
+            handlers['matches'].append(mocker.Mock())
+            return handlers['matches'][-1]
+
+        return mocker.Mock(connect_to_signal=connect_to_signal)
+
+    mocker.patch.object(wifi, 'get_proxy', side_effect=get_proxy)
+    loop.run.side_effect = lambda: handlers['emit'](handlers)
+    return handlers, loop, source_remove
+
+
+def _last_scan_changed(handlers, device):
+    handlers[(device, 'PropertiesChanged')](
+        'org.freedesktop.NetworkManager.Device.Wireless',
+        {'LastScan': 2000},
+        []
+    )
+
+
+def test_wait_for_scan(wifi, mocker):
+    """
+    Assert the main loop is quit once LastScan changes, and the
+    timeout and signal subscriptions are removed.
+    """
+    handlers, loop, source_remove = _mock_scan_signals(
+        wifi, mocker, {'LastScan': 1000}
+    )
+    request_scans = mocker.patch.object(wifi, '_request_scans', return_value=[True])  # noqa E501
+
+    def emit(handlers):
+        handlers[('/dev/wlan0', 'AccessPointAdded')]('/ap/1')
+        _last_scan_changed(handlers, '/dev/wlan0')
+
+    handlers['emit'] = emit
+
+    assert wifi._wait_for_scan() is True
+    request_scans.assert_called_once_with(['/dev/wlan0'], None)
+    loop.quit.assert_called_once()
+    # the timeout only: AccessPointAdded is ignored when LastScan exists
+    wifi.timeout_add.assert_called_once()
+    source_remove.assert_called_once_with(1)
+    assert len(handlers['matches']) == 3
+    for match in handlers['matches']:
+        match.remove.assert_called_once()
+
+
+def test_wait_for_scan_every_radio(wifi, mocker):
+    """
+    Assert every radio scans at once and the wait lasts until
+    the last of them is done.
+    """
+    devices = ('/dev/wlan0', '/dev/wlan1', '/dev/wlan2')
+    handlers, loop, source_remove = _mock_scan_signals(
+        wifi, mocker, {'LastScan': 1000}, devices
+    )
+    request_scans = mocker.patch.object(
+        wifi,
+        '_request_scans',
+        return_value=[True, True, False]
+    )
+
+    def emit(handlers):
+        _last_scan_changed(handlers, '/dev/wlan1')
+        loop.quit.assert_not_called()
+        _last_scan_changed(handlers, '/dev/wlan1')
+        loop.quit.assert_not_called()
+        _last_scan_changed(handlers, '/dev/wlan0')
+
+    handlers['emit'] = emit
+
+    assert wifi._wait_for_scan() is True
+    request_scans.assert_called_once_with(list(devices), None)
+    loop.quit.assert_called_once()
+    assert len(handlers['matches']) == 9
+
+
+def test_wait_for_scan_without_last_scan(wifi, mocker):
+    """
+    Assert devices without LastScan are done once no access point
+    was added or removed for a while.
+    """
+    handlers, loop, source_remove = _mock_scan_signals(wifi, mocker, {})
+    mocker.patch.object(wifi, '_request_scans', return_value=[True])
+
+    def emit(handlers):
+        handlers[('/dev/wlan0', 'AccessPointAdded')]('/ap/1')
+        handlers[('/dev/wlan0', 'AccessPointRemoved')]('/ap/2')
+        settled = wifi.timeout_add.call_args[0][1]
+        settled()
+
+    handlers['emit'] = emit
+
+    assert wifi._wait_for_scan() is True
+    loop.quit.assert_called_once()
+    # the first settle timer is replaced when the second signal comes
+    source_remove.assert_has_calls([call(2), call(1)])
+
+
+def test_wait_for_scan_timeout(wifi, mocker):
+    handlers, loop, source_remove = _mock_scan_signals(
+        wifi, mocker, {'LastScan': 1000}
+    )
+    mocker.patch.object(wifi, '_request_scans', return_value=[True])
+    handlers['emit'] = lambda handlers: wifi.timeout_add.call_args[0][1]()
+
+    assert wifi._wait_for_scan(timeout=5) is False
+    wifi.timeout_add.assert_called_once_with(5, mocker.ANY)
+    source_remove.assert_not_called()
+
+
+def test_wait_for_scan_not_requested(wifi, mocker):
+    """
+    Assert the loop does not run when no scan could be requested.
+    """
+    handlers, loop, source_remove = _mock_scan_signals(
+        wifi, mocker, {'LastScan': 1000}
+    )
+    mocker.patch.object(wifi, '_request_scans', return_value=[False])
+
+    assert wifi._wait_for_scan() is True
+    loop.run.assert_not_called()
+
+
+def test_request_scans(wifi, mocker):
+    rate_limited = DBusException(
+        'Scanning not allowed immediately following previous scan'
+    )
+    call_many = mocker.patch.object(
+        wifi,
+        'call_many',
+        return_value=[None, rate_limited, DBusException('unavailable')]
+    )
+
+    result = wifi._request_scans(['/dev/wlan0', '/dev/wlan1', '/dev/wlan2'])
+
+    assert result == [True, False, False]
+    calls = call_many.call_args[0][0]
+    assert [path for path, _, _, _ in calls] == ['/dev/wlan0', '/dev/wlan1', '/dev/wlan2']  # noqa E501
+    assert calls[0][2:] == ('RequestScan', ({},))
+
+    call_many.return_value = [rate_limited, rate_limited]
+    with pytest.raises(SystemExit):
+        wifi._request_scans(['/dev/wlan0', '/dev/wlan1'])
+
+
+def test_request_scans_ssids(wifi, mocker):
+    """
+    Assert targeted scans pass the SSIDs as bytes, sent as 'aay'.
+    """
+    call_many = mocker.patch.object(wifi, 'call_many', return_value=[None])
+
+    assert wifi._request_scans(['/dev/wlan0'], ['home', 'café']) == [True]
+
+    (options,) = call_many.call_args[0][0][0][3]
+    assert options['ssids'] == [b'home', 'café'.encode('utf-8')]
+
+
+def test_rescan_ssids(wifi, mocker):
+    wait_for_scan = mocker.patch.object(wifi, '_wait_for_scan')
+
+    wifi.rescan(ssids=['home'])
+
+    wait_for_scan.assert_called_once_with(ssids=['home'])
+
+
+def test_list_ap_paths(wifi, mocker):
+    """
+    Assert the access points of every radio are listed, and each
+    is tagged with the radio seeing it.
+    """
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0', '/dev/wlan1': 'wlan1'}
+    mocker.patch.object(
+        wifi,
+        'call_many',
+        return_value=[['/ap/1', '/ap/2'], ['/ap/3']]
+    )
+    mocker.patch.object(wifi, 'get_all_properties', return_value={
+        'Ssid': [], 'Strength': 50, 'MaxBitrate': 54000, 'Mode': 2
+    })
+
+    assert wifi._list_ap_paths() == ['/ap/1', '/ap/2', '/ap/3']
+    assert wifi._extract_ap_info('/ap/3')['device'] == 'wlan1'
+    assert wifi._extract_ap_info('/ap/1')['device'] == 'wlan0'
+
+
 def test_filter_wifi_devices(wifi):
     device = ('/dev/path', {'Real': 1, 'DeviceType': 2})
     result = wifi._is_device_wifi(device)
@@ -268,7 +538,7 @@ def test_filter_wifi_devices(wifi):
     assert result == False
 
 
-def test_get_wireless_device_path(wifi, mocker):
+def test_get_wireless_devices(wifi, mocker):
     dummy_devices = ['/dev/1', '/dev/2']
     get_all_dev_paths = mocker.patch.object(
         wifi,
@@ -278,24 +548,41 @@ def test_get_wireless_device_path(wifi, mocker):
     get_all_props = mocker.patch.object(
         wifi,
         'get_all_properties',
-        return_value={}
+        return_value={'Interface': 'wlan0'}
     )
     is_device_wifi = mocker.patch.object(
         wifi,
         '_is_device_wifi',
         return_value=True
     )
+    mocker.patch.object(wifi, 'load_snapshot')
+    prefetch_mock = mocker.patch.object(wifi, 'prefetch_all_properties')
 
     get_all_props_calls = [call(dev, NM_DEVICE_IFACE) for dev in dummy_devices]
-    is_device_wifi_calls = [call((dev, {})) for dev in dummy_devices]
+    is_device_wifi_calls = [
+        call((dev, {'Interface': 'wlan0'})) for dev in dummy_devices
+    ]
 
-    result = wifi._get_wireless_device_path()
+    result = wifi._get_wireless_devices()
 
     get_all_dev_paths.assert_called_once()
+    prefetch_mock.assert_called_once_with(dummy_devices, NM_DEVICE_IFACE)
     get_all_props.assert_has_calls(get_all_props_calls)
     is_device_wifi.assert_has_calls(is_device_wifi_calls)
 
-    assert result == '/dev/1'
+    assert result == {'/dev/1': 'wlan0', '/dev/2': 'wlan0'}
+    assert wifi.wifi_dev_path == '/dev/1'
+
+
+def test_get_wireless_devices_none(wifi, mocker):
+    mocker.patch.object(wifi, '_get_all_devices_paths', return_value=['/dev/1'])  # noqa E501
+    mocker.patch.object(wifi, 'get_all_properties', return_value={})
+    mocker.patch.object(wifi, '_is_device_wifi', return_value=False)
+    mocker.patch.object(wifi, 'load_snapshot')
+    mocker.patch.object(wifi, 'prefetch_all_properties')
+
+    with pytest.raises(SystemExit):
+        wifi._get_wireless_devices()
 
 
 def test_connect_to_wifi_existing_conn(wifi, mocker):
@@ -309,6 +596,12 @@ def test_connect_to_wifi_existing_conn(wifi, mocker):
         return_value=dummy_conn_paths
     )
 
+    mocker.patch.object(
+        wifi,
+        '_get_connections_settings',
+        return_value=[{}, {}]
+    )
+
     get_conn_info_mock = mocker.patch.object(
         wifi,
         '_get_connection_info',
@@ -349,6 +642,12 @@ def test_connect_to_wifi_non_existant_conn(wifi, mocker):
         return_value=dummy_conn_paths
     )
 
+    mocker.patch.object(
+        wifi,
+        '_get_connections_settings',
+        return_value=[{}, {}]
+    )
+
     get_conn_info_mock = mocker.patch.object(
         wifi,
         '_get_connection_info',
@@ -421,7 +720,7 @@ def test_connect_to_ap(wifi, mocker):
 
     wifi._connect_to_access_point(dummy_ap_name, dummy_ap_pass)
 
-    get_all_aps_mock.assert_called_once()
+    get_all_aps_mock.assert_called_once_with(ssids=[dummy_ap_name])
     generate_wifi_info_mock.assert_called_once_with(dummy_ap_name, dummy_ap_pass)
     establish_connection_mock.assert_called_once_with(wifi_conn_info, dummy_ap_path)
 
@@ -437,7 +736,7 @@ def test_generate_wireless_info(wifi):
         'connection', '802-11-wireless',
         '802-11-wireless-security', 'ipv4', 'ipv6'
     ]
-    assert isinstance(info, dbus.Dictionary)
+    assert isinstance(info, dict)
     assert sorted(expected_keys) == sorted(info.keys())
 
     ipv4 = info['ipv4']
@@ -456,7 +755,7 @@ def test_generate_wireless_info(wifi):
 
     wifi = info['802-11-wireless']
     assert sorted(['ssid', 'mode']) == sorted(wifi.keys())
-    assert wifi['ssid'] == dbus.ByteArray(dummy_ap.encode('utf-8'))
+    assert wifi['ssid'] == dummy_ap.encode('utf-8')
     assert wifi['mode'] == 'infrastructure'
 
     conn = info['connection']
@@ -554,3 +853,260 @@ def test_handle_wifi_state_change_error(wifi, mocker):
 
     delete_active_conn.assert_called_once()
     exit_loop_mock.assert_called_once_with(msg, error=True)
+
+
+def test_create_row_fields(wifi):
+    ap_data = {
+        'ssid': 'Home',
+        'mode': 'Infra',
+        'rate': '54 Mb/s',
+        'signal': 72,
+        'bars': '***',
+        'dbus_path': '/ap/1'
+    }
+
+    row = wifi._create_row(ap_data, ['signal', 'ssid'])
+
+    assert row == [72, 'Home']
+    assert wifi._get_signal_color(72) == 'yellow'
+
+
+def test_get_best_access_points(wifi, mocker):
+    """
+    Assert the best access points are picked on their raw properties,
+    and only those are decoded.
+    """
+    props = {
+        '/ap/1': {'Strength': 40, 'MaxBitrate': 540000, 'Ssid': [98]},
+        '/ap/2': {'Strength': 90, 'MaxBitrate': 54000, 'Ssid': [99]},
+        '/ap/3': {'Strength': 65, 'MaxBitrate': 270000, 'Ssid': [97]}
+    }
+    mocker.patch.object(wifi, '_scan_access_points', return_value=list(props))
+    mocker.patch.object(
+        wifi,
+        'get_all_properties',
+        side_effect=lambda path, iface: props[path]
+    )
+    extract_mock = mocker.patch.object(
+        wifi,
+        '_extract_ap_info',
+        side_effect=lambda path: path
+    )
+
+    assert wifi._get_best_access_points(2) == ['/ap/2', '/ap/3']
+    assert extract_mock.call_count == 2
+    assert wifi._get_best_access_points(1, 'rate') == ['/ap/1']
+    assert wifi._get_best_access_points(sort='ssid') == ['/ap/3', '/ap/1', '/ap/2']  # noqa E501
+
+    with pytest.raises(ValueError):
+        wifi._get_best_access_points(sort='bars')
+
+
+def test_group_by_ssid(wifi, mocker):
+    """
+    Assert each SSID keeps its strongest access point, ties being
+    broken on the band then the max bitrate, and hidden access
+    points are not grouped.
+    """
+    props = {
+        '/ap/1': {'Ssid': b'office', 'Strength': 60, 'Frequency': 2412, 'MaxBitrate': 54000},  # noqa E501
+        '/ap/2': {'Ssid': b'office', 'Strength': 80, 'Frequency': 2412, 'MaxBitrate': 54000},  # noqa E501
+        '/ap/3': {'Ssid': b'office', 'Strength': 80, 'Frequency': 5180, 'MaxBitrate': 54000},  # noqa E501
+        '/ap/4': {'Ssid': b'guest', 'Strength': 70, 'Frequency': 5180, 'MaxBitrate': 54000},  # noqa E501
+        '/ap/5': {'Ssid': b'guest', 'Strength': 70, 'Frequency': 5180, 'MaxBitrate': 270000},  # noqa E501
+        '/ap/6': {'Ssid': b'', 'Strength': 20, 'Frequency': 2412, 'MaxBitrate': 54000},  # noqa E501
+        '/ap/7': {'Ssid': b'', 'Strength': 30, 'Frequency': 2412, 'MaxBitrate': 54000}  # noqa E501
+    }
+    mocker.patch.object(
+        wifi,
+        'get_all_properties',
+        side_effect=lambda path, iface: props[path]
+    )
+
+    assert wifi._group_by_ssid(list(props)) == {
+        '/ap/3': 3,
+        '/ap/5': 2,
+        '/ap/6': 1,
+        '/ap/7': 1
+    }
+
+
+def test_get_best_access_points_grouped(wifi, mocker):
+    mocker.patch.object(wifi, '_scan_access_points', return_value=['/ap/1', '/ap/2', '/ap/3'])  # noqa E501
+    mocker.patch.object(
+        wifi,
+        '_group_by_ssid',
+        return_value={'/ap/1': 2, '/ap/3': 1}
+    )
+    mocker.patch.object(
+        wifi,
+        'get_all_properties',
+        side_effect=lambda path, iface: {'Strength': int(path[-1])}
+    )
+    mocker.patch.object(
+        wifi,
+        '_extract_ap_info',
+        side_effect=lambda path: AccessPoint(path, path[-1])
+    )
+
+    access_points = wifi._get_best_access_points(group=True)
+
+    assert [(ap.dbus_path, ap.bssids) for ap in access_points] == [
+        ('/ap/3', 1),
+        ('/ap/1', 2)
+    ]
+
+
+def _mock_monitor(wifi, mocker, window=3):
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0'}
+    wifi._ap_devices = {'/ap/1': '/dev/wlan0', '/ap/2': '/dev/wlan0'}
+    wifi._monitor_window = window
+    wifi._monitored = {}
+    wifi._active_aps = {'/dev/wlan0': '/ap/2'}
+    props = {
+        '/ap/1': {'Ssid': b'home', 'HwAddress': '00:00:00:00:00:01', 'Strength': 80},  # noqa E501
+        '/ap/2': {'Ssid': b'work', 'HwAddress': '00:00:00:00:00:02', 'Strength': 40},  # noqa E501
+        '/ap/3': {'Ssid': b'cafe', 'HwAddress': '00:00:00:00:00:03', 'Strength': 60}  # noqa E501
+    }
+    mocker.patch.object(
+        wifi,
+        'get_all_properties',
+        side_effect=lambda path, iface: props[path]
+    )
+    mocker.patch('wypy.wifi.wifi.time.monotonic', side_effect=range(100))
+
+
+def test_monitor_records(wifi, mocker):
+    """
+    Assert the associated access point comes first, then the
+    strongest, with stats over their samples.
+    """
+    _mock_monitor(wifi, mocker)
+    wifi._track_access_point('/ap/1')
+    wifi._track_access_point('/ap/2')
+
+    for strength in (50, 90, 70, 60):
+        wifi._handle_monitor_properties_changed(
+            NM_ACCESS_POINT_IFACE, {'Strength': strength}, [], path='/ap/1'
+        )
+
+    records = wifi._get_monitor_records()
+
+    assert [record['ssid'] for record in records] == ['work', 'home']
+    assert records[0]['active'] is True
+    assert records[1] == {
+        'active': False,
+        'ssid': 'home',
+        'bssid': '00:00:00:00:00:01',
+        'device': 'wlan0',
+        'signal': 60,
+        'min': 60,
+        'avg': 73,
+        'max': 90,
+        'samples': 3
+    }
+
+
+def test_monitor_access_points_added_and_removed(wifi, mocker):
+    _mock_monitor(wifi, mocker)
+    wifi._track_access_point('/ap/1')
+
+    wifi._handle_access_point_added('/dev/wlan0', '/ap/3')
+    assert set(wifi._monitored) == {'/ap/1', '/ap/3'}
+    assert wifi._monitored['/ap/3'][0].device == 'wlan0'
+
+    wifi._handle_access_point_removed('/ap/1')
+    assert set(wifi._monitored) == {'/ap/3'}
+    assert '/ap/1' not in wifi._ap_devices
+
+    # unknown access points and other objects' changes are ignored
+    wifi._handle_monitor_properties_changed(
+        NM_ACCESS_POINT_IFACE, {'Strength': 10}, [], path='/ap/1'
+    )
+    assert set(wifi._monitored) == {'/ap/3'}
+
+
+def test_monitor_access_point_added_after_snapshot(wifi, mocker):
+    """
+    Assert an access point appearing once the snapshot is loaded
+    is read live and monitored, and one vanishing before that
+    is ignored.
+    """
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0'}
+    wifi._ap_devices = {}
+    wifi._monitor_window = 3
+    wifi._monitored = {}
+    iface_mock = mocker.patch.object(wifi, 'get_interface')
+    iface_mock.return_value.GetManagedObjects.return_value = {
+        '/ap/1': {NM_ACCESS_POINT_IFACE: {
+            'Ssid': b'home', 'HwAddress': '00:00:00:00:00:01', 'Strength': 80
+        }}
+    }
+    wifi.load_snapshot()
+    iface_mock.return_value.GetAll.return_value = {
+        'Ssid': b'cafe', 'HwAddress': '00:00:00:00:00:03', 'Strength': 60
+    }
+
+    wifi._handle_access_point_added('/dev/wlan0', '/ap/3')
+
+    access_point, history = wifi._monitored['/ap/3']
+    assert (access_point.ssid, access_point.device) == ('cafe', 'wlan0')
+    assert history.latest == 60
+    iface_mock.return_value.GetAll.assert_called_once_with(
+        NM_ACCESS_POINT_IFACE
+    )
+
+    iface_mock.return_value.GetAll.side_effect = wifi.dbus_exception(
+        'No such object path /ap/4'
+    )
+    wifi._handle_access_point_added('/dev/wlan0', '/ap/4')
+    assert set(wifi._monitored) == {'/ap/3'}
+
+
+def test_monitor_active_access_point_changed(wifi, mocker):
+    _mock_monitor(wifi, mocker)
+
+    wifi._handle_monitor_properties_changed(
+        NM_WIRELESS_IFACE, {'ActiveAccessPoint': '/ap/1'}, [], path='/dev/wlan0'  # noqa E501
+    )
+    wifi._handle_monitor_properties_changed(
+        NM_WIRELESS_IFACE, {'ActiveAccessPoint': '/ap/3'}, [], path='/dev/eth0'  # noqa E501
+    )
+
+    assert wifi._active_aps == {'/dev/wlan0': '/ap/1'}
+
+
+def test_monitor(wifi, mocker):
+    """
+    Assert monitor subscribes to the signals, renders, and removes
+    its subscriptions and timers once done.
+    """
+    wifi.wifi_devices = {'/dev/wlan0': 'wlan0'}
+    mocker.patch.object(
+        wifi,
+        'get_all_properties',
+        return_value={'ActiveAccessPoint': '/ap/1'}
+    )
+    mocker.patch.object(wifi, '_list_ap_paths', return_value=['/ap/1'])
+    mocker.patch.object(wifi, 'prefetch_all_properties')
+    track = mocker.patch.object(wifi, '_track_access_point')
+    render = mocker.patch.object(wifi, '_render_monitor')
+    loop = mocker.Mock()
+    mocker.patch.object(wifi, 'create_main_loop', return_value=loop)
+    mocker.patch.object(wifi, 'timeout_add', side_effect=[1, 2])
+    source_remove = mocker.patch.object(wifi, 'source_remove')
+    wifi.bus = bus = mocker.Mock()
+    proxy = mocker.Mock()
+    mocker.patch.object(wifi, 'get_proxy', return_value=proxy)
+
+    wifi.monitor(window=5, interval=2, duration=10)
+
+    track.assert_called_once_with('/ap/1')
+    render.assert_called_once_with(None)
+    loop.run.assert_called_once()
+    assert wifi._active_aps == {'/dev/wlan0': '/ap/1'}
+    assert wifi.timeout_add.call_args_list[0][0][0] == 2
+    assert wifi.timeout_add.call_args_list[1][0][0] == 10
+    bus.add_signal_receiver.return_value.remove.assert_called_once()
+    assert proxy.connect_to_signal.return_value.remove.call_count == 2
+    assert source_remove.call_args_list == [call(1), call(2)]
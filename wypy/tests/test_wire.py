@@ -0,0 +1,373 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import pytest
+from wypy.wire import WireBus, WireError, marshal, unmarshal, Variant
+from wypy.wire.marshal import guess_signature
+from wypy.wire.message import (
+    Message,
+    METHOD_CALL,
+    METHOD_RETURN,
+    ERROR,
+    SIGNAL
+)
+
+
+class FakeBus(object):
+    """
+    A minimal message bus, serving a single client on a unix socket.
+    `handler` is called with every method call and returns the
+    messages to send back.
+    """
+
+    def __init__(self, path, handler):
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(1)
+        self.handler = handler
+        self.calls = []
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        conn, _ = self.server.accept()
+        buf = bytearray()
+
+        while b'\r\n' not in buf:
+            buf += conn.recv(4096)
+        assert buf.startswith(b'\0AUTH EXTERNAL ')
+        conn.sendall(b'OK 1234deadbeef\r\n')
+        buf = bytearray()
+        while b'BEGIN\r\n' not in buf:
+            buf += conn.recv(4096)
+        buf = buf[buf.index(b'BEGIN\r\n') + 7:]
+
+        serial = 1000
+        while True:
+            length = Message.get_length(buf)
+            if length is None or length > len(buf):
+                data = conn.recv(4096)
+                if not data:
+                    return
+                buf += data
+                continue
+            message = Message.decode(memoryview(bytes(buf[:length])))
+            del buf[:length]
+            self.calls.append(message)
+            for reply in self.handler(message):
+                serial += 1
+                reply.serial = serial
+                conn.sendall(reply.encode())
+
+
+def reply_to(message, signature=None, body=()):
+    return Message(
+        METHOD_RETURN,
+        reply_serial=message.serial,
+        signature=signature,
+        body=body
+    )
+
+
+def default_handler(message):
+    if message.member == 'Hello':
+        return [reply_to(message, 's', [':1.42'])]
+    if message.member in ('AddMatch', 'RemoveMatch'):
+        return [reply_to(message)]
+    if message.member == 'Get':
+        return [reply_to(message, 'v', [Variant('u', 70)])]
+    if message.member == 'GetAll':
+        return [reply_to(message, 'a{sv}', [{
+            'Interface': 'wlan0',
+            'Ssid': Variant('ay', b'home'),
+            'Devices': Variant('ao', ['/dev/1'])
+        }])]
+    if message.member == 'Fail':
+        return [Message(
+            ERROR,
+            reply_serial=message.serial,
+            error_name='org.freedesktop.DBus.Error.UnknownMethod',
+            signature='s',
+            body=['No such method']
+        )]
+    if message.member == 'Emit':
+        return [
+            Message(
+                SIGNAL,
+                path='/dev/1',
+                interface='org.example.Device',
+                member='StateChanged',
+                signature='uuu',
+                body=[100, 30, 0]
+            ),
+            reply_to(message)
+        ]
+    return [reply_to(message)]
+
+
+@pytest.fixture
+def bus(tmp_path):
+    path = str(tmp_path / 'bus.sock')
+    fake = FakeBus(path, default_handler)
+    bus = WireBus(address=f'unix:path={path}', timeout=5)
+    bus.fake = fake
+    yield bus
+    bus.close()
+
+
+@pytest.mark.parametrize('signature, values', [
+    ('ybnqiuxtd', [1, True, -2, 3, -4, 5, -6, 7, 1.5]),
+    ('sog', ['hello', '/org/freedesktop', 'a{sv}']),
+    ('ay', [b'\x00\x01binary']),
+    ('as', [['a', 'bc', '']]),
+    ('a{sv}', [{'a': 1, 'b': 'two', 'c': [1, 2]}]),
+    ('a{sa{sv}}', [{'connection': {'id': 'home', 'autoconnect': False}}]),
+    ('(iat)', [(1, [2, 3])]),
+    ('aai', [[[], [1], [2, 3]]])
+])
+def test_marshal_round_trip(signature, values):
+    assert unmarshal(signature, marshal(signature, values)) == values
+
+
+def test_marshal_alignment():
+    data = marshal('yt', [1, 2])
+
+    # the uint64 is aligned on an 8 byte boundary
+    assert len(data) == 16
+    assert data[:8] == b'\x01' + b'\x00' * 7
+
+
+def test_marshal_big_endian():
+    data = marshal('u', [1], endian='B')
+
+    assert bytes(data) == b'\x00\x00\x00\x01'
+    assert unmarshal('u', data, endian='B') == [1]
+
+
+def test_marshal_wrong_number_of_values():
+    with pytest.raises(TypeError):
+        marshal('ss', ['only one'])
+
+
+def test_guess_signature():
+    assert guess_signature(True) == 'b'
+    assert guess_signature(1) == 'i'
+    assert guess_signature(2**40) == 'x'
+    assert guess_signature('text') == 's'
+    assert guess_signature(b'raw') == 'ay'
+    assert guess_signature({'key': 1}) == 'a{sv}'
+    assert guess_signature(['a']) == 'as'
+    assert guess_signature(Variant('o', '/path')) == 'o'
+
+
+def test_message_round_trip():
+    message = Message(
+        METHOD_CALL,
+        7,
+        destination='org.freedesktop.NetworkManager',
+        path='/org/freedesktop/NetworkManager',
+        interface='org.freedesktop.DBus.Properties',
+        member='Get',
+        signature='ss',
+        body=['org.freedesktop.NetworkManager', 'State']
+    )
+    data = message.encode()
+
+    assert Message.get_length(data) == len(data)
+    assert Message.get_length(data[:10]) is None
+
+    decoded = Message.decode(memoryview(data))
+
+    assert decoded.serial == 7
+    assert decoded.member == 'Get'
+    assert decoded.path == '/org/freedesktop/NetworkManager'
+    assert decoded.body == ['org.freedesktop.NetworkManager', 'State']
+
+
+def test_bus_hello(bus):
+    assert bus.get_unique_name() == ':1.42'
+    assert bus.fake.calls[0].member == 'Hello'
+
+
+def test_bus_get_property(bus):
+    proxy = bus.get_object('org.freedesktop.NetworkManager', '/nm')
+
+    result = proxy.Get(
+        'org.freedesktop.NetworkManager',
+        'State',
+        dbus_interface='org.freedesktop.DBus.Properties',
+        signature='ss'
+    )
+
+    assert result == 70
+    call = bus.fake.calls[-1]
+    assert call.destination == 'org.freedesktop.NetworkManager'
+    assert call.path == '/nm'
+    assert call.signature == 'ss'
+
+
+def test_bus_get_all_properties(bus):
+    proxy = bus.get_object('org.freedesktop.NetworkManager', '/dev/1')
+    get_all = proxy.get_dbus_method(
+        'GetAll',
+        'org.freedesktop.DBus.Properties'
+    )
+
+    props = get_all('org.freedesktop.NetworkManager.Device')
+
+    assert props == {
+        'Interface': 'wlan0',
+        'Ssid': b'home',
+        'Devices': ['/dev/1']
+    }
+    assert bus.fake.calls[-1].signature == 's'
+
+
+def test_bus_error_reply(bus):
+    proxy = bus.get_object('org.freedesktop.NetworkManager', '/nm')
+
+    with pytest.raises(WireError) as exc:
+        proxy.Fail()
+
+    assert exc.value.get_dbus_name() == 'org.freedesktop.DBus.Error.UnknownMethod'  # noqa E501
+    assert exc.value.get_dbus_message() == 'No such method'
+
+
+def test_bus_async_calls(bus):
+    proxy = bus.get_object('org.freedesktop.NetworkManager', '/nm')
+    loop = bus.create_main_loop()
+    replies, errors = [], []
+
+    def on_reply(value):
+        replies.append(value)
+        if len(replies) + len(errors) == 2:
+            loop.quit()
+
+    def on_error(exc):
+        errors.append(exc)
+        if len(replies) + len(errors) == 2:
+            loop.quit()
+
+    proxy.Get('a', 'b', reply_handler=on_reply, error_handler=on_error)
+    proxy.Fail(reply_handler=on_reply, error_handler=on_error)
+    bus.timeout_add(5000, loop.quit)
+    loop.run()
+
+    assert replies == [70]
+    assert len(errors) == 1
+
+
+def test_bus_signals(bus):
+    proxy = bus.get_object('org.freedesktop.NetworkManager', '/dev/1')
+    loop = bus.create_main_loop()
+    received = []
+
+    def on_state_changed(new_state, old_state, reason):
+        received.append((new_state, old_state, reason))
+        loop.quit()
+
+    match = proxy.connect_to_signal(
+        'StateChanged',
+        on_state_changed,
+        'org.example.Device'
+    )
+    assert bus.fake.calls[-1].member == 'AddMatch'
+    assert "member='StateChanged'" in bus.fake.calls[-1].body[0]
+
+    # the signal arrives while waiting for Emit's reply,
+    # it is queued and dispatched by the main loop.
+    proxy.Emit()
+    loop.run()
+
+    assert received == [(100, 30, 0)]
+
+    match.remove()
+    assert bus.fake.calls[-1].member == 'RemoveMatch'
+
+
+def test_bus_timers(bus):
+    loop = bus.create_main_loop()
+    ticks = []
+
+    def tick():
+        ticks.append(1)
+        if len(ticks) == 3:
+            loop.quit()
+            return False
+        return True
+
+    removed = bus.timeout_add(1, lambda: ticks.append('removed'))
+    bus.source_remove(removed)
+    bus.timeout_add(1, tick)
+    loop.run()
+
+    assert ticks == [1, 1, 1]
+
+
+def test_bus_no_server(tmp_path):
+    path = os.path.join(str(tmp_path), 'missing.sock')
+
+    with pytest.raises(WireError) as exc:
+        WireBus(address=f'unix:path={path}')
+
+    assert exc.value.get_dbus_name() == 'org.freedesktop.DBus.Error.NoServer'
+
+
+def network_manager_handler(message):
+    """
+    Answers as a NetworkManager knowing one device, eth0,
+    which refuses to be looked up by name or disconnected.
+    """
+    if message.member == 'GetManagedObjects':
+        return [reply_to(message, 'a{oa{sa{sv}}}', [{
+            '/dev/1': {
+                'org.freedesktop.NetworkManager.Device': {
+                    'Interface': Variant('s', 'eth0'),
+                    'DeviceType': Variant('u', 1),
+                    'State': Variant('u', 30)
+                }
+            }
+        }])]
+    if message.member in ('GetDeviceByIpIface', 'Disconnect'):
+        return [Message(
+            ERROR,
+            reply_serial=message.serial,
+            error_name='org.freedesktop.NetworkManager.UnknownDevice',
+            signature='s',
+            body=['No device found']
+        )]
+    return default_handler(message)
+
+
+def test_wire_backend_without_dbus(tmp_path):
+    """
+    Assert the wire backend runs, d-bus errors included,
+    with dbus-python and gi unavailable.
+    """
+    path = str(tmp_path / 'bus.sock')
+    FakeBus(path, network_manager_handler)
+    script = (
+        "import sys; sys.modules['dbus'] = sys.modules['gi'] = None; "
+        "from wypy.cli import cli; cli(sys.argv[1:])"
+    )
+    env = dict(
+        os.environ,
+        DBUS_SYSTEM_BUS_ADDRESS=f'unix:path={path}',
+        WYPY_DAEMON_SOCKET=''
+    )
+
+    result = subprocess.run(
+        [sys.executable, '-c', script,
+         '--backend', 'wire', 'device', 'disconnect', 'eth0'],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        timeout=30
+    )
+
+    assert 'Traceback' not in result.stderr, result.stderr
+    assert result.returncode == 1
+    assert 'Could not disconnect eth0' in result.stderr
@@ -1,4 +1,16 @@
+import pytest
 from termcolor import colored
+from dbus.exceptions import DBusException
+from wypy.wypy import WyPy
+from wypy.utils.constants import NM_DEVICE_IFACE, NM_WIRELESS_IFACE
+
+snapshot = {
+    '/dev/1': {NM_DEVICE_IFACE: {'Interface': 'eth0'}},
+    '/dev/2': {
+        NM_DEVICE_IFACE: {'Interface': 'wlan0'},
+        NM_WIRELESS_IFACE: {'Bitrate': 0}
+    }
+}
 
 
 def test_translate_status_code_connectivity(wypy):
@@ -69,3 +81,218 @@ def test_translate_status_code_state(wypy):
     result = wypy.translate_status_code(prop, 0)
     assert result == colored('unknown', 'red')
 
+
+
+def test_load_snapshot(wypy, mocker):
+    """
+    Assert WyPy.load_snapshot fetches the object tree in
+    a single GetManagedObjects call and keeps it in memory.
+    """
+    iface_mock = mocker.patch.object(wypy, 'get_interface')
+    iface_mock.return_value.GetManagedObjects.return_value = snapshot
+
+    result = wypy.load_snapshot()
+
+    iface_mock.assert_called_once()
+    iface_mock.return_value.GetManagedObjects.assert_called_once_with()
+    assert result == snapshot
+    assert wypy.snapshot == snapshot
+
+
+def test_get_all_properties_from_snapshot(wypy, mocker):
+    """
+    Assert WyPy.get_all_properties reads from the snapshot
+    without touching the bus once it is loaded.
+    """
+    iface_mock = mocker.patch.object(wypy, 'get_interface')
+    iface_mock.return_value.GetManagedObjects.return_value = snapshot
+    wypy.load_snapshot()
+    iface_mock.reset_mock()
+
+    result = wypy.get_all_properties('/dev/2', NM_DEVICE_IFACE)
+
+    assert result == {'Interface': 'wlan0'}
+    iface_mock.assert_not_called()
+
+    with pytest.raises(DBusException):
+        wypy.get_all_properties('/', NM_DEVICE_IFACE)
+    iface_mock.assert_not_called()
+
+
+def test_get_all_properties_snapshot_miss(wypy, mocker):
+    """
+    Assert objects added after the snapshot was taken are read live.
+    """
+    iface_mock = mocker.patch.object(wypy, 'get_interface')
+    iface_mock.return_value.GetManagedObjects.return_value = snapshot
+    wypy.load_snapshot()
+    iface_mock.return_value.GetAll.return_value = {'Interface': 'wlan1'}
+
+    result = wypy.get_all_properties('/dev/3', NM_DEVICE_IFACE)
+
+    assert result == {'Interface': 'wlan1'}
+    iface_mock.return_value.GetAll.assert_called_once_with(NM_DEVICE_IFACE)
+    assert wypy.get_all_properties('/dev/3', NM_DEVICE_IFACE) == result
+    iface_mock.return_value.GetAll.assert_called_once()
+
+
+def test_get_snapshot_paths(wypy):
+    wypy.snapshot = snapshot
+    assert wypy.get_snapshot_paths(NM_DEVICE_IFACE) == ['/dev/1', '/dev/2']
+    assert wypy.get_snapshot_paths(NM_WIRELESS_IFACE) == ['/dev/2']
+
+
+def test_get_all_properties_memoized(wypy, mocker):
+    """
+    Assert WyPy.get_all_properties fetches each (path, interface)
+    pair only once and keeps count of cache hits and misses.
+    """
+    iface_mock = mocker.patch.object(wypy, 'get_interface')
+    iface_mock.return_value.GetAll.return_value = {'Interface': 'eth0'}
+
+    for _ in range(3):
+        result = wypy.get_all_properties('/dev/1', NM_DEVICE_IFACE)
+
+    wypy.get_all_properties('/dev/2', NM_DEVICE_IFACE)
+
+    assert result == {'Interface': 'eth0'}
+    assert iface_mock.return_value.GetAll.call_count == 2
+    assert wypy.cache_misses == 2
+    assert wypy.cache_hits == 2
+
+
+def test_get_object_property_memoized(wypy, mocker):
+    """
+    Assert WyPy.get_object_property is answered from the cache,
+    and that setting the property invalidates it.
+    """
+    proxy = mocker.Mock(object_path='/dev/1')
+    proxy.Get.return_value = True
+
+    wypy.get_object_property(proxy=proxy, prop_name='Managed')
+    result = wypy.get_object_property(proxy=proxy, prop_name='Managed')
+
+    assert result is True
+    proxy.Get.assert_called_once()
+    assert (wypy.cache_hits, wypy.cache_misses) == (1, 1)
+
+    wypy.set_object_property(proxy=proxy, prop_name='Managed', value=False)
+    wypy.get_object_property(proxy=proxy, prop_name='Managed')
+
+    assert proxy.Get.call_count == 2
+    assert wypy.cache_misses == 2
+
+
+def test_get_proxy(wypy, mocker):
+    """
+    Assert WyPy.get_proxy skips introspection and caches
+    proxies by object path.
+    """
+    get_obj_mock = mocker.patch.object(wypy.bus, 'get_object')
+
+    first = wypy.get_proxy('/dev/1')
+    second = wypy.get_proxy('/dev/1')
+
+    assert first is second
+    get_obj_mock.assert_called_once_with(
+        wypy.bus_name,
+        '/dev/1',
+        introspect=False
+    )
+
+
+def test_backend_selection(monkeypatch, mocker):
+    """
+    Assert the backend comes from the argument, then WYPY_BACKEND,
+    and that the wire backend opens a pure-python connection.
+    """
+    monkeypatch.setenv('WYPY_BACKEND', 'wire')
+    assert WyPy().backend == 'wire'
+    assert WyPy(backend='dbus').backend == 'dbus'
+
+    with pytest.raises(ValueError):
+        WyPy(backend='nope')
+
+    system_bus_mock = mocker.patch('wypy.wire.SystemBus')
+    wypy = WyPy()
+
+    assert wypy.bus is system_bus_mock.return_value
+    assert wypy.create_main_loop() is wypy.bus.create_main_loop.return_value
+    wypy.timeout_add(1.5, print)
+    wypy.bus.timeout_add.assert_called_once_with(1500, print)
+
+
+def fake_async_interface(mocker, replies):
+    """
+    Returns a get_interface mock whose methods answer
+    through their reply / error handlers.
+    """
+    def call(*args, reply_handler, error_handler, timeout):
+        reply = replies[args[0]]
+        if isinstance(reply, Exception):
+            error_handler(reply)
+        else:
+            reply_handler(reply)
+
+    iface = mocker.Mock()
+    iface.GetAll.side_effect = call
+    return iface
+
+
+def test_call_many(wypy, mocker):
+    """
+    Assert WyPy.call_many returns the replies in input order,
+    whatever the concurrency cap.
+    """
+    replies = {'a': {'Id': 'a'}, 'b': {'Id': 'b'}, 'c': {'Id': 'c'}}
+    iface = fake_async_interface(mocker, replies)
+    iface_mock = mocker.patch.object(wypy, 'get_interface', return_value=iface)
+    calls = [
+        (f'/obj/{arg}', 'org.freedesktop.DBus.Properties', 'GetAll', (arg,))
+        for arg in ['c', 'a', 'b']
+    ]
+
+    result = wypy.call_many(calls, max_in_flight=1)
+
+    assert result == [{'Id': 'c'}, {'Id': 'a'}, {'Id': 'b'}]
+    assert iface_mock.call_count == 3
+    assert wypy.call_many([]) == []
+
+
+def test_call_many_errors(wypy, mocker):
+    error = DBusException('gone')
+    iface = fake_async_interface(mocker, {'a': {'Id': 'a'}, 'b': error})
+    mocker.patch.object(wypy, 'get_interface', return_value=iface)
+    calls = [
+        ('/obj/a', 'org.freedesktop.DBus.Properties', 'GetAll', ('a',)),
+        ('/obj/b', 'org.freedesktop.DBus.Properties', 'GetAll', ('b',))
+    ]
+
+    with pytest.raises(DBusException):
+        wypy.call_many(calls)
+
+    result = wypy.call_many(calls, return_exceptions=True)
+    assert result == [{'Id': 'a'}, error]
+
+
+def test_prefetch_all_properties(wypy, mocker):
+    """
+    Assert WyPy.prefetch_all_properties only fetches uncached
+    objects, in a single call_many, and caches the results.
+    """
+    call_many_mock = mocker.patch.object(
+        wypy,
+        'call_many',
+        return_value=[{'Interface': 'eth0'}, DBusException('gone')]
+    )
+    wypy._properties_cache[('/dev/0', NM_DEVICE_IFACE)] = {}
+
+    wypy.prefetch_all_properties(
+        ['/dev/0', '/dev/1', '/', '/dev/2', '/dev/1'],
+        NM_DEVICE_IFACE
+    )
+
+    calls = call_many_mock.call_args[0][0]
+    assert [c[0] for c in calls] == ['/dev/1', '/dev/2']
+    assert wypy.get_all_properties('/dev/1', NM_DEVICE_IFACE) == {'Interface': 'eth0'}  # noqa E501
+    assert ('/dev/2', NM_DEVICE_IFACE) not in wypy._properties_cache
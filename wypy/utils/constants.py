@@ -3,6 +3,14 @@ NM_BUS_NAME = 'org.freedesktop.NetworkManager'
 
 NM_OBJ_PATH = '/org/freedesktop/NetworkManager'
 
+NM_OBJ_MANAGER_PATH = '/org/freedesktop'
+
+DBUS_BUS_NAME = 'org.freedesktop.DBus'
+DBUS_OBJ_PATH = '/org/freedesktop/DBus'
+DBUS_IFACE = 'org.freedesktop.DBus'
+DBUS_PROPERTIES_IFACE = 'org.freedesktop.DBus.Properties'
+DBUS_OBJ_MANAGER_IFACE = 'org.freedesktop.DBus.ObjectManager'
+
 NM_SETTINGS_OBJ_PATH = '/org/freedesktop/NetworkManager/Settings'
 NM_SETTINGS_IFACE = 'org.freedesktop.NetworkManager.Settings'
 
@@ -22,6 +30,47 @@ NM_ACCESS_POINT_IFACE = 'org.freedesktop.NetworkManager.AccessPoint'
 
 NM_CONNECTION_STATE_ACTIVATED = 2
 
+# Concurrency cap and timeout (in seconds) used when fanning out
+# asynchronous d-bus calls.
+DBUS_MAX_IN_FLIGHT = 64
+DBUS_CALL_TIMEOUT = 25
+
+# Socket file name of `wypy daemon`, in $XDG_RUNTIME_DIR, and how long
+# (in seconds) commands wait for its answer before using d-bus directly.
+DAEMON_SOCKET_NAME = 'wypy.sock'
+DAEMON_TIMEOUT = 1
+
+# How long (in seconds) to wait for a requested wifi scan to complete,
+# and, with NetworkManager versions whose wireless devices have no
+# LastScan property, for access points to stop being added or removed.
+SCAN_TIMEOUT = 15
+SCAN_SETTLE_TIME = 1
+
+# How many signal strength samples `wifi monitor` keeps per access
+# point, and how often (in seconds) it refreshes its view.
+MONITOR_WINDOW = 60
+MONITOR_INTERVAL = 1
+
+# 'dbus' talks to the bus through dbus-python, 'wire' through wypy's own
+# implementation of the d-bus wire protocol (see wypy.wire).
+BACKENDS = ('dbus', 'wire')
+
+# 'table' is meant to be read, the others to be parsed: their records
+# hold plain values and are written as soon as they are built.
+OUTPUT_FORMATS = ('table', 'json', 'ndjson', 'csv')
+
+# Rows wypy.utils.table.Table.stream reads to size the columns
+# before writing anything.
+TABLE_STREAM_SAMPLE = 100
+
+# Width of a canonical UUID string, and the longest network
+# interface name the kernel accepts (IFNAMSIZ - 1).
+UUID_WIDTH = 36
+IFNAME_WIDTH = 15
+
+# The longest SSID 802.11 allows, in bytes.
+SSID_MAX_BYTES = 32
+
 DBUS_GENERAL_PROPS = {
     'Connectivity': 'CONNECTIVITY',
     'State': 'STATE',
@@ -30,3 +79,59 @@ DBUS_GENERAL_PROPS = {
     'WirelessHardwareEnabled': 'WIFI-HW',
     'WwanHardwareEnabled': 'WWAN-HW'
 }
+
+# The columns each listing can show, in display order, as
+# accepted by --fields.
+DEVICE_STATUS_FIELDS = ['device', 'type', 'state', 'connection']
+DEVICE_DETAILS_FIELDS = [
+    'name',
+    'type',
+    'device_status',
+    'connection',
+    'state',
+    'connection_path',
+    'device_path',
+    'mtu'
+]
+DEVICE_IP4_FIELDS = [
+    'ipv4_addresses',
+    'ipv4_dns',
+    'ipv4_gateway',
+    'ipv4_domains'
+]
+CONNECTION_FIELDS = ['name', 'uuid', 'type', 'device']
+ACCESS_POINT_FIELDS = ['ssid', 'mode', 'rate', 'signal', 'bars', 'device']
+ACCESS_POINT_BSSID_FIELDS = ['bssid', 'band']
+# `wifi list --group` shows the best BSSID of each SSID and how many
+# BSSIDs the SSID has.
+ACCESS_POINT_GROUP_FIELDS = [
+    'ssid',
+    'bssid',
+    'band',
+    'rate',
+    'signal',
+    'bars',
+    'bssids',
+    'device'
+]
+
+# Wifi bands, by the lowest frequency (in MHz) they start at. Higher
+# bands rank better when picking the best BSSID of an SSID.
+WIFI_BANDS = [(2400, '2.4 GHz'), (4900, '5 GHz'), (5925, '6 GHz')]
+
+# What `wifi list --sort` orders access points on.
+ACCESS_POINT_SORTS = ['signal', 'rate', 'ssid']
+
+# Columns of `wifi monitor`: the access point, its latest signal
+# strength, and the lowest, average and highest over its samples.
+MONITOR_FIELDS = [
+    'active',
+    'ssid',
+    'bssid',
+    'device',
+    'signal',
+    'min',
+    'avg',
+    'max',
+    'samples'
+]
@@ -0,0 +1,101 @@
+import json
+import os
+import socket
+import stat
+from wypy.utils.constants import DAEMON_SOCKET_NAME, DAEMON_TIMEOUT
+
+
+def get_socket_path():
+    """
+    Returns the path of the `wypy daemon` socket.
+    It can be set with WYPY_DAEMON_SOCKET, an empty value
+    stops commands from using the daemon.
+    It is only looked for in XDG_RUNTIME_DIR, never in a directory
+    other users can write to.
+
+    Returns:
+        string -- the socket's path, empty if there is none
+    """
+    if 'WYPY_DAEMON_SOCKET' in os.environ:
+        return os.environ['WYPY_DAEMON_SOCKET']
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, DAEMON_SOCKET_NAME)
+    return ''
+
+
+def is_trusted_socket(socket_path):
+    """
+    Tells whether `socket_path` is a socket the daemon could have
+    created for the current user: owned by them, and neither
+    readable nor writable by anyone else.
+
+    Arguments:
+        socket_path {string} -- the socket's path
+
+    Returns:
+        bool -- whether its responses can be trusted
+    """
+    try:
+        info = os.stat(socket_path)
+    except OSError:
+        return False
+
+    return (
+        stat.S_ISSOCK(info.st_mode)
+        and info.st_uid == os.geteuid()
+        and info.st_mode & 0o077 == 0
+    )
+
+
+def encode(data):
+    """
+    Serialises a daemon request / response as one line of JSON.
+    Byte arrays (e.g. SSIDs) are sent as lists of integers.
+    """
+    return json.dumps(
+        data,
+        separators=(',', ':'),
+        default=lambda value: list(value)
+    ).encode('utf-8') + b'\n'
+
+
+def request(method, socket_path=None, timeout=DAEMON_TIMEOUT):
+    """
+    Sends a request to the daemon and returns its response.
+    Sockets which fail is_trusted_socket are never connected to.
+
+    Arguments:
+        method {string} -- 'ping' or 'snapshot'
+
+    Keyword Arguments:
+        socket_path {string} -- (default: {get_socket_path()})
+        timeout {int} -- seconds to wait for the response
+
+    Returns:
+        dict -- the daemon's response, or None if it is not running
+    """
+    socket_path = socket_path or get_socket_path()
+    if not socket_path or not is_trusted_socket(socket_path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(encode({'method': method}))
+            with sock.makefile('rb') as response:
+                data = json.loads(response.readline())
+    except (OSError, ValueError):
+        return None
+
+    return data if data.get('ok') else None
+
+
+def fetch_snapshot(socket_path=None):
+    """
+    Returns the NetworkManager object tree kept by the daemon,
+    in the format of GetManagedObjects, or None if it is not running.
+    """
+    response = request('snapshot', socket_path)
+    return response['snapshot'] if response else None
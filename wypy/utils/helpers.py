@@ -1,5 +1,106 @@
-from collections import MutableMapping
+import click
+import importlib
+from collections.abc import MutableMapping
 from uuid import UUID
+from wypy.utils.profiler import profiler
+
+
+class lazy_property(object):
+    """
+    Turns a method into an attribute computed on first access.
+    The result is stored on the instance, so the method only
+    runs once and the attribute can still be overridden.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.func(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+class LazySubsystem(object):
+    """
+    Stands in for a WyPy subsystem, given as a 'module:class' string.
+    The module is only imported, and the subsystem created, when one
+    of its attributes is first used: `wypy <group> <command> --help`
+    never loads dbus.
+    """
+
+    def __init__(self, path, **kwargs):
+        self._path = path
+        self._kwargs = kwargs
+        self._instance = None
+
+    def __getattr__(self, name):
+        if self._instance is None:
+            module_name, class_name = self._path.split(':')
+            with profiler.measure(f'import {module_name}', 'import'):
+                module = importlib.import_module(module_name)
+            with profiler.measure(f'{class_name}.__init__'):
+                self._instance = getattr(module, class_name)(**self._kwargs)
+        return getattr(self._instance, name)
+
+
+def lazy_exports(package, exports):
+    """
+    Builds a module level `__getattr__` (PEP 562) for a package whose
+    names are only imported on first access, so that importing the
+    cli's commands modules does not load dbus.
+
+    Arguments:
+        package {str} -- the package's `__name__`
+        exports {dict} -- names mapped to their 'module:attribute'
+        strings, with modules relative to the package
+
+    Returns:
+        function -- the package's `__getattr__`
+    """
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')  # noqa E501
+        module_name, attribute = exports[name].split(':')
+        module = importlib.import_module(module_name, package)
+        return getattr(module, attribute)
+    return __getattr__
+
+
+def fields_option(fields):
+    """
+    Returns a --fields option letting the user pick the columns
+    a command shows among `fields`, as a comma separated list.
+    The command receives the chosen fields as a list, in the given
+    order, or None when the option is not used.
+
+    Arguments:
+        fields {list} -- the command's columns
+
+    Returns:
+        function -- the click option decorator
+    """
+    def parse_fields(ctx, param, value):
+        if value is None:
+            return None
+        chosen = [field.strip().lower() for field in value.split(',')]
+        unknown = [field for field in chosen if field not in fields]
+        if unknown:
+            raise click.BadParameter(
+                f'choose among {", ".join(fields)}, got "{value}"'
+            )
+        return chosen
+
+    return click.option(
+        '--fields',
+        callback=parse_fields,
+        metavar='FIELD,...',
+        help=f'Columns to show, among: {", ".join(fields)}.'
+    )
 
 
 def flatten(d, parent_key='', sep='.'):
@@ -56,6 +157,31 @@ def format_list(data_list, key='address'):
     return ' - '.join(ips)
 
 
+def echo_table(table):
+    """
+    Renders a table and echos it to the user.
+    The rendering time is recorded by the profiler as output formatting.
+
+    Arguments:
+        table {Table} -- the table to display
+    """
+    with profiler.measure('output.format'):
+        text = str(table)
+    click.echo(text)
+
+
+def echo_lines(lines):
+    """
+    Echos lines to the user as they are produced,
+    such as those of Table.stream.
+
+    Arguments:
+        lines {iterable} -- the lines to display
+    """
+    for line in lines:
+        click.echo(line)
+
+
 def format_table_key(key):
     """
     Accepts a string as the only argument
@@ -0,0 +1,54 @@
+from functools import partial
+from wypy.utils.profiler import profiler
+from wypy.utils.signatures import get_method_signature
+
+
+class StaticInterface(object):
+    """
+    An interface on a proxy, like dbus.Interface, whose methods are
+    called with the signature found in NM_METHOD_SIGNATURES, so that
+    the underlying proxy never needs to be introspected.
+    Unknown methods fall back to the backend's signature guessing.
+    Calls are recorded by the profiler when `--profile` is given.
+
+    It works with the proxies of both backends, and does not import
+    dbus-python itself.
+    """
+
+    def __init__(self, proxy_object, dbus_interface):
+        self.proxy_object = proxy_object
+        self.dbus_interface = dbus_interface
+
+    @property
+    def object_path(self):
+        return self.proxy_object.object_path
+
+    @property
+    def bus_name(self):
+        return self.proxy_object.bus_name
+
+    def connect_to_signal(self, signal_name, handler_function,
+                          dbus_interface=None, **keywords):
+        return self.proxy_object.connect_to_signal(
+            signal_name,
+            handler_function,
+            dbus_interface or self.dbus_interface,
+            **keywords
+        )
+
+    def get_dbus_method(self, member, dbus_interface=None):
+        iface_name = dbus_interface or self.dbus_interface
+        method = self.proxy_object.get_dbus_method(member, iface_name)
+        signature = get_method_signature(iface_name, member)
+
+        if signature is not None:
+            method = partial(method, signature=signature)
+        return profiler.wrap_method(iface_name, member, method, signature)
+
+    def __getattr__(self, member):
+        if member.startswith('__') and member.endswith('__'):
+            raise AttributeError(member)
+        return self.get_dbus_method(member)
+
+    def __repr__(self):
+        return f'<StaticInterface {self.proxy_object!r} implementing {self.dbus_interface!r}>'  # noqa E501
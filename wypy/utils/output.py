@@ -0,0 +1,124 @@
+import csv
+import json
+import click
+from wypy.utils.profiler import profiler
+
+
+class RecordWriter(object):
+    """
+    Writes records, dictionaries of plain values, to stdout as soon
+    as they are given. Records are never kept once written, so the
+    memory used does not depend on how many are output.
+
+    Writers are context managers, the output is completed on exit.
+    """
+
+    def __init__(self, fields=None, stream=None):
+        """
+        Keyword Arguments:
+            fields {list} -- the keys to write, in order
+            (default: {None}, those of each record)
+            stream {file} -- where to write (default: {None}, stdout)
+        """
+        self.fields = fields
+        self.stream = stream or click.get_text_stream('stdout')
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, record):
+        """
+        Writes one record.
+
+        Arguments:
+            record {dict} -- the record's keys mapped to their value
+        """
+        if self.fields is not None:
+            record = {field: record.get(field) for field in self.fields}
+        with profiler.measure('output.format'):
+            self._write(record)
+        self.count += 1
+
+    def close(self):
+        self.stream.flush()
+
+    def _write(self, record):
+        raise NotImplementedError
+
+
+class NDJSONWriter(RecordWriter):
+    """
+    One JSON object per line, flushed as soon as it is written.
+    """
+
+    def _write(self, record):
+        self.stream.write(json.dumps(record, default=str) + '\n')
+        self.stream.flush()
+
+
+class JSONWriter(RecordWriter):
+    """
+    A JSON array of objects, one per line. The array is written
+    as the records come rather than dumped once complete.
+    """
+
+    def _write(self, record):
+        self.stream.write('[\n' if self.count == 0 else ',\n')
+        self.stream.write(json.dumps(record, default=str))
+
+    def close(self):
+        self.stream.write('[]\n' if self.count == 0 else '\n]\n')
+        super().close()
+
+
+class CSVWriter(RecordWriter):
+    """
+    Comma separated values, headed by the records' keys.
+    """
+
+    def __init__(self, fields=None, stream=None):
+        super().__init__(fields=fields, stream=stream)
+        self.writer = csv.writer(self.stream)
+
+    def _write(self, record):
+        if self.count == 0:
+            self.writer.writerow(record.keys())
+        self.writer.writerow(record.values())
+
+    def close(self):
+        if self.count == 0 and self.fields is not None:
+            self.writer.writerow(self.fields)
+        super().close()
+
+
+WRITERS = {
+    'json': JSONWriter,
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter
+}
+
+
+def get_writer(output, fields=None, stream=None):
+    """
+    Returns a record writer for one of the machine readable formats.
+
+    Arguments:
+        output {string} -- 'json', 'ndjson' or 'csv'
+
+    Keyword Arguments:
+        fields {list} -- the keys to write, in order
+        (default: {None}, those of each record)
+        stream {file} -- where to write (default: {None}, stdout)
+
+    Returns:
+        RecordWriter -- the writer
+    """
+    try:
+        writer_class = WRITERS[output]
+    except KeyError:
+        raise ValueError(f'Unknown output format "{output}"')
+    return writer_class(fields=fields, stream=stream)
@@ -0,0 +1,320 @@
+import itertools
+import json
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+class CallStats(object):
+    """
+    The durations and marshalled sizes recorded under one name.
+    """
+    __slots__ = ('durations', 'nbytes')
+
+    def __init__(self):
+        self.durations = []
+        self.nbytes = 0
+
+    @property
+    def count(self):
+        return len(self.durations)
+
+    @property
+    def total(self):
+        return sum(self.durations)
+
+    def percentile(self, percent):
+        """
+        Returns the nearest-rank percentile of the durations.
+
+        Arguments:
+            percent {int} -- between 0 and 100
+        """
+        durations = sorted(self.durations)
+        rank = max(int(len(durations) * percent / 100 + 0.5), 1)
+        return durations[min(rank, len(durations)) - 1]
+
+
+class Profiler(object):
+    """
+    Records how many times each d-bus method and WyPy property
+    helper is called, how long the calls take and how many bytes
+    they marshal, along with the time spent formatting output.
+    Values worth reporting alongside, such as whether a cache was
+    hit, are kept as annotations.
+    When tracing, every call is also kept as a trace event.
+
+    It does nothing until enabled, which `wypy --profile` and
+    `wypy --trace FILE` do.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.tracing = False
+        self.reset()
+
+    def enable(self, trace=False):
+        self.reset()
+        self.enabled = True
+        self.tracing = trace
+
+    def disable(self):
+        self.enabled = False
+        self.tracing = False
+
+    def reset(self):
+        self.stats = {}
+        self.annotations = {}
+        self.events = []
+        self.started = time.perf_counter()
+        self._async_ids = itertools.count(1)
+
+    def record(self, name, duration, nbytes=0, start=None, category='wypy'):
+        """
+        Records one call of `name`.
+
+        Arguments:
+            name {string} -- what was called
+            duration {float} -- how long it took, in seconds
+
+        Keyword Arguments:
+            nbytes {int} -- bytes marshalled by the call (default: {0})
+            start {float} -- when it started, as a perf_counter value,
+            required to keep a trace event (default: {None})
+            category {string} -- the trace event's category, 'dbus'
+            calls may overlap and are traced as async spans
+            (default: {'wypy'})
+        """
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = CallStats()
+        stats.durations.append(duration)
+        stats.nbytes += nbytes
+
+        if self.tracing and start is not None:
+            self._add_trace_event(name, start, duration, nbytes, category)
+
+    def annotate(self, name, value):
+        """
+        Keeps `value` under `name`, to be reported along with the
+        calls, while the profiler is enabled.
+
+        Arguments:
+            name {string} -- what the value describes
+            value {string} -- the value
+        """
+        if self.enabled:
+            self.annotations[name] = value
+
+    @contextmanager
+    def measure(self, name, category='wypy'):
+        """
+        Records the time spent in the body of the `with` block.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.record(name, duration, start=start, category=category)
+
+    def profile(self, name, category='wypy'):
+        """
+        Decorates a function so that its calls are recorded
+        under `name` while the profiler is enabled.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.measure(name, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def wrap_method(self, iface_name, member, method, signature=None):
+        """
+        Wraps a d-bus method so its calls are recorded, asynchronous
+        ones included: their duration runs until the reply or error
+        handler is called.
+
+        Arguments:
+            iface_name {string} -- the method's d-bus interface
+            member {string} -- the method's name
+            method {callable} -- the proxy's method
+            signature {string} -- the arguments' signature, if known
+
+        Returns:
+            callable -- `method`, instrumented if the profiler is enabled
+        """
+        if not self.enabled:
+            return method
+
+        name = f'{iface_name.rsplit(".", 1)[-1]}.{member}'
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            sent = self._marshalled_size(
+                kwargs.get('signature', signature), args
+            )
+            start = time.perf_counter()
+            reply_handler = kwargs.get('reply_handler')
+            error_handler = kwargs.get('error_handler')
+
+            if reply_handler is not None or error_handler is not None:
+                def on_reply(*values):
+                    self.record(
+                        name,
+                        time.perf_counter() - start,
+                        sent + self._marshalled_size(None, values),
+                        start,
+                        'dbus'
+                    )
+                    if reply_handler is not None:
+                        reply_handler(*values)
+
+                def on_error(error):
+                    duration = time.perf_counter() - start
+                    self.record(name, duration, sent, start, 'dbus')
+                    if error_handler is not None:
+                        error_handler(error)
+
+                kwargs['reply_handler'] = on_reply
+                kwargs['error_handler'] = on_error
+                return method(*args, **kwargs)
+
+            try:
+                reply = method(*args, **kwargs)
+            except Exception:
+                duration = time.perf_counter() - start
+                self.record(name, duration, sent, start, 'dbus')
+                raise
+            duration = time.perf_counter() - start
+            received = self._marshalled_size(
+                None, () if reply is None else (reply,)
+            )
+            self.record(name, duration, sent + received, start, 'dbus')
+            return reply
+
+        return wrapper
+
+    def report(self):
+        """
+        Formats the recorded calls, slowest total first,
+        followed by the annotations.
+
+        Returns:
+            string -- the report
+        """
+        from wypy.utils.table import Table
+
+        columns = [
+            'CALL', 'COUNT', 'TOTAL', 'P50', 'P90', 'P99', 'MAX', 'BYTES'
+        ]
+        table = Table(
+            columns,
+            align=dict.fromkeys(columns, 'r'),
+            color=False
+        )
+        table.align['CALL'] = 'l'
+        ordered = sorted(
+            self.stats.items(),
+            key=lambda item: item[1].total,
+            reverse=True
+        )
+        for name, stats in ordered:
+            table.add_row([
+                name,
+                stats.count,
+                _format_ms(stats.total),
+                _format_ms(stats.percentile(50)),
+                _format_ms(stats.percentile(90)),
+                _format_ms(stats.percentile(99)),
+                _format_ms(max(stats.durations)),
+                stats.nbytes or '--'
+            ])
+
+        lines = [str(table)]
+        lines.extend(
+            f'{name}: {value}' for name, value in self.annotations.items()
+        )
+        return '\n'.join(lines)
+
+    def write_trace(self, path, metadata=None):
+        """
+        Writes the recorded trace events to `path` in the Chrome
+        trace event format, which chrome://tracing and Perfetto load.
+
+        Arguments:
+            path {string} -- the file to write
+
+        Keyword Arguments:
+            metadata {dict} -- stored as the trace's otherData,
+            along with the annotations (default: {None})
+        """
+        trace = {
+            'traceEvents': sorted(self.events, key=lambda event: event['ts']),
+            'displayTimeUnit': 'ms',
+            'otherData': dict(self.annotations, **(metadata or {}))
+        }
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+
+    #   ---------------
+    #
+    #   Private Methods
+    #
+    #   ---------------
+
+    def _add_trace_event(self, name, start, duration, nbytes, category):
+        """
+        Keeps a trace event for one call. Timestamps are in
+        microseconds since the profiler was enabled.
+        D-Bus calls are async begin / end pairs since several can
+        be pending at once, everything else is a complete event
+        nested in its thread's timeline.
+        """
+        event = {
+            'name': name,
+            'cat': category,
+            'ts': (start - self.started) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident()
+        }
+        if category != 'dbus':
+            event.update(ph='X', dur=duration * 1e6)
+            self.events.append(event)
+            return
+
+        event.update(ph='b', id=next(self._async_ids), args={'bytes': nbytes})
+        end = dict(event, ph='e', ts=event['ts'] + duration * 1e6)
+        del end['args']
+        self.events.extend((event, end))
+
+    def _marshalled_size(self, signature, values):
+        """
+        Returns the number of bytes `values` take once marshalled,
+        computed with the wire backend's marshaller.
+        """
+        from wypy.wire.marshal import guess_signature, marshal
+
+        try:
+            if signature is None:
+                signature = ''.join(map(guess_signature, values))
+            return len(marshal(signature, values))
+        except (TypeError, ValueError, KeyError, IndexError, struct.error):
+            return 0
+
+
+def _format_ms(seconds):
+    return f'{seconds * 1000:.2f} ms'
+
+
+profiler = Profiler()
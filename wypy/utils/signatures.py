@@ -0,0 +1,94 @@
+from wypy.utils.constants import (
+    DBUS_IFACE,
+    DBUS_PROPERTIES_IFACE,
+    DBUS_OBJ_MANAGER_IFACE,
+    NM_IFACE,
+    NM_SETTINGS_IFACE,
+    NM_CONNECTION_IFACE,
+    NM_DEVICE_IFACE,
+    NM_ACTIVE_CONN_IFACE,
+    IP4_CONFIG_IFACE,
+    NM_WIRELESS_IFACE,
+    NM_ACCESS_POINT_IFACE
+)
+
+# Input signatures of the d-bus methods WyPy calls, per interface.
+# Proxies are created without introspection, so these are used to
+# marshal the arguments instead of the introspection data.
+NM_METHOD_SIGNATURES = {
+    DBUS_IFACE: {
+        'AddMatch': 's',
+        'RemoveMatch': 's'
+    },
+    DBUS_PROPERTIES_IFACE: {
+        'Get': 'ss',
+        'GetAll': 's',
+        'Set': 'ssv'
+    },
+    DBUS_OBJ_MANAGER_IFACE: {
+        'GetManagedObjects': ''
+    },
+    NM_IFACE: {
+        'Reload': 'u',
+        'GetDevices': '',
+        'GetAllDevices': '',
+        'GetDeviceByIpIface': 's',
+        'ActivateConnection': 'ooo',
+        'AddAndActivateConnection': 'a{sa{sv}}oo',
+        'AddAndActivateConnection2': 'a{sa{sv}}ooa{sv}',
+        'DeactivateConnection': 'o',
+        'Sleep': 'b',
+        'Enable': 'b',
+        'GetPermissions': '',
+        'SetLogging': 'ss',
+        'GetLogging': '',
+        'CheckConnectivity': '',
+        'state': ''
+    },
+    NM_SETTINGS_IFACE: {
+        'ListConnections': '',
+        'GetConnectionByUuid': 's',
+        'AddConnection': 'a{sa{sv}}',
+        'AddConnectionUnsaved': 'a{sa{sv}}',
+        'LoadConnections': 'as',
+        'ReloadConnections': '',
+        'SaveHostname': 's'
+    },
+    NM_CONNECTION_IFACE: {
+        'Update': 'a{sa{sv}}',
+        'UpdateUnsaved': 'a{sa{sv}}',
+        'Delete': '',
+        'GetSettings': '',
+        'GetSecrets': 's',
+        'ClearSecrets': '',
+        'Save': ''
+    },
+    NM_DEVICE_IFACE: {
+        'Reapply': 'a{sa{sv}}tu',
+        'GetAppliedConnection': 'u',
+        'Disconnect': '',
+        'Delete': ''
+    },
+    NM_WIRELESS_IFACE: {
+        'GetAccessPoints': '',
+        'GetAllAccessPoints': '',
+        'RequestScan': 'a{sv}'
+    },
+    NM_ACTIVE_CONN_IFACE: {},
+    IP4_CONFIG_IFACE: {},
+    NM_ACCESS_POINT_IFACE: {}
+}
+
+
+def get_method_signature(iface_name, method_name):
+    """
+    Looks up the input signature of a d-bus method.
+
+    Arguments:
+        iface_name {string} -- the d-bus interface the method belongs to
+        method_name {string} -- the method's name
+
+    Returns:
+        string -- the signature, None if the method is unknown
+    """
+    return NM_METHOD_SIGNATURES.get(iface_name, {}).get(method_name)
@@ -0,0 +1,249 @@
+import itertools
+import re
+import sys
+from termcolor import colored
+from wypy.utils.constants import TABLE_STREAM_SAMPLE
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+
+
+def visible_width(text):
+    """
+    Returns how many characters `text` takes on screen,
+    its ANSI escape sequences left out.
+    """
+    if '\x1b' in text:
+        return len(ANSI_ESCAPE.sub('', text))
+    return len(text)
+
+
+class Table(object):
+    """
+    A text table drawn like PrettyTable's default style, built for
+    large outputs:
+
+    - each value is turned into a string, and measured, once, when
+      its row is added, the column widths being kept up to date.
+    - rows keep their raw values, which sortby sorts on: numbers
+      are sorted as numbers.
+    - a row is colored as a whole, and only when stdout is a TTY,
+      rather than each of its values.
+    - stream() writes the rows of huge tables as they come.
+    """
+
+    def __init__(
+        self,
+        field_names,
+        align='l',
+        sortby=None,
+        reversesort=False,
+        border=True,
+        left_padding_width=1,
+        right_padding_width=1,
+        color=None
+    ):
+        """
+        Arguments:
+            field_names {list} -- the columns' names
+
+        Keyword Arguments:
+            align {string} -- 'l', 'c' or 'r', or a dictionary of them
+            by column name (default: {'l'})
+            sortby {string} -- the column the rows are sorted on
+            (default: {None}, the order they were added in)
+            reversesort {bool} -- sort in descending order
+            (default: {False})
+            border {bool} -- draw the table's frame (default: {True})
+            left_padding_width {int} -- spaces before each value
+            (default: {1})
+            right_padding_width {int} -- spaces after each value
+            (default: {1})
+            color {bool} -- color the rows, by default only when
+            stdout is a TTY (default: {None})
+        """
+        self.align = align
+        self.sortby = sortby
+        self.reversesort = reversesort
+        self.border = border
+        self.left_padding_width = left_padding_width
+        self.right_padding_width = right_padding_width
+        self.color = color
+        self.field_names = field_names
+
+    @property
+    def field_names(self):
+        return self._field_names
+
+    @field_names.setter
+    def field_names(self, field_names):
+        self._field_names = list(field_names)
+        self.clear_rows()
+
+    @property
+    def rows(self):
+        return [row for row, _, _, _ in self._rows]
+
+    def add_row(self, row, color=None):
+        """
+        Adds a row of raw values.
+
+        Arguments:
+            row {list} -- one value per column
+
+        Keyword Arguments:
+            color {string} -- the row's termcolor color (default: {None})
+        """
+        cells, widths = self._measure(row)
+        self._rows.append((row, cells, widths, color))
+        self._widths = list(map(max, self._widths, widths))
+
+    def clear_rows(self):
+        self._rows = []
+        self._widths = [visible_width(name) for name in self._field_names]
+
+    def get_string(self):
+        rows = self._rows
+        if self.sortby is not None:
+            index = self._field_names.index(self.sortby)
+            rows = sorted(
+                rows,
+                key=lambda row: row[0][index],
+                reverse=self.reversesort
+            )
+
+        aligns, use_color = self._aligns(), self._use_color()
+        lines = self._header(self._widths, aligns)
+        lines.extend(
+            self._format_line(
+                cells, widths, self._widths, aligns,
+                color if use_color else None
+            )
+            for _, cells, widths, color in rows
+        )
+        if self.border:
+            lines.append(self._hrule(self._widths))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.get_string()
+
+    def stream(self, rows, width_hints=None, sample=TABLE_STREAM_SAMPLE):
+        """
+        Yields the lines of a table holding `rows`, as the rows come,
+        instead of waiting for the last one to size the columns.
+        Widths come from `width_hints` and the first `sample` rows,
+        a wider value met later widens its column from its row on.
+        The rows are not sorted, nor kept.
+
+        Arguments:
+            rows {iterable} -- (row, color) tuples, see add_row
+
+        Keyword Arguments:
+            width_hints {dict} -- known widths, by column name, those
+            of columns not in the table are ignored (default: {None})
+            sample {int} -- rows read before the header is written
+            (default: {TABLE_STREAM_SAMPLE})
+
+        Yields:
+            string -- the table's lines
+        """
+        column_widths = [visible_width(name) for name in self._field_names]
+        for name, width in (width_hints or {}).items():
+            if name in self._field_names:
+                index = self._field_names.index(name)
+                column_widths[index] = max(column_widths[index], width)
+
+        aligns, use_color = self._aligns(), self._use_color()
+        rows = iter(rows)
+        first_rows = []
+        for row, color in itertools.islice(rows, sample):
+            cells, widths = self._measure(row)
+            first_rows.append((cells, widths, color))
+            column_widths = list(map(max, column_widths, widths))
+
+        yield from self._header(column_widths, aligns)
+        for cells, widths, color in first_rows:
+            yield self._format_line(
+                cells, widths, column_widths, aligns,
+                color if use_color else None
+            )
+        del first_rows
+
+        for row, color in rows:
+            cells, widths = self._measure(row)
+            column_widths = list(map(max, column_widths, widths))
+            yield self._format_line(
+                cells, widths, column_widths, aligns,
+                color if use_color else None
+            )
+
+        if self.border:
+            yield self._hrule(column_widths)
+
+    #   ---------------
+    #
+    #   Private Methods
+    #
+    #   ---------------
+
+    def _measure(self, row):
+        """
+        Returns the row's values as strings, and their widths.
+        """
+        if len(row) != len(self._field_names):
+            raise ValueError(
+                f'Row has {len(row)} values, '
+                f'the table {len(self._field_names)} columns'
+            )
+        cells = [value if isinstance(value, str) else str(value) for value in row]  # noqa E501
+        return cells, [visible_width(cell) for cell in cells]
+
+    def _aligns(self):
+        if isinstance(self.align, dict):
+            return [self.align.get(name, 'l') for name in self._field_names]
+        return [self.align] * len(self._field_names)
+
+    def _use_color(self):
+        if self.color is None:
+            return sys.stdout.isatty()
+        return self.color
+
+    def _header(self, column_widths, aligns):
+        names = self._field_names
+        widths = [visible_width(name) for name in names]
+        header = self._format_line(names, widths, column_widths, aligns)
+        if not self.border:
+            return [header]
+        hrule = self._hrule(column_widths)
+        return [hrule, header, hrule]
+
+    def _hrule(self, column_widths):
+        padding = self.left_padding_width + self.right_padding_width
+        return '+' + '+'.join(
+            '-' * (width + padding) for width in column_widths
+        ) + '+'
+
+    def _format_line(self, cells, widths, column_widths, aligns, color=None):
+        """
+        Pads and joins a row's cells, coloring the line if `color`
+        is given.
+        """
+        left = ' ' * self.left_padding_width
+        right = ' ' * self.right_padding_width
+        parts = []
+        for cell, width, column_width, align in zip(
+            cells, widths, column_widths, aligns
+        ):
+            space = column_width - width
+            if align == 'r':
+                cell = ' ' * space + cell
+            elif align == 'c':
+                cell = ' ' * ((space + 1) // 2) + cell + ' ' * (space // 2)
+            else:
+                cell = cell + ' ' * space
+            parts.append(left + cell + right)
+
+        if not self.border:
+            return colored(''.join(parts), color) if color else ''.join(parts)
+        line = '|'.join(parts)
+        return '|' + (colored(line, color) if color else line) + '|'
@@ -1 +1,5 @@
-from .wifi import WiFi  # noqa F401
\ No newline at end of file
+from wypy.utils.helpers import lazy_exports
+
+__all__ = ['WiFi']
+
+__getattr__ = lazy_exports(__name__, {'WiFi': '.wifi:WiFi'})
@@ -0,0 +1,174 @@
+from bisect import bisect_right
+from wypy.utils.constants import WIFI_BANDS
+
+WIFI_BAND_STARTS = [start for start, _ in WIFI_BANDS]
+
+ACCESS_POINT_MODES = {
+    0: 'Unknown',
+    1: 'Ad Hoc',
+    2: 'Infra',
+    3: 'Access Point',
+    4: 'Mesh'
+}
+
+
+class AccessPoint(object):
+    """
+    An access point (BSSID) as seen by one radio, shared by listing,
+    sorting and rendering.
+
+    Its numbers are kept as read from NetworkManager, the values
+    shown to the user (rate, mode, bars, band) are derived from them
+    when read. Fields are read as attributes, or by name like a
+    dictionary, which is how --fields rows and record writers
+    read them.
+    """
+    __slots__ = (
+        'dbus_path',
+        'ssid',
+        'bssid',
+        'mode_code',
+        'max_bitrate',
+        'signal',
+        'frequency',
+        'device',
+        'bssids'
+    )
+
+    def __init__(self, dbus_path, ssid, bssid='--', mode_code=0,
+                 max_bitrate=0, signal=0, frequency=0, device='--',
+                 bssids=1):
+        """
+        Arguments:
+            dbus_path {string} -- the access point's own d-bus path
+            ssid {string} -- the network's name
+
+        Keyword Arguments:
+            bssid {string} -- the hardware address (default: {'--'})
+            mode_code {int} -- NM_802_11_MODE value (default: {0})
+            max_bitrate {int} -- in Kbit/s (default: {0})
+            signal {int} -- the strength, from 0 to 100 (default: {0})
+            frequency {int} -- in MHz (default: {0})
+            device {string} -- the radio's interface name
+            (default: {'--'})
+            bssids {int} -- how many BSSIDs its SSID has, when grouped
+            (default: {1})
+        """
+        self.dbus_path = dbus_path
+        self.ssid = ssid
+        self.bssid = bssid
+        self.mode_code = mode_code
+        self.max_bitrate = max_bitrate
+        self.signal = signal
+        self.frequency = frequency
+        self.device = device
+        self.bssids = bssids
+
+    @classmethod
+    def from_properties(cls, dbus_path, props, device='--'):
+        """
+        Builds an access point from its AccessPoint d-bus properties.
+
+        Arguments:
+            dbus_path {string} -- the access point's own d-bus path
+            props {dict} -- its properties, as returned by GetAll
+
+        Keyword Arguments:
+            device {string} -- the radio's interface name
+            (default: {'--'})
+
+        Returns:
+            AccessPoint -- the access point
+        """
+        return cls(
+            dbus_path,
+            decode_ssid(props.get('Ssid', b'')),
+            str(props.get('HwAddress', '--')),
+            int(props.get('Mode', 0)),
+            int(props.get('MaxBitrate', 0)),
+            int(props.get('Strength', 0)),
+            int(props.get('Frequency', 0)),
+            device
+        )
+
+    @property
+    def rate(self):
+        return f'{self.max_bitrate // 1000} Mbit/s'
+
+    @property
+    def mode(self):
+        return ACCESS_POINT_MODES.get(self.mode_code, '--')
+
+    @property
+    def bars(self):
+        return get_bars(self.signal)
+
+    @property
+    def band(self):
+        return get_band(self.frequency)
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field)
+
+    def get(self, field, default=None):
+        return getattr(self, field, default)
+
+    def __repr__(self):
+        return f'<AccessPoint {self.ssid} {self.bssid} {self.dbus_path}>'
+
+
+def decode_ssid(raw_ssid):
+    """
+    Decodes an SSID from its bytes, as UTF-8 or, when it is not,
+    as Latin-1, which maps each byte to one character.
+
+    Arguments:
+        raw_ssid {bytes} -- the raw SSID, or a list of its bytes
+
+    Returns:
+        string -- the SSID, '--' if it is hidden
+    """
+    raw_ssid = bytes(raw_ssid)
+    if not raw_ssid:
+        return '--'
+    try:
+        return raw_ssid.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw_ssid.decode('latin-1')
+
+
+def get_bars(signal):
+    """
+    Visually describes a signal strength, from 0 to 100, by a number
+    of bars (*).
+    """
+    signal = int(signal)
+    if signal in range(0, 30):
+        return '*'
+    elif signal in range(30, 60):
+        return '**'
+    elif signal in range(60, 80):
+        return '***'
+    elif signal in range(80, 101):
+        return '****'
+    else:
+        return '--'
+
+
+def get_band_rank(frequency):
+    """
+    Returns the rank of a frequency's band, in MHz, in WIFI_BANDS,
+    from 1, or 0 if it is in none of them.
+    """
+    return bisect_right(WIFI_BAND_STARTS, int(frequency))
+
+
+def get_band(frequency):
+    """
+    Returns the name of a frequency's band, in MHz, e.g. '5 GHz'.
+    """
+    rank = get_band_rank(frequency)
+    return WIFI_BANDS[rank - 1][1] if rank else '--'
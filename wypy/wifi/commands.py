@@ -1,12 +1,24 @@
-from .wifi import WiFi
 import click
+from wypy.utils.helpers import LazySubsystem, fields_option
+from wypy.utils.constants import (
+    ACCESS_POINT_FIELDS,
+    ACCESS_POINT_BSSID_FIELDS,
+    ACCESS_POINT_SORTS,
+    MONITOR_WINDOW,
+    MONITOR_INTERVAL,
+    SSID_MAX_BYTES
+)
 
 
 @click.group('wifi')
 @click.pass_context
 def wifi(ctx):
     """Interact with the wireless device(s)"""
-    ctx.obj = WiFi()
+    ctx.obj = LazySubsystem(
+        'wypy.wifi.wifi:WiFi',
+        backend=ctx.meta.get('wypy.backend'),
+        output=ctx.meta.get('wypy.output')
+    )
 
 
 @click.command('on')
@@ -31,17 +43,98 @@ def wifi_status(wifi):
 
 
 @click.command('list')
+@fields_option(ACCESS_POINT_FIELDS + ACCESS_POINT_BSSID_FIELDS + ['bssids'])
+@click.option(
+    '--top',
+    type=click.IntRange(min=1),
+    metavar='N',
+    help='Only show the N best access points.'
+)
+@click.option(
+    '--sort',
+    type=click.Choice(ACCESS_POINT_SORTS),
+    help='Order on signal or rate, the highest first, or on ssid. '
+         '[default: signal]'
+)
+@click.option(
+    '--max-age',
+    type=click.FloatRange(min=0),
+    metavar='SECONDS',
+    help='Reuse the last scan\'s results if it completed at most '
+         'SECONDS ago, instead of scanning.'
+)
+@click.option(
+    '--group',
+    is_flag=True,
+    help='Show each SSID once, with its best BSSID and how many '
+         'BSSIDs it has.'
+)
 @click.pass_obj
-def list_access_points(wifi):
+def list_access_points(wifi, fields, top, sort, max_age, group):
     """List currently available access points"""
-    wifi.list_access_points()
+    if fields and 'bssids' in fields and not group:
+        raise click.BadParameter(
+            'bssids is only available with --group',
+            param_hint='--fields'
+        )
+    wifi.list_access_points(
+        fields=fields,
+        top=top,
+        sort=sort,
+        max_age=max_age,
+        group=group
+    )
 
 
 @click.command('rescan')
+@click.option(
+    '--ssid',
+    'ssids',
+    multiple=True,
+    metavar='NAME',
+    help='Only probe for this network, which is faster and finds hidden '
+         'networks. Can be repeated.'
+)
 @click.pass_obj
-def rescan(wifi):
+def rescan(wifi, ssids):
     """Force WyPy to scan for available access points"""
-    wifi.rescan()
+    for ssid in ssids:
+        if not 0 < len(ssid.encode('utf-8')) <= SSID_MAX_BYTES:
+            raise click.BadParameter(
+                f'"{ssid}" is not an SSID, those are 1 to '
+                f'{SSID_MAX_BYTES} bytes long',
+                param_hint='--ssid'
+            )
+    wifi.rescan(ssids=list(ssids) or None)
+
+
+@click.command('monitor')
+@click.option(
+    '--window',
+    type=click.IntRange(min=1),
+    default=MONITOR_WINDOW,
+    show_default=True,
+    metavar='N',
+    help='Signal strength samples kept per access point.'
+)
+@click.option(
+    '--interval',
+    type=click.FloatRange(min=0.1),
+    default=MONITOR_INTERVAL,
+    show_default=True,
+    metavar='SECONDS',
+    help='Time between refreshes.'
+)
+@click.option(
+    '--duration',
+    type=click.FloatRange(min=0),
+    metavar='SECONDS',
+    help='Stop after SECONDS instead of running until interrupted.'
+)
+@click.pass_obj
+def monitor(wifi, window, interval, duration):
+    """Watch access points' signal strength"""
+    wifi.monitor(window=window, interval=interval, duration=duration)
 
 
 @click.command('connect')
@@ -56,4 +149,5 @@ wifi.add_command(turn_wifi_off)
 wifi.add_command(wifi_status)
 wifi.add_command(list_access_points)
 wifi.add_command(rescan)
+wifi.add_command(monitor)
 wifi.add_command(connect)
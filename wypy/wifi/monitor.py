@@ -0,0 +1,51 @@
+from collections import deque
+
+
+class SignalHistory(object):
+    """
+    The latest (timestamp, strength) samples of an access point,
+    kept in a ring buffer: once `window` samples are held, each new
+    one drops the oldest, so its memory does not grow however long
+    it is fed. Their sum is kept up to date for the average.
+    """
+    __slots__ = ('samples', 'total')
+
+    def __init__(self, window):
+        """
+        Arguments:
+            window {int} -- how many samples to keep
+        """
+        self.samples = deque(maxlen=window)
+        self.total = 0
+
+    def add(self, timestamp, strength):
+        """
+        Keeps a sample, dropping the oldest one if the window is full.
+
+        Arguments:
+            timestamp {float} -- when it was taken, in seconds
+            strength {int} -- the signal strength, from 0 to 100
+        """
+        if len(self.samples) == self.samples.maxlen:
+            self.total -= self.samples[0][1]
+        self.samples.append((timestamp, strength))
+        self.total += strength
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def latest(self):
+        return self.samples[-1][1] if self.samples else None
+
+    @property
+    def minimum(self):
+        return min(strength for _, strength in self.samples) if self.samples else None  # noqa E501
+
+    @property
+    def maximum(self):
+        return max(strength for _, strength in self.samples) if self.samples else None  # noqa E501
+
+    @property
+    def average(self):
+        return round(self.total / len(self.samples)) if self.samples else None  # noqa E501
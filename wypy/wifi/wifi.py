@@ -1,79 +1,150 @@
-from gi.repository import GObject  # noqa F401
 from termcolor import colored
-from prettytable import PrettyTable
-from dbus.exceptions import DBusException
+from wypy.utils.table import Table
 from wypy.utils.constants import (
     NM_CONNECTION_IFACE,
-    NM_BUS_NAME,
     NM_OBJ_PATH,
     NM_SETTINGS_IFACE,
     NM_SETTINGS_OBJ_PATH,
     DBUS_GENERAL_PROPS,
+    DBUS_PROPERTIES_IFACE,
     NM_IFACE,
     NM_DEVICE_IFACE,
     NM_WIRELESS_IFACE,
     NM_ACCESS_POINT_IFACE,
+    ACCESS_POINT_FIELDS,
+    ACCESS_POINT_GROUP_FIELDS,
+    ACCESS_POINT_SORTS,
+    SCAN_TIMEOUT,
+    SCAN_SETTLE_TIME,
+    MONITOR_FIELDS,
+    MONITOR_WINDOW,
+    MONITOR_INTERVAL
 )
 from wypy.wypy import WyPy
-import dbus, click, sys, time, uuid  # noqa E401
+from wypy.wifi.access_point import AccessPoint, decode_ssid, get_band_rank
+from wypy.wifi.monitor import SignalHistory
+from wypy.utils.helpers import echo_table, lazy_property
+from wypy.utils.profiler import profiler
+from functools import partial
+import click, heapq, sys, time, uuid  # noqa E401
 
 
 class WiFi(WyPy):
 
-    def __init__(self):
-        super().__init__()
-        self.proxy = self.bus.get_object(NM_BUS_NAME, NM_OBJ_PATH)
+    def __init__(self, backend=None, output=None):
+        super().__init__(backend=backend, output=output)
         self.wifi_prop = 'WirelessEnabled'
-        self.status_table = PrettyTable(['SSID', 'MODE', 'RATE', 'SIGNAL', 'BARS'])  # noqa E501
-        self.status_table.align = 'l'
-        self.status_table.border = False
-        self.status_table.sortby = 'SIGNAL'
-        self.status_table.left_padding_width = 0
-        self.status_table.right_padding_width = 8
-        self.settings_obj = self.bus.get_object(
-            NM_BUS_NAME,
-            NM_SETTINGS_OBJ_PATH
+        self._ap_devices = {}
+        self.status_table_keys = [
+            field.upper() for field in ACCESS_POINT_FIELDS
+        ]
+
+    @lazy_property
+    def proxy(self):
+        return self.get_proxy(NM_OBJ_PATH)
+
+    @lazy_property
+    def status_table(self):
+        return Table(
+            self.status_table_keys,
+            border=False,
+            left_padding_width=0,
+            right_padding_width=8
         )
-        self.settings_iface = dbus.Interface(
-            self.settings_obj,
-            NM_SETTINGS_IFACE
-        )
-        try:
-            self.wifi_dev_path = self._get_wireless_device_path()
-        except Exception:
-            pass
-        else:
-            self.wifi_dev_obj = self.bus.get_object(
-                NM_BUS_NAME,
-                self.wifi_dev_path
-            )
-            self.wifi_iface = dbus.Interface(
-                self.wifi_dev_obj,
-                NM_WIRELESS_IFACE
-            )
-        finally:
-            self.loop = GObject.MainLoop()
 
-    def list_access_points(self):
+    @lazy_property
+    def settings_obj(self):
+        return self.get_proxy(NM_SETTINGS_OBJ_PATH)
+
+    @lazy_property
+    def settings_iface(self):
+        return self.get_interface(NM_SETTINGS_OBJ_PATH, NM_SETTINGS_IFACE)
+
+    @lazy_property
+    def wifi_devices(self):
         """
-        Lists all visible access points.
+        The interface names of every wireless device (radio),
+        by d-bus object path, in NetworkManager's order.
         """
-        click.echo("Scanning for available access points ...")
-        access_points = self._get_all_access_points()
-        rows = list(map(self._create_row, access_points))
+        return self._get_wireless_devices()
 
-        for row in rows:
-            self.status_table.add_row(row)
+    @lazy_property
+    def wifi_dev_path(self):
+        return next(iter(self.wifi_devices))
+
+    @lazy_property
+    def loop(self):
+        return self.create_main_loop()
+
+    def list_access_points(self, fields=None, top=None, sort=None,
+                           max_age=None, group=False):
+        """
+        Lists all visible access points, the strongest first.
+        With `top`, only the best access points are decoded and shown,
+        they are picked with a heap on the raw properties.
+        With `max_age`, NetworkManager's access points are reused
+        without scanning when its last scan is recent enough.
+        With `group`, each network (SSID) is shown once, through its
+        best access point (BSSID), along with how many it has.
+
+        Keyword Arguments:
+            fields {list} -- the columns to show, among
+            ACCESS_POINT_FIELDS, ACCESS_POINT_BSSID_FIELDS and, with
+            `group`, 'bssids' (default: {None}, ACCESS_POINT_FIELDS
+            or ACCESS_POINT_GROUP_FIELDS)
+            top {int} -- how many access points to show
+            (default: {None}, all of them)
+            sort {string} -- 'signal' or 'rate', best first,
+            or 'ssid' (default: {None}, 'signal')
+            max_age {float} -- how old, in seconds, the last scan
+            may be (default: {None}, always scan)
+            group {bool} -- show one row per SSID (default: {False})
+        """
+        default_fields = ACCESS_POINT_GROUP_FIELDS if group else ACCESS_POINT_FIELDS  # noqa E501
+        fields = fields or default_fields
+
+        if self.machine_output and top is None and sort is None \
+                and not group:
+            with self.record_writer(fields) as writer:
+                for access_point in self._iter_access_points(max_age):
+                    writer.write(access_point)
+            return
+
+        access_points = self._get_best_access_points(
+            top,
+            sort or 'signal',
+            max_age,
+            group
+        )
+
+        if self.machine_output:
+            with self.record_writer(fields) as writer:
+                for access_point in access_points:
+                    writer.write(access_point)
+            return
+
+        self.status_table_keys = [field.upper() for field in fields]
+        for ap in access_points:
+            self.status_table.add_row(
+                self._create_row(ap, fields),
+                color=self._get_signal_color(ap.signal)
+            )
 
-        click.echo(self.status_table)
+        echo_table(self.status_table)
 
-    def rescan(self):
+    def rescan(self, ssids=None):
         """
-        Rescans the network for ( potentially ) newly added access points.
+        Rescans the network for ( potentially ) newly added access points,
+        on every radio at once, returning once all the scans are complete.
+        With `ssids`, only those networks are probed, which is faster
+        than a full sweep and finds hidden networks.
+
+        Keyword Arguments:
+            ssids {list} -- the networks' names (default: {None}, all)
         """
-        click.echo('Performing rescan ...')
-        self._request_scan()
-        click.echo('Done !')
+        self.echo('Performing rescan ...')
+        self._wait_for_scan(ssids=ssids)
+        self.echo('Done !')
 
     def connect(self):
         """
@@ -86,7 +157,8 @@ class WiFi(WyPy):
             name, and password (as per the example on github)
         """
         conns_paths = self._list_all_connections()
-        conns_info = list(map(self._get_connection_info, conns_paths))
+        conns_settings = self._get_connections_settings(conns_paths)
+        conns_info = list(map(self._get_connection_info, conns_paths, conns_settings))  # noqa E501
         conn_names = list(map(lambda conn: str(conn['id']), conns_info))
 
         access_point_name = click.prompt('SSID name')
@@ -97,7 +169,7 @@ class WiFi(WyPy):
             conn_to_activate = next(filter(_filter, conns_info))
             conn_path = conn_to_activate['dbus_path']
             active_conn_path = self._activate_existing_connection(conn_path)
-            click.echo(f'Connection to {access_point_name} successful ! (D-Bus path: {active_conn_path})')  # noqa E501
+            self.echo(f'Connection to {access_point_name} successful ! (D-Bus path: {active_conn_path})')  # noqa E501
         else:
             self._connect_to_access_point(
                 access_point_name,
@@ -108,23 +180,23 @@ class WiFi(WyPy):
         """
         Enables the network card's wireless capability.
         """
-        click.echo('Enabling WiFi ...')
+        self.echo('Enabling WiFi ...')
         wifi_enabled = self._get_wifi_status_code()
         if not wifi_enabled:
             self._enable_wifi()
         else:
-            click.echo('WiFi is already enabled. Skipping.')
+            self.echo('WiFi is already enabled. Skipping.')
 
     def turn_off(self):
         """
         Disables the network card's wireless capability.
         """
-        click.echo('Disabling WiFi ...')
+        self.echo('Disabling WiFi ...')
         wifi_enabled = self._get_wifi_status_code()
         if wifi_enabled:
             self._disable_wifi()
         else:
-            click.echo('WiFi is already disabled. Skipping.')
+            self.echo('WiFi is already disabled. Skipping.')
 
     def print_status(self):
         """
@@ -132,9 +204,106 @@ class WiFi(WyPy):
         """
         status_code = self._get_wifi_status_code()
         prop = DBUS_GENERAL_PROPS[self.wifi_prop]
+
+        if self.machine_output:
+            status = self.translate_status_code(prop, status_code, color=False)
+            with self.record_writer() as writer:
+                writer.write({'wifi': status})
+            return
+
         status = self.translate_status_code(prop, status_code)
         click.echo(f'WiFi is {status}')
 
+    def monitor(self, window=MONITOR_WINDOW, interval=MONITOR_INTERVAL,
+                duration=None):
+        """
+        Watches the signal strength of the visible access points,
+        the associated ones first, refreshing the view every `interval`
+        seconds until interrupted.
+
+        Strengths are sampled as NetworkManager reports their changes
+        (PropertiesChanged on each access point), and access points
+        come and go with the wireless devices' AccessPointAdded and
+        AccessPointRemoved signals. Each access point keeps its latest
+        `window` samples in a ring buffer, and is forgotten once
+        removed: memory stays bounded however long it runs.
+
+        Keyword Arguments:
+            window {int} -- samples kept per access point
+            (default: {MONITOR_WINDOW})
+            interval {float} -- seconds between refreshes
+            (default: {MONITOR_INTERVAL})
+            duration {float} -- seconds to monitor for
+            (default: {None}, until interrupted)
+        """
+        self._monitor_window = window
+        self._monitored = {}
+        self._active_aps = {}
+
+        devices = list(self.wifi_devices)
+        for device in devices:
+            props = self.get_all_properties(device, NM_WIRELESS_IFACE)
+            self._active_aps[device] = str(props.get('ActiveAccessPoint', '/'))  # noqa E501
+        access_points_paths = self._list_ap_paths()
+        self.prefetch_all_properties(access_points_paths, NM_ACCESS_POINT_IFACE)  # noqa E501
+        for ap_path in access_points_paths:
+            self._track_access_point(ap_path)
+
+        loop = self.create_main_loop()
+        matches = [
+            self.bus.add_signal_receiver(
+                self._handle_monitor_properties_changed,
+                'PropertiesChanged',
+                DBUS_PROPERTIES_IFACE,
+                self.bus_name,
+                path_keyword='path'
+            )
+        ]
+        for device in devices:
+            proxy = self.get_proxy(device)
+            matches.extend([
+                proxy.connect_to_signal(
+                    'AccessPointAdded',
+                    partial(self._handle_access_point_added, device),
+                    NM_WIRELESS_IFACE
+                ),
+                proxy.connect_to_signal(
+                    'AccessPointRemoved',
+                    self._handle_access_point_removed,
+                    NM_WIRELESS_IFACE
+                )
+            ])
+
+        def on_refresh():
+            self._render_monitor(writer)
+            return True
+
+        def on_timeout():
+            timers.remove(stop_timer)
+            loop.quit()
+            return False
+
+        writer = None
+        if self.machine_output:
+            writer = self.record_writer(MONITOR_FIELDS)
+        timers = [self.timeout_add(interval, on_refresh)]
+        if duration is not None:
+            stop_timer = self.timeout_add(duration, on_timeout)
+            timers.append(stop_timer)
+        try:
+            self._render_monitor(writer)
+            with profiler.measure('MainLoop.run', 'loop'):
+                loop.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for match in matches:
+                match.remove()
+            for timer in timers:
+                self.source_remove(timer)
+            if writer is not None:
+                writer.close()
+
     #   ---------------
     #
     #   Private Methods
@@ -151,7 +320,7 @@ class WiFi(WyPy):
             ap_pwd {string} -- the access point's password
         """
 
-        all_access_points = self._get_all_access_points()
+        all_access_points = self._get_all_access_points(ssids=[ap_name])
 
         _filter = lambda ap: ap['ssid'] == ap_name  # noqa E731
         ap_to_connect_to = next(filter(_filter, all_access_points), None)
@@ -162,12 +331,13 @@ class WiFi(WyPy):
                 ap_name,
                 ap_pwd
             )
-            click.echo('Establishing connection. Please hold tight ...')
+            self.echo('Establishing connection. Please hold tight ...')
             self._establish_connection(conn_info, ap_path)
         else:
             msg = f'[Error]: Connection to {ap_name} impossible. No such access point.'  # noqa E501
             sys.exit(colored(msg, "red"))
 
+    @profiler.profile('WiFi._handle_wifi_state_change', 'signal')
     def _handle_wifi_state_change(self, new_state, old_state, reason):
         """
         This is the StateChanged signal handler for the Device
@@ -202,19 +372,18 @@ class WiFi(WyPy):
         conn_path = self.settings_iface.GetConnectionByUuid(
             self.ap_uuid
         )
-        conn_obj = self.bus.get_object(NM_BUS_NAME, conn_path)
-        conn_iface = dbus.Interface(conn_obj, NM_CONNECTION_IFACE)
+        conn_iface = self.get_interface(conn_path, NM_CONNECTION_IFACE)
         conn_iface.Delete()
 
     def _establish_connection(self, conn, ap_path):
         """
         Adds and activate the connection using the provided info and
-        the access point's path.
+        the access point's path, on the radio which sees it.
 
         Subscribes to the StateChanged signal on the wireless
         device's proxy.
 
-        Runs the GObject main loop until the new state is
+        Runs the main loop until the new state is
         processed by the handler method.
 
         Arguments:
@@ -222,25 +391,27 @@ class WiFi(WyPy):
             ap_path {string} -- the access point's own d-bus object path
         """
 
-        nm = dbus.Interface(self.proxy, NM_IFACE)
+        device_path = self._ap_devices.get(str(ap_path), self.wifi_dev_path)
+        nm = self.get_interface(NM_OBJ_PATH, NM_IFACE)
         settings, active_conn = nm.AddAndActivateConnection(
             conn,
-            self.wifi_dev_path,
+            device_path,
             ap_path
         )
         try:
-            self.wifi_dev_obj.connect_to_signal(
+            self.get_proxy(device_path).connect_to_signal(
                 'StateChanged',
                 self._handle_wifi_state_change,
                 NM_DEVICE_IFACE,
             )
             self.ap_name = conn['connection']['id']
             self.ap_uuid = conn['connection']['uuid']
-        except DBusException as exc:
+        except self.dbus_exception as exc:
             msg = exc.get_dbus_message()
             sys.exit(msg)
 
-        self.loop.run()
+        with profiler.measure('MainLoop.run', 'loop'):
+            self.loop.run()
 
     def _generate_wireless_connection_info(self, ap_name, ap_pwd):
         """
@@ -254,33 +425,33 @@ class WiFi(WyPy):
         Returns:
             dict -- the connection info
         """
-        conn = dbus.Dictionary({
+        conn = {
             'type': '802-11-wireless',
             'uuid': str(uuid.uuid4()),
             'id': ap_name
-        })
+        }
 
-        settings_wifi = dbus.Dictionary({
-            'ssid': dbus.ByteArray(ap_name.encode('utf-8')),
+        settings_wifi = {
+            'ssid': ap_name.encode('utf-8'),
             'mode': 'infrastructure'
-        })
+        }
 
-        settings_wifi_security = dbus.Dictionary({
+        settings_wifi_security = {
             'key-mgmt': 'wpa-psk',
             'auth-alg': 'open',
             'psk': ap_pwd
-        })
+        }
 
-        settings_ipv4 = dbus.Dictionary({'method': 'auto'})
-        settings_ipv6 = dbus.Dictionary({'method': 'ignore'})
+        settings_ipv4 = {'method': 'auto'}
+        settings_ipv6 = {'method': 'ignore'}
 
-        return dbus.Dictionary({
+        return {
             'connection': conn,
             '802-11-wireless': settings_wifi,
             '802-11-wireless-security': settings_wifi_security,
             'ipv4': settings_ipv4,
             'ipv6': settings_ipv6
-        })
+        }
 
     def _activate_existing_connection(self, conn_path):
         """
@@ -296,26 +467,41 @@ class WiFi(WyPy):
         Returns:
             string -- the newly activated connection's object path
         """
-        self.nm = dbus.Interface(self.proxy, NM_IFACE)
+        self.nm = self.get_interface(NM_OBJ_PATH, NM_IFACE)
         try:
             active_conn = self.nm.ActivateConnection(
                 conn_path,
                 self.wifi_dev_path,
                 '/'
             )
-        except DBusException as exc:
+        except self.dbus_exception as exc:
             msg = exc.get_dbus_message()
             sys.exit(msg)
         else:
             return active_conn
 
-    def _get_connection_info(self, conn_path):
-        conn_obj = self.bus.get_object(NM_BUS_NAME, conn_path)
-        conn_iface = dbus.Interface(conn_obj,  NM_CONNECTION_IFACE)
-        conn_info = conn_iface.GetSettings()['connection']
+    def _get_connection_info(self, conn_path, conn_settings):
+        conn_info = conn_settings['connection']
         conn_info['dbus_path'] = conn_path
         return conn_info
 
+    def _get_connections_settings(self, conns_paths):
+        """
+        Calls GetSettings on every given connection at once
+        through call_many.
+
+        Arguments:
+            conns_paths {list} -- the connections' own d-bus object paths
+
+        Returns:
+            list -- the settings of each connection, in the same order
+        """
+        calls = [
+            (path, NM_CONNECTION_IFACE, 'GetSettings', ())
+            for path in conns_paths
+        ]
+        return self.call_many(calls)
+
     def _list_all_connections(self):
         return self.settings_iface.ListConnections()
 
@@ -354,58 +540,62 @@ class WiFi(WyPy):
             prop_name=self.wifi_prop
         )
 
-    def _create_row(self, ap_data):
+    def _create_row(self, ap_data, fields=ACCESS_POINT_FIELDS):
         """
-        Creates a PrettyTable row using the access point's
-        values.
-        This function will color the row according to the
-        value of the 'signal' key.
+        Creates a table row using the access point's values.
 
         Arguments:
-            ap_data {dict} -- the access point's infomation
+            ap_data {AccessPoint} -- the access point
+
+        Keyword Arguments:
+            fields {list} -- the columns to keep, in order
+            (default: {ACCESS_POINT_FIELDS})
 
         Returns:
-            list -- [description]
+            list -- the row's values
         """
-        del ap_data['dbus_path']
+        return [ap_data[field] for field in fields]
 
-        signal = ap_data['signal']
-        values = ap_data.values()
+    def _get_signal_color(self, signal):
+        """
+        Returns the color of an access point's row,
+        according to its signal strength.
 
+        Arguments:
+            signal {int} -- the signal strength, from 0 to 100
+        """
         if signal in range(0, 31):
-            color = "cyan"
+            return "cyan"
         elif signal in range(30, 61):
-            color = "magenta"
+            return "magenta"
         elif signal in range(60, 81):
-            color = "yellow"
+            return "yellow"
         elif signal in range(80, 101):
-            color = "green"
+            return "green"
         else:
-            color = "white"
+            return "white"
 
-        return list(map(lambda val: colored(val, color), values))
-
-    def _get_wireless_device_path(self):
+    def _get_wireless_devices(self):
         """
-        Gets the d-bus object path for the wireless device(s)
-        _Note_: in this current implementation, we return the object path
-        for the first wireless device returned. Support for multiple devices
-        will be added in the coming versions.
+        Gets every real wireless device, appliances often having
+        several radios.
 
         Returns:
-            string -- the d-bus object path for the wireless device
+            dict -- the devices' interface names, by d-bus object path
         """
+        self.load_snapshot()
         devices_paths = self._get_all_devices_paths()
+        self.prefetch_all_properties(devices_paths, NM_DEVICE_IFACE)
         all_devices = list(map(lambda dev: self.get_all_properties(dev, NM_DEVICE_IFACE), devices_paths))  # noqa E501
         wireless_devices = list(filter(self._is_device_wifi, zip(devices_paths, all_devices)))  # noqa E501
 
-        try:
-            wifi_dev_path = wireless_devices[0]  # extract the first real wifi device that's returned  # noqa E501
-        except Exception:
+        if not wireless_devices:
             err_msg = '[Error]: No wireless device found'
             sys.exit(colored(err_msg, "red"))
-        else:
-            return wifi_dev_path[0]
+        return {
+            str(path): str(device_info.get('Interface', '--'))
+            for path, device_info in wireless_devices
+        }
 
     def _get_all_devices_paths(self):
         """
@@ -414,7 +604,7 @@ class WiFi(WyPy):
         Returns:
             list -- list of object paths for all devices
         """
-        nm = dbus.Interface(self.proxy, NM_IFACE)
+        nm = self.get_interface(NM_OBJ_PATH, NM_IFACE)
         return nm.GetAllDevices()
 
     def _is_device_wifi(self, device):
@@ -434,166 +624,524 @@ class WiFi(WyPy):
         real, device_type = device_info['Real'], device_info['DeviceType']
         return bool(real) and device_type == 2
 
-    def _get_all_access_points(self):
+    def _get_all_access_points(self, ssids=None):
         """
         Gets information for all visible access points
         on the network.
+        Once the scan is done, the properties of every access point
+        are refetched at once through call_many.
 
-        Arguments:
-            wifi_iface {dbus.Interface} -- the wireless interface
-            to call GetAllAccessPoints on
+        Keyword Arguments:
+            ssids {list} -- the networks the scan probes for
+            (default: {None}, all of them)
 
         Returns:
-            list -- access points dictionaries
+            list -- AccessPoint records
         """
 
-        try:
-            self._request_scan()
-        except SystemExit:
-            time.sleep(4)
-
-        access_points_paths = self._list_ap_paths()
+        access_points_paths = self._scan_access_points(ssids=ssids)
         access_points = list(map(self._extract_ap_info, access_points_paths))
         return access_points
 
-    def _list_ap_paths(self):
+    def _get_best_access_points(self, top=None, sort='signal', max_age=None,
+                                group=False):
         """
-        Calls GetAllAccessPoints on the wireless d-bus
-        interface provided by NetworkManager.
+        Gets information for the `top` best visible access points.
+        They are ordered on their raw properties, only those kept
+        are decoded.
+        With `group`, only the best access point of each SSID is
+        kept, with the number of access points of its SSID as
+        'bssids'.
 
-        Arguments:
-            wifi_iface {dbus.Interface} -- the wireless interface
-            to call GetAllAccessPoints on
+        Keyword Arguments:
+            top {int} -- how many to keep (default: {None}, all of them)
+            sort {string} -- 'signal' or 'rate', the highest first,
+            or 'ssid', in alphabetical order (default: {'signal'})
+            max_age {float} -- how old, in seconds, the last scan
+            may be (default: {None}, always scan)
+            group {bool} -- keep one access point per SSID
+            (default: {False})
 
         Returns:
-            list -- list of access points object paths
+            list -- AccessPoint records, in order
         """
-        return self.wifi_iface.GetAllAccessPoints()
+        access_points_paths = self._scan_access_points(max_age)
+        sort_key = self._get_sort_key(sort)
+        if group:
+            networks = self._group_by_ssid(access_points_paths)
+            access_points_paths = list(networks)
+
+        def key(path):
+            return sort_key(
+                self.get_all_properties(path, NM_ACCESS_POINT_IFACE)
+            )
 
-    def _request_scan(self):
+        if sort == 'ssid':
+            if top is None:
+                best = sorted(access_points_paths, key=key)
+            else:
+                best = heapq.nsmallest(top, access_points_paths, key=key)
+        elif top is None:
+            best = sorted(access_points_paths, key=key, reverse=True)
+        else:
+            best = heapq.nlargest(top, access_points_paths, key=key)
+
+        access_points = list(map(self._extract_ap_info, best))
+        if group:
+            for access_point in access_points:
+                access_point.bssids = networks[access_point.dbus_path]
+        return access_points
+
+    def _group_by_ssid(self, access_points_paths):
         """
-        Calls RequestScan on the wireless d-bus interface
-        provided by NetworkManager.
+        Indexes the access points by SSID, keeping for each SSID only
+        its best access point, the one with the strongest signal, then
+        on the highest band, then with the highest max bitrate, along
+        with how many access points it has. Hidden access points are
+        each their own group.
+        Only raw properties are compared, and the index grows with
+        the number of SSIDs rather than access points.
 
         Arguments:
-            wifi_iface {dbus.Interface} -- the wireless interface
-            to call RequestScan on
+            access_points_paths {list} -- the access points' object paths
+
+        Returns:
+            dict -- the number of access points of each SSID, by the
+            object path of its best access point
         """
-        try:
-            self.wifi_iface.RequestScan({})
-        except DBusException as exc:
-            msg = exc.get_dbus_message()
-            err = "Scanning not allowed immediately following previous scan"
-            if msg == err:
-                sys.exit(colored(f"[Error]: {msg}", "red"))
+        index = {}
+        for path in access_points_paths:
+            props = self.get_all_properties(path, NM_ACCESS_POINT_IFACE)
+            ssid = bytes(props.get('Ssid', b'')) or path
+            rank = (
+                int(props.get('Strength', 0)),
+                get_band_rank(props.get('Frequency', 0)),
+                int(props.get('MaxBitrate', 0))
+            )
+            network = index.get(ssid)
+            if network is None:
+                index[ssid] = [rank, path, 1]
+                continue
+            network[2] += 1
+            if rank > network[0]:
+                network[0], network[1] = rank, path
 
-    def _extract_ap_info(self, ap_path):
+        return {path: count for _, path, count in index.values()}
+
+    def _get_sort_key(self, sort):
         """
-        Extract necessary access point properties.
-        Namely:
-            - the ssid
-            - the mode
-            - the bitrate
-            - the signal strength
-            - the bars (visual representation of signal strength)
-            - the dbus object path
+        Returns a function computing the value access points are
+        sorted on from their raw properties.
 
         Arguments:
-            ap_path {string} -- the access point's own d-bus object path
+            sort {string} -- one of ACCESS_POINT_SORTS
+        """
+        if sort == 'signal':
+            return lambda props: int(props.get('Strength', 0))
+        if sort == 'rate':
+            return lambda props: int(props.get('MaxBitrate', 0))
+        if sort == 'ssid':
+            return lambda props: decode_ssid(props.get('Ssid', b''))
+        raise ValueError(
+            f'Unknown sort "{sort}", choose among {", ".join(ACCESS_POINT_SORTS)}'  # noqa E501
+        )
+
+    def _scan_access_points(self, max_age=None, ssids=None):
+        """
+        Scans, then refetches the properties of the visible
+        access points at once through call_many.
+        Without a scan, those already cached are kept.
+
+        Keyword Arguments:
+            max_age {float} -- how old, in seconds, the last scan
+            may be (default: {None}, always scan)
+            ssids {list} -- the networks the scan probes for
+            (default: {None}, all of them)
 
         Returns:
-            dict -- access point info
+            list -- the access points' object paths
         """
-        props = self.get_all_properties(ap_path, NM_ACCESS_POINT_IFACE)
-        return {
-            'ssid': self._get_ssid(props.get('Ssid')),
-            'mode': self._get_mode(props.get('Mode', '--')),
-            'rate': self._format_bitrate(props.get('MaxBitrate')),
-            'signal': int(props.get('Strength', '--')),
-            'bars': self._get_bars(props.get('Strength')),
-            'dbus_path': ap_path
+        scanned = self._scan_unless_recent(max_age, ssids)
+        access_points_paths = self._list_ap_paths()
+        self.prefetch_all_properties(
+            access_points_paths,
+            NM_ACCESS_POINT_IFACE,
+            refresh=scanned
+        )
+        return access_points_paths
 
-        }
+    def _iter_access_points(self, max_age=None):
+        """
+        Same as _get_all_access_points, each access point being
+        yielded as soon as its properties are fetched.
 
-    def _get_ssid(self, ssid_byte_list):
+        Keyword Arguments:
+            max_age {float} -- how old, in seconds, the last scan
+            may be (default: {None}, always scan)
+
+        Yields:
+            dict -- access point info
         """
-        Translates ssid from byte list to string.
-        Arguments:
-            ssid_byte_list {list} -- the raw ssid in byte form
+        scanned = self._scan_unless_recent(max_age)
+        access_points_paths = self._list_ap_paths()
+        for path, _ in self.iter_all_properties(
+            access_points_paths,
+            NM_ACCESS_POINT_IFACE,
+            refresh=scanned
+        ):
+            yield self._extract_ap_info(path)
+
+    def _scan_unless_recent(self, max_age=None, ssids=None):
+        """
+        Scans on every radio, except those whose last scan completed
+        at most `max_age` seconds ago: NetworkManager's access points
+        are then reused.
+        The user is told whether a scan is requested, or how old
+        the reused results are.
+        When scanning is refused because a scan just completed,
+        its results are used right away.
+        Whether the last scans were recent enough, and their age, are
+        reported by the profiler.
+
+        Keyword Arguments:
+            max_age {float} -- how old, in seconds, the last scan
+            may be (default: {None}, always scan)
+            ssids {list} -- the networks the scan probes for
+            (default: {None}, all of them)
 
         Returns:
-            string -- the ssid name
+            bool -- whether a scan was requested
         """
-        if len(ssid_byte_list) == 0:
-            return "--"
+        devices = list(self.wifi_devices)
+        if max_age is not None:
+            ages = {device: self._get_last_scan_age(device) for device in devices}  # noqa E501
+            devices = [
+                device for device, age in ages.items()
+                if age is None or age > max_age
+            ]
+            profiler.annotate('WiFi.scan_cache', 'miss' if devices else 'hit')
+            profiler.annotate('WiFi.scan_cache.age', ', '.join(
+                f'{self.wifi_devices[device]} '
+                + ('never scanned' if age is None else f'{age:.1f} s')
+                for device, age in ages.items()
+            ))
+            if not devices:
+                age = max(ages.values())
+                self.echo(f'Using access points from a scan {age:.0f} s ago')  # noqa E501
+                return False
+
+        self.echo('Scanning for available access points ...')
+        try:
+            self._wait_for_scan(devices, ssids=ssids)
+        except SystemExit:
+            pass
+        return True
 
-        ssid = ""
-        for char in ssid_byte_list:
-            ssid = ssid + chr(char)
+    def _get_last_scan_age(self, device_path=None):
+        """
+        Returns how many seconds ago a wireless device's last scan
+        completed, from its LastScan property, a CLOCK_BOOTTIME
+        timestamp in milliseconds, or None if it never scanned.
 
-        return ssid
+        Keyword Arguments:
+            device_path {string} -- the device's d-bus object path
+            (default: {None}, the first wireless device)
+        """
+        props = self.get_all_properties(
+            device_path or self.wifi_dev_path,
+            NM_WIRELESS_IFACE
+        )
+        last_scan = int(props.get('LastScan', -1))
+        if last_scan < 0:
+            return None
+        now = time.clock_gettime(time.CLOCK_BOOTTIME) * 1000
+        return max(now - last_scan, 0) / 1000
 
-    def _get_bars(self, signal):
+    def _wait_for_scan(self, devices=None, timeout=SCAN_TIMEOUT, ssids=None):
         """
-        Visually describes signal strength by assigning
-        it to a number or bars (*)
+        Requests a scan on every given radio at once, then runs the
+        main loop until each device's LastScan property changes, which
+        NetworkManager does once its scan's results are in, or for
+        `timeout` seconds: the wait lasts as long as the slowest scan.
+        Devices without a LastScan property (NetworkManager < 1.12)
+        are done once no access point was added or removed for
+        SCAN_SETTLE_TIME seconds.
 
-        Arguments:
-            signal {string} -- the device's signal strength
+        Keyword Arguments:
+            devices {list} -- the wireless devices' d-bus object paths
+            (default: {None}, every wireless device)
+            timeout {int} -- seconds to wait for (default: {SCAN_TIMEOUT})
+            ssids {list} -- the networks the scans probe for
+            (default: {None}, all of them)
 
         Returns:
-            string -- the number or bars
-        """
-        signal = int(signal)
-        if signal in range(0, 30):
-            return "*"
-        elif signal in range(30, 60):
-            return "**"
-        elif signal in range(60, 80):
-            return "***"
-        elif signal in range(80, 101):
-            return "****"
-        else:
-            return "--"
+            bool -- whether the scans completed before the timeout
+        """
+        devices = list(map(str, devices or self.wifi_devices))
+        has_last_scan = {
+            device: 'LastScan' in self.get_all_properties(
+                device,
+                NM_WIRELESS_IFACE
+            )
+            for device in devices
+        }
+        loop = self.create_main_loop()
+        pending = set(devices)
+        settle_timers = {}
+        state = {'timed_out': False}
+
+        def on_scanned(device):
+            if device in pending:
+                pending.discard(device)
+                if not pending:
+                    loop.quit()
+
+        def on_properties_changed(device, iface_name, changed, invalidated):
+            if iface_name == NM_WIRELESS_IFACE and 'LastScan' in changed:
+                on_scanned(device)
+
+        def on_access_points_changed(device, ap_path):
+            if has_last_scan[device]:
+                return
+            if device in settle_timers:
+                self.source_remove(settle_timers[device])
+            settle_timers[device] = self.timeout_add(
+                SCAN_SETTLE_TIME,
+                partial(on_settled, device)
+            )
 
-    def _get_mode(self, mode):
+        def on_settled(device):
+            del settle_timers[device]
+            on_scanned(device)
+            return False
+
+        def on_timeout():
+            state['timed_out'] = True
+            loop.quit()
+            return False
+
+        matches = []
+        for device in devices:
+            proxy = self.get_proxy(device)
+            matches.extend([
+                proxy.connect_to_signal(
+                    'PropertiesChanged',
+                    partial(on_properties_changed, device),
+                    DBUS_PROPERTIES_IFACE
+                ),
+                proxy.connect_to_signal(
+                    'AccessPointAdded',
+                    partial(on_access_points_changed, device),
+                    NM_WIRELESS_IFACE
+                ),
+                proxy.connect_to_signal(
+                    'AccessPointRemoved',
+                    partial(on_access_points_changed, device),
+                    NM_WIRELESS_IFACE
+                )
+            ])
+        try:
+            requested_scans = self._request_scans(devices, ssids)
+            for device, requested in zip(devices, requested_scans):
+                if not requested:
+                    pending.discard(device)
+            if pending:
+                timer = self.timeout_add(timeout, on_timeout)
+                with profiler.measure('MainLoop.run', 'loop'):
+                    loop.run()
+                if not state['timed_out']:
+                    self.source_remove(timer)
+        finally:
+            for match in matches:
+                match.remove()
+            for timer in settle_timers.values():
+                self.source_remove(timer)
+
+        return not state['timed_out']
+
+    def _track_access_point(self, ap_path, device_path=None):
         """
-        Convert device mode integer to its string equivalent.
+        Starts monitoring an access point, its current strength
+        being its first sample.
+        Access points which vanished before their properties could
+        be read are ignored.
 
         Arguments:
-            mode {str} -- the device mode
+            ap_path {string} -- the access point's own d-bus object path
+
+        Keyword Arguments:
+            device_path {string} -- the radio seeing it
+            (default: {None}, as listed by _list_ap_paths)
+        """
+        ap_path = str(ap_path)
+        if device_path is not None:
+            self._ap_devices[ap_path] = str(device_path)
+        try:
+            access_point = self._extract_ap_info(ap_path)
+        except self.dbus_exception:
+            return
+        history = SignalHistory(self._monitor_window)
+        history.add(time.monotonic(), access_point.signal)
+        self._monitored[ap_path] = (access_point, history)
+
+    @profiler.profile('WiFi._handle_monitor_properties_changed', 'signal')
+    def _handle_monitor_properties_changed(self, iface_name, changed,
+                                           invalidated, path=None):
+        """
+        Samples a monitored access point's new strength, or notes
+        which access point a wireless device is now associated with.
+        Other objects' changes are ignored.
+        """
+        path = str(path)
+        if iface_name == NM_ACCESS_POINT_IFACE and 'Strength' in changed:
+            monitored = self._monitored.get(path)
+            if monitored is None:
+                return
+            access_point, history = monitored
+            access_point.signal = int(changed['Strength'])
+            history.add(time.monotonic(), access_point.signal)
+        elif iface_name == NM_WIRELESS_IFACE and 'ActiveAccessPoint' in changed:  # noqa E501
+            if path in self._active_aps:
+                self._active_aps[path] = str(changed['ActiveAccessPoint'])
+
+    @profiler.profile('WiFi._handle_access_point_added', 'signal')
+    def _handle_access_point_added(self, device_path, ap_path):
+        self._track_access_point(ap_path, device_path)
+
+    @profiler.profile('WiFi._handle_access_point_removed', 'signal')
+    def _handle_access_point_removed(self, ap_path):
+        self._monitored.pop(str(ap_path), None)
+        self._ap_devices.pop(str(ap_path), None)
+
+    def _get_monitor_records(self):
+        """
+        Returns a record per monitored access point, with its latest,
+        lowest, average and highest strength over its samples,
+        the associated access points first, then the strongest.
 
         Returns:
-            string -- the corresponding human readable mode
+            list -- the records, dictionaries keyed by MONITOR_FIELDS
         """
-        mode = int(mode)
-        if mode == 4:
-            return "Mesh"
+        active = set(self._active_aps.values())
+        records = [
+            {
+                'active': ap_path in active,
+                'ssid': access_point.ssid,
+                'bssid': access_point.bssid,
+                'device': access_point.device,
+                'signal': history.latest,
+                'min': history.minimum,
+                'avg': history.average,
+                'max': history.maximum,
+                'samples': len(history)
+            }
+            for ap_path, (access_point, history) in self._monitored.items()
+        ]
+        records.sort(key=lambda record: (record['active'], record['signal']), reverse=True)  # noqa E501
+        return records
+
+    def _render_monitor(self, writer=None):
+        """
+        Writes the monitored access points' records with `writer`,
+        or redraws their table.
 
-        if mode == 3:
-            return "Access Point"
+        Keyword Arguments:
+            writer {RecordWriter} -- the machine readable output's writer
+            (default: {None}, a table)
+        """
+        records = self._get_monitor_records()
+        if writer is not None:
+            for record in records:
+                writer.write(record)
+            return
+
+        self.status_table_keys = [field.upper() for field in MONITOR_FIELDS]
+        self.status_table.field_names = self.status_table_keys
+        for record in records:
+            row = [record[field] for field in MONITOR_FIELDS]
+            row[0] = '*' if record['active'] else ''
+            self.status_table.add_row(
+                row,
+                color=self._get_signal_color(record['signal'])
+            )
+        click.clear()
+        echo_table(self.status_table)
+
+    def _list_ap_paths(self):
+        """
+        Calls GetAllAccessPoints on every wireless device at once
+        through call_many, noting which device sees each access point.
+
+        Returns:
+            list -- list of access points object paths
+        """
+        devices = list(self.wifi_devices)
+        calls = [
+            (device, NM_WIRELESS_IFACE, 'GetAllAccessPoints', ())
+            for device in devices
+        ]
+        access_points_paths = []
+        for device, paths in zip(devices, self.call_many(calls)):
+            for path in paths:
+                self._ap_devices[str(path)] = device
+            access_points_paths.extend(paths)
+        return access_points_paths
+
+    def _request_scans(self, devices, ssids=None):
+        """
+        Calls RequestScan on the wireless devices at once
+        through call_many.
+        With `ssids`, NetworkManager only probes for those networks
+        rather than sweeping every channel for all of them.
+        Exits if every device refused because it just scanned.
 
-        if mode == 2:
-            return "Infra"
+        Arguments:
+            devices {list} -- the wireless devices' d-bus object paths
 
-        if mode == 1:
-            return "Ad Hoc"
+        Keyword Arguments:
+            ssids {list} -- the networks to probe for
+            (default: {None}, all of them)
 
-        if mode == 0:
-            return "Unknown"
+        Returns:
+            list -- whether each device's scan was requested
+        """
+        options = {}
+        if ssids:
+            options['ssids'] = [ssid.encode('utf-8') for ssid in ssids]
+        calls = [
+            (device, NM_WIRELESS_IFACE, 'RequestScan', (options,))
+            for device in devices
+        ]
+        results = self.call_many(calls, return_exceptions=True)
+
+        err = "Scanning not allowed immediately following previous scan"
+        rate_limited = [
+            isinstance(result, self.dbus_exception)
+            and result.get_dbus_message() == err
+            for result in results
+        ]
+        if all(rate_limited):
+            sys.exit(colored(f"[Error]: {err}", "red"))
+        return [not isinstance(result, Exception) for result in results]
 
-    def _format_bitrate(self, bitrate):
+    def _extract_ap_info(self, ap_path):
         """
-        Convert bitrate value into a human readable string
+        Builds the access point's record from its properties,
+        tagged with the radio (wireless device) seeing it.
 
         Arguments:
-            bitrate {float} -- bitrate
+            ap_path {string} -- the access point's own d-bus object path
 
         Returns:
-            string -- human readable bitrate
+            AccessPoint -- access point info
         """
-        bitrate = int(bitrate) // 1000
-        return f"{bitrate} Mbit/s"
+        props = self.get_all_properties(ap_path, NM_ACCESS_POINT_IFACE)
+        device_path = self._ap_devices.get(str(ap_path))
+        return AccessPoint.from_properties(
+            ap_path,
+            props,
+            self.wifi_devices[device_path] if device_path else '--'
+        )
 
     def _exit_loop(self, msg, error=False):
         """
@@ -608,5 +1156,5 @@ class WiFi(WyPy):
         """
         if error:
             msg = colored(msg, 'red')
-        click.echo(msg)
+        self.echo(msg)
         self.loop.quit()
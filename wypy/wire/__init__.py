@@ -0,0 +1,2 @@
+from .bus import SystemBus, WireBus, WireError  # noqa F401
+from .marshal import marshal, unmarshal, Variant  # noqa F401
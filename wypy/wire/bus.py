@@ -0,0 +1,496 @@
+import os
+import heapq
+import select
+import socket
+import time
+from collections import deque
+from itertools import count
+from wypy.wire.marshal import guess_signature
+from wypy.wire.message import (
+    Message,
+    METHOD_CALL,
+    METHOD_RETURN,
+    ERROR,
+    SIGNAL
+)
+from wypy.utils.constants import (
+    DBUS_BUS_NAME,
+    DBUS_OBJ_PATH,
+    DBUS_IFACE,
+    DBUS_CALL_TIMEOUT
+)
+
+SYSTEM_BUS_ADDRESS = 'unix:path=/var/run/dbus/system_bus_socket'
+RECV_SIZE = 65536
+
+
+class WireError(Exception):
+    """
+    A d-bus error reply, or a failure talking to the bus.
+    WyPy catches it as its `dbus_exception` with the wire backend.
+    """
+
+    def __init__(self, message, name='org.freedesktop.DBus.Error.Failed'):
+        super().__init__(message)
+        self._dbus_error_name = name
+
+    def get_dbus_name(self):
+        return self._dbus_error_name
+
+    def get_dbus_message(self):
+        return str(self.args[0]) if self.args else ''
+
+
+class WireBus(object):
+    """
+    A connection to a message bus which speaks the d-bus wire protocol
+    directly over its unix socket, without libdbus or GLib.
+
+    Its interface mirrors the parts of dbus.Bus which wypy uses.
+    """
+
+    def __init__(self, address=None, timeout=DBUS_CALL_TIMEOUT):
+        self.address = address or os.environ.get(
+            'DBUS_SYSTEM_BUS_ADDRESS',
+            SYSTEM_BUS_ADDRESS
+        )
+        self.timeout = timeout
+        self._serials = count(1)
+        self._pending = {}
+        self._incoming = deque()
+        self._rbuf = bytearray()
+        self._recv_buf = bytearray(RECV_SIZE)
+        self._receivers = []
+        self._timers = []
+        self._timer_ids = count(1)
+        self._removed_timers = set()
+
+        self.sock = self._connect(self.address)
+        self._authenticate()
+        self.unique_name = self.call_blocking(
+            DBUS_BUS_NAME, DBUS_OBJ_PATH, DBUS_IFACE, 'Hello', '', ()
+        )
+
+    def get_object(self, bus_name, object_path, introspect=False, **kwargs):  # noqa E501
+        return WireProxy(self, bus_name, object_path)
+
+    def get_unique_name(self):
+        return self.unique_name
+
+    def close(self):
+        self.sock.close()
+
+    def call_blocking(self, bus_name, object_path, dbus_interface, method,
+                      signature, args, timeout=None):
+        """
+        Sends a method call and waits for its reply. Other messages
+        received in the meantime are queued up for the main loop.
+
+        Returns:
+            object -- None, the only return value, or a tuple of them
+        """
+        serial = self._send_call(
+            bus_name, object_path, dbus_interface, method, signature, args
+        )
+        deadline = time.monotonic() + (timeout or self.timeout)
+
+        while True:
+            message = self._find_reply(serial)
+            if message is not None:
+                return self._unpack_reply(message)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise WireError(
+                    f'{dbus_interface}.{method} timed out',
+                    'org.freedesktop.DBus.Error.NoReply'
+                )
+            self._read(remaining)
+
+    def call_async(self, bus_name, object_path, dbus_interface, method,
+                   signature, args, reply_handler, error_handler,
+                   timeout=None):
+        """
+        Sends a method call whose reply is handed to `reply_handler` or
+        `error_handler` by the main loop.
+        """
+        serial = self._send_call(
+            bus_name, object_path, dbus_interface, method, signature, args
+        )
+        self._pending[serial] = (reply_handler, error_handler)
+
+    def add_signal_receiver(self, handler_function, signal_name=None,
+                            dbus_interface=None, bus_name=None, path=None,
+                            path_keyword=None, **kwargs):
+        """
+        Subscribes `handler_function` to a signal. The handler is called
+        with the signal's arguments by the main loop.
+
+        Returns:
+            SignalMatch -- call its remove() method to unsubscribe
+        """
+        match = SignalMatch(
+            self, handler_function, signal_name, dbus_interface,
+            bus_name, path, path_keyword
+        )
+        self.call_blocking(
+            DBUS_BUS_NAME, DBUS_OBJ_PATH, DBUS_IFACE,
+            'AddMatch', 's', (match.rule,)
+        )
+        self._receivers.append(match)
+        return match
+
+    def remove_signal_receiver(self, match):
+        if match not in self._receivers:
+            return
+        self._receivers.remove(match)
+        self.call_blocking(
+            DBUS_BUS_NAME, DBUS_OBJ_PATH, DBUS_IFACE,
+            'RemoveMatch', 's', (match.rule,)
+        )
+
+    def create_main_loop(self):
+        return WireLoop(self)
+
+    def timeout_add(self, interval, callback, *args):
+        """
+        Calls `callback` after `interval` milliseconds, and again every
+        interval for as long as it returns True, like GLib.timeout_add.
+
+        Returns:
+            int -- an id to pass to source_remove
+        """
+        timer_id = next(self._timer_ids)
+        deadline = time.monotonic() + interval / 1000
+        heapq.heappush(
+            self._timers,
+            (deadline, timer_id, interval, callback, args)
+        )
+        return timer_id
+
+    def source_remove(self, timer_id):
+        self._removed_timers.add(timer_id)
+        return True
+
+    def iteration(self, timeout=None):
+        """
+        Dispatches the queued messages, waiting up to `timeout` seconds
+        (or until the next timer is due) for new ones, then runs the
+        timers that are due.
+        """
+        if not self._incoming:
+            if self._timers:
+                next_timer = max(self._timers[0][0] - time.monotonic(), 0)
+                timeout = next_timer if timeout is None else min(timeout, next_timer)  # noqa E501
+            self._read(timeout)
+
+        while self._incoming:
+            self._dispatch(self._incoming.popleft())
+
+        self._run_timers()
+
+    # --------------- #
+    # Private Methods #
+    # --------------- #
+
+    def _connect(self, address):
+        """
+        Connects to the first reachable unix socket in a d-bus address.
+        """
+        errors = []
+        for entry in address.split(';'):
+            transport, _, params = entry.partition(':')
+            if transport != 'unix':
+                continue
+            options = dict(
+                param.split('=', 1) for param in params.split(',') if param
+            )
+            if 'path' in options:
+                target = options['path']
+            elif 'abstract' in options:
+                target = '\0' + options['abstract']
+            else:
+                continue
+
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(target)
+                return sock
+            except OSError as error:
+                sock.close()
+                errors.append(str(error))
+
+        raise WireError(
+            f'Could not connect to {address}: {"; ".join(errors)}',
+            'org.freedesktop.DBus.Error.NoServer'
+        )
+
+    def _authenticate(self):
+        """
+        Performs the SASL EXTERNAL handshake, which authenticates us with
+        the credentials of the socket itself.
+        """
+        uid = str(os.geteuid()).encode('ascii').hex()
+        self.sock.sendall(b'\0AUTH EXTERNAL ' + uid.encode('ascii') + b'\r\n')
+
+        line = self._read_line()
+        if not line.startswith(b'OK '):
+            self.sock.close()
+            raise WireError(
+                f'Authentication rejected: {line.decode("ascii", "replace")}',
+                'org.freedesktop.DBus.Error.AuthFailed'
+            )
+        self.sock.sendall(b'BEGIN\r\n')
+
+    def _read_line(self):
+        self.sock.settimeout(self.timeout)
+        try:
+            while b'\r\n' not in self._rbuf:
+                data = self.sock.recv(4096)
+                if not data:
+                    raise WireError(
+                        'Connection closed during authentication',
+                        'org.freedesktop.DBus.Error.Disconnected'
+                    )
+                self._rbuf += data
+        finally:
+            self.sock.settimeout(None)
+
+        line, _, rest = self._rbuf.partition(b'\r\n')
+        self._rbuf = bytearray(rest)
+        return bytes(line)
+
+    def _send_call(self, bus_name, object_path, dbus_interface, method,
+                   signature, args):
+        if signature is None:
+            signature = ''.join(map(guess_signature, args))
+
+        serial = next(self._serials)
+        message = Message(
+            METHOD_CALL,
+            serial,
+            destination=bus_name,
+            path=object_path,
+            interface=dbus_interface,
+            member=method,
+            signature=signature or None,
+            body=args
+        )
+        self.sock.sendall(message.encode())
+        return serial
+
+    def _find_reply(self, serial):
+        for index, message in enumerate(self._incoming):
+            if message.message_type in (METHOD_RETURN, ERROR) \
+                    and message.reply_serial == serial:
+                del self._incoming[index]
+                return message
+        return None
+
+    def _unpack_reply(self, message):
+        if message.message_type == ERROR:
+            raise WireError(
+                message.body[0] if message.body else '',
+                message.error_name
+            )
+        if len(message.body) == 0:
+            return None
+        if len(message.body) == 1:
+            return message.body[0]
+        return tuple(message.body)
+
+    def _read(self, timeout=None):
+        """
+        Waits up to `timeout` seconds for data on the socket and queues
+        up every complete message received.
+        """
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        if not ready:
+            return
+
+        received = self.sock.recv_into(self._recv_buf)
+        if received == 0:
+            raise WireError(
+                'Connection closed by the bus',
+                'org.freedesktop.DBus.Error.Disconnected'
+            )
+        with memoryview(self._recv_buf) as view:
+            self._rbuf += view[:received]
+
+        offset = 0
+        with memoryview(self._rbuf) as view:
+            while True:
+                length = Message.get_length(view, offset)
+                if length is None or offset + length > len(view):
+                    break
+                with view[offset:offset + length] as message_view:
+                    self._incoming.append(Message.decode(message_view))
+                offset += length
+        del self._rbuf[:offset]
+
+    def _dispatch(self, message):
+        if message.message_type in (METHOD_RETURN, ERROR):
+            handlers = self._pending.pop(message.reply_serial, None)
+            if handlers is None:
+                return
+            reply_handler, error_handler = handlers
+            if message.message_type == ERROR:
+                error_handler(WireError(
+                    message.body[0] if message.body else '',
+                    message.error_name
+                ))
+            else:
+                reply_handler(*message.body)
+        elif message.message_type == SIGNAL:
+            for match in list(self._receivers):
+                match.maybe_handle(message)
+
+    def _run_timers(self):
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, timer_id, interval, callback, args = heapq.heappop(self._timers)
+            if timer_id in self._removed_timers:
+                self._removed_timers.discard(timer_id)
+                continue
+            if callback(*args):
+                heapq.heappush(self._timers, (
+                    now + interval / 1000, timer_id, interval, callback, args
+                ))
+
+
+class WireProxy(object):
+    """
+    A remote object, standing in for dbus.proxies.ProxyObject.
+    """
+
+    def __init__(self, bus, bus_name, object_path):
+        self.bus = bus
+        self.bus_name = bus_name
+        self.object_path = object_path
+
+    def get_dbus_method(self, member, dbus_interface=None):
+        return WireMethod(self, member, dbus_interface)
+
+    def connect_to_signal(self, signal_name, handler_function,
+                          dbus_interface=None, **keywords):
+        return self.bus.add_signal_receiver(
+            handler_function,
+            signal_name,
+            dbus_interface,
+            self.bus_name,
+            self.object_path,
+            **keywords
+        )
+
+    def __getattr__(self, member):
+        if member.startswith('__') and member.endswith('__'):
+            raise AttributeError(member)
+        return WireMethod(self, member)
+
+
+class WireMethod(object):
+    """
+    A callable remote method, standing in for dbus.proxies._ProxyMethod.
+    Without an explicit signature, the arguments' signature is guessed.
+    """
+
+    def __init__(self, proxy, member, dbus_interface=None):
+        self.proxy = proxy
+        self.member = member
+        self.dbus_interface = dbus_interface
+
+    def __call__(self, *args, signature=None, dbus_interface=None,
+                 reply_handler=None, error_handler=None, timeout=None,
+                 **kwargs):
+        proxy = self.proxy
+        call_args = (
+            proxy.bus_name,
+            proxy.object_path,
+            dbus_interface or self.dbus_interface,
+            self.member,
+            signature,
+            args
+        )
+
+        if reply_handler is not None or error_handler is not None:
+            return proxy.bus.call_async(
+                *call_args,
+                reply_handler or (lambda *reply: None),
+                error_handler or (lambda error: None),
+                timeout
+            )
+        return proxy.bus.call_blocking(*call_args, timeout)
+
+
+class SignalMatch(object):
+    """
+    A signal subscription, standing in for dbus.connection.SignalMatch.
+    """
+
+    def __init__(self, bus, handler, signal_name, dbus_interface, bus_name,
+                 path, path_keyword):
+        self.bus = bus
+        self.handler = handler
+        self.signal_name = signal_name
+        self.dbus_interface = dbus_interface
+        self.path = path
+        self.path_keyword = path_keyword
+
+        rule = {
+            'type': 'signal',
+            'sender': bus_name,
+            'interface': dbus_interface,
+            'member': signal_name,
+            'path': path
+        }
+        self.rule = ','.join(
+            f"{key}='{value}'" for key, value in rule.items() if value
+        )
+
+    def maybe_handle(self, message):
+        """
+        Calls the handler if the signal matches this subscription.
+        The sender is filtered by the bus itself through the match rule.
+        """
+        if self.signal_name and message.member != self.signal_name:
+            return
+        if self.dbus_interface and message.interface != self.dbus_interface:
+            return
+        if self.path and message.path != self.path:
+            return
+
+        if self.path_keyword:
+            self.handler(*message.body, **{self.path_keyword: message.path})
+        else:
+            self.handler(*message.body)
+
+    def remove(self):
+        self.bus.remove_signal_receiver(self)
+
+
+class WireLoop(object):
+    """
+    A main loop for a WireBus, with the run/quit interface of
+    GLib.MainLoop.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self._running = False
+
+    def run(self):
+        self._running = True
+        while self._running:
+            self.bus.iteration()
+
+    def quit(self):
+        self._running = False
+
+    def is_running(self):
+        return self._running
+
+
+def SystemBus(**kwargs):
+    """
+    Returns a WireBus connected to the system bus.
+    """
+    return WireBus(**kwargs)
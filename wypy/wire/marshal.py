@@ -0,0 +1,316 @@
+import struct
+from functools import lru_cache
+
+# struct formats of the fixed size d-bus types
+BASIC_FORMATS = {
+    'y': 'B',
+    'b': 'I',
+    'n': 'h',
+    'q': 'H',
+    'i': 'i',
+    'u': 'I',
+    'x': 'q',
+    't': 'Q',
+    'd': 'd',
+    'h': 'I'
+}
+
+ALIGNMENT = {
+    'y': 1, 'b': 4, 'n': 2, 'q': 2, 'i': 4, 'u': 4, 'x': 8, 't': 8,
+    'd': 8, 'h': 4, 's': 4, 'o': 4, 'g': 1, 'a': 4, '(': 8, '{': 8, 'v': 1
+}
+
+STRUCTS = {
+    endian: {
+        code: struct.Struct(prefix + fmt)
+        for code, fmt in BASIC_FORMATS.items()
+    }
+    for endian, prefix in (('l', '<'), ('B', '>'))
+}
+
+# dbus-python's integer types, recognised by name so that
+# this module does not need to import dbus-python.
+INTEGER_TYPES = {
+    'Byte': 'y',
+    'Int16': 'n',
+    'UInt16': 'q',
+    'Int32': 'i',
+    'UInt32': 'u',
+    'Int64': 'x',
+    'UInt64': 't'
+}
+
+
+class Variant(object):
+    """
+    A value along with the signature it must be marshalled with
+    when it is sent as a variant.
+    """
+    __slots__ = ('signature', 'value')
+
+    def __init__(self, signature, value):
+        self.signature = signature
+        self.value = value
+
+
+@lru_cache(maxsize=None)
+def parse_signature(signature):
+    """
+    Splits a signature into its complete types.
+    Each type is a (code, children, signature) tuple.
+
+    Arguments:
+        signature {string} -- a d-bus signature
+
+    Returns:
+        tuple -- the parsed complete types
+    """
+    types, index = [], 0
+    while index < len(signature):
+        node, index = _parse_type(signature, index)
+        types.append(node)
+    return tuple(types)
+
+
+def _parse_type(signature, start):
+    code = signature[start]
+
+    if code == 'a':
+        child, end = _parse_type(signature, start + 1)
+        return (code, (child,), signature[start:end]), end
+
+    if code in '({':
+        close = ')' if code == '(' else '}'
+        children, index = [], start + 1
+        while signature[index] != close:
+            child, index = _parse_type(signature, index)
+            children.append(child)
+        end = index + 1
+        return (code, tuple(children), signature[start:end]), end
+
+    if code not in ALIGNMENT:
+        raise ValueError(f'Invalid signature: {signature}')
+
+    return (code, (), code), start + 1
+
+
+def guess_signature(value):
+    """
+    Guesses the signature of a value to be sent as a variant.
+
+    Arguments:
+        value {object} -- python or dbus-python value
+
+    Returns:
+        string -- the value's signature
+    """
+    if isinstance(value, Variant):
+        return value.signature
+    if isinstance(value, bool):
+        return 'b'
+    if isinstance(value, int):
+        return INTEGER_TYPES.get(type(value).__name__, 'i' if -2**31 <= value < 2**31 else 'x')  # noqa E501
+    if isinstance(value, float):
+        return 'd'
+    if isinstance(value, str):
+        return {'ObjectPath': 'o', 'Signature': 'g'}.get(type(value).__name__, 's')  # noqa E501
+    if isinstance(value, (bytes, bytearray)):
+        return 'ay'
+    if isinstance(value, dict):
+        signature = getattr(value, 'signature', None)
+        if signature:
+            return 'a{' + signature + '}'
+        key = next(iter(value), '')
+        return 'a{' + guess_signature(key) + 'v}'
+    if isinstance(value, tuple):
+        return '(' + ''.join(map(guess_signature, value)) + ')'
+    if isinstance(value, list):
+        signature = getattr(value, 'signature', None)
+        if signature:
+            return 'a' + signature
+        if len(value) == 0:
+            return 'av'
+        return 'a' + guess_signature(value[0])
+    raise TypeError(f'Cannot guess the d-bus signature of {value!r}')
+
+
+class Marshaller(object):
+    """
+    Serialises values into a single growing bytearray.
+    Offsets are relative to the start of the buffer, which is
+    always 8-byte aligned within a message.
+    """
+
+    def __init__(self, endian='l'):
+        self.buf = bytearray()
+        self.structs = STRUCTS[endian]
+
+    def align(self, alignment):
+        padding = -len(self.buf) % alignment
+        if padding:
+            self.buf.extend(bytes(padding))
+
+    def write_all(self, signature, values):
+        types = parse_signature(signature)
+        if len(types) != len(values):
+            raise TypeError(
+                f'Signature "{signature}" expects {len(types)} values, '
+                f'got {len(values)}'
+            )
+        for node, value in zip(types, values):
+            self.write(node, value)
+        return self.buf
+
+    def write(self, node, value):
+        code, children, _ = node
+
+        if code in 'so':
+            data = value.encode('utf-8')
+            self.align(4)
+            self.buf += self.structs['u'].pack(len(data))
+            self.buf += data
+            self.buf.append(0)
+        elif code == 'g':
+            data = value.encode('ascii')
+            self.buf.append(len(data))
+            self.buf += data
+            self.buf.append(0)
+        elif code == 'v':
+            signature = guess_signature(value)
+            if isinstance(value, Variant):
+                value = value.value
+            self.write(('g', (), 'g'), signature)
+            self.write(parse_signature(signature)[0], value)
+        elif code == 'a':
+            self._write_array(children[0], value)
+        elif code in '({':
+            self.align(8)
+            for child, item in zip(children, value):
+                self.write(child, item)
+        elif code == 'b':
+            self.align(4)
+            self.buf += self.structs['u'].pack(1 if value else 0)
+        else:
+            fmt = self.structs[code]
+            self.align(fmt.size)
+            self.buf += fmt.pack(value)
+
+    def _write_array(self, child, value):
+        self.align(4)
+        length_offset = len(self.buf)
+        self.buf += bytes(4)
+        self.align(ALIGNMENT[child[0]])
+        start = len(self.buf)
+
+        if child[0] == 'y' and isinstance(value, (bytes, bytearray)):
+            self.buf += value
+        elif child[0] == '{':
+            for item in value.items():
+                self.write(child, item)
+        else:
+            for item in value:
+                self.write(child, item)
+
+        self.structs['u'].pack_into(
+            self.buf,
+            length_offset,
+            len(self.buf) - start
+        )
+
+
+class Unmarshaller(object):
+    """
+    Reads values straight out of a memoryview with struct.unpack_from,
+    without slicing the underlying buffer into intermediate copies.
+    Variants are returned as their plain value.
+    """
+
+    def __init__(self, view, offset=0, endian='l'):
+        self.view = view
+        self.offset = offset
+        self.structs = STRUCTS[endian]
+
+    def align(self, alignment):
+        self.offset += -self.offset % alignment
+
+    def read_all(self, signature):
+        return [self.read(node) for node in parse_signature(signature)]
+
+    def read(self, node):
+        code, children, _ = node
+        view = self.view
+
+        if code in 'so':
+            self.align(4)
+            length = self.structs['u'].unpack_from(view, self.offset)[0]
+            start = self.offset + 4
+            self.offset = start + length + 1
+            return str(view[start:start + length], 'utf-8')
+
+        if code == 'g':
+            length = view[self.offset]
+            start = self.offset + 1
+            self.offset = start + length + 1
+            return str(view[start:start + length], 'ascii')
+
+        if code == 'v':
+            signature = self.read(('g', (), 'g'))
+            return self.read(parse_signature(signature)[0])
+
+        if code == 'a':
+            return self._read_array(children[0])
+
+        if code in '({':
+            self.align(8)
+            return tuple(self.read(child) for child in children)
+
+        fmt = self.structs[code]
+        self.align(fmt.size)
+        value = fmt.unpack_from(view, self.offset)[0]
+        self.offset += fmt.size
+        return bool(value) if code == 'b' else value
+
+    def _read_array(self, child):
+        self.align(4)
+        length = self.structs['u'].unpack_from(self.view, self.offset)[0]
+        self.offset += 4
+        self.align(ALIGNMENT[child[0]])
+        end = self.offset + length
+
+        if child[0] == 'y':
+            data = bytes(self.view[self.offset:end])
+            self.offset = end
+            return data
+
+        if child[0] == '{':
+            result = {}
+            while self.offset < end:
+                key, value = self.read(child)
+                result[key] = value
+            return result
+
+        result = []
+        while self.offset < end:
+            result.append(self.read(child))
+        return result
+
+
+def marshal(signature, values, endian='l'):
+    """
+    Serialises `values` according to `signature`.
+
+    Returns:
+        bytearray -- the marshalled values
+    """
+    return Marshaller(endian).write_all(signature, values)
+
+
+def unmarshal(signature, data, endian='l'):
+    """
+    Deserialises the values described by `signature` from `data`.
+
+    Returns:
+        list -- the unmarshalled values
+    """
+    with memoryview(data) as view:
+        return Unmarshaller(view, 0, endian).read_all(signature)
@@ -0,0 +1,121 @@
+import struct
+from wypy.wire.marshal import Marshaller, Unmarshaller, Variant
+
+METHOD_CALL = 1
+METHOD_RETURN = 2
+ERROR = 3
+SIGNAL = 4
+
+NO_REPLY_EXPECTED = 0x1
+
+PROTOCOL_VERSION = 1
+
+# header field name -> (code, signature)
+HEADER_FIELDS = {
+    'path': (1, 'o'),
+    'interface': (2, 's'),
+    'member': (3, 's'),
+    'error_name': (4, 's'),
+    'reply_serial': (5, 'u'),
+    'destination': (6, 's'),
+    'sender': (7, 's'),
+    'signature': (8, 'g'),
+    'unix_fds': (9, 'u')
+}
+HEADER_NAMES = {code: name for name, (code, _) in HEADER_FIELDS.items()}
+
+HEADER_SIGNATURE = 'yyyyuua(yv)'
+
+# endianness, body length and header fields length, enough
+# to find out how long the whole message is.
+_PREAMBLE = {
+    ord('l'): struct.Struct('<4xI4xI'),
+    ord('B'): struct.Struct('>4xI4xI')
+}
+PREAMBLE_SIZE = 16
+
+
+class Message(object):
+    """
+    A d-bus message: its type, header fields and body.
+    """
+    __slots__ = (
+        'message_type', 'flags', 'serial', 'body',
+        *HEADER_FIELDS.keys()
+    )
+
+    def __init__(self, message_type, serial=0, flags=0, body=(), **fields):
+        self.message_type = message_type
+        self.serial = serial
+        self.flags = flags
+        self.body = body
+        for name in HEADER_FIELDS:
+            setattr(self, name, fields.get(name))
+
+    def encode(self):
+        """
+        Serialises the message, header and body, into one bytearray.
+
+        Returns:
+            bytearray -- the message as sent on the wire
+        """
+        body = Marshaller().write_all(self.signature, self.body) \
+            if self.signature else b''
+
+        fields = [
+            (code, Variant(signature, getattr(self, name)))
+            for name, (code, signature) in HEADER_FIELDS.items()
+            if getattr(self, name) is not None
+        ]
+
+        marshaller = Marshaller()
+        marshaller.write_all(HEADER_SIGNATURE, [
+            ord('l'), self.message_type, self.flags, PROTOCOL_VERSION,
+            len(body), self.serial, fields
+        ])
+        marshaller.align(8)
+        marshaller.buf += body
+        return marshaller.buf
+
+    @staticmethod
+    def get_length(buf, offset=0):
+        """
+        Returns the total length of the message starting at `offset`,
+        or None if not enough of it has been received yet.
+        """
+        if len(buf) - offset < PREAMBLE_SIZE:
+            return None
+        body_length, fields_length = \
+            _PREAMBLE[buf[offset]].unpack_from(buf, offset)
+        header_length = PREAMBLE_SIZE + fields_length
+        header_length += -header_length % 8
+        return header_length + body_length
+
+    @classmethod
+    def decode(cls, view):
+        """
+        Parses one message out of a memoryview.
+
+        Arguments:
+            view {memoryview} -- exactly one message
+
+        Returns:
+            Message -- the parsed message
+        """
+        endian = 'l' if view[0] == ord('l') else 'B'
+        unmarshaller = Unmarshaller(view, 0, endian)
+        _, message_type, flags, _, _, serial, fields = \
+            unmarshaller.read_all(HEADER_SIGNATURE)
+
+        message = cls(message_type, serial, flags, **{
+            HEADER_NAMES[code]: value
+            for code, value in fields
+            if code in HEADER_NAMES
+        })
+
+        if message.signature:
+            unmarshaller.align(8)
+            message.body = unmarshaller.read_all(message.signature)
+        else:
+            message.body = []
+        return message
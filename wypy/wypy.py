@@ -1,98 +1,559 @@
-import dbus
-from wypy.utils.constants import NM_BUS_NAME
+import os
+import click
+from functools import partial
+from wypy.utils.helpers import lazy_property
+from wypy.utils.output import get_writer
+from wypy.utils.daemon import get_socket_path, fetch_snapshot
+from wypy.utils.interfaces import StaticInterface
+from wypy.utils.profiler import profiler
+from wypy.utils.signatures import get_method_signature
+from wypy.utils.constants import (
+    NM_BUS_NAME,
+    NM_OBJ_MANAGER_PATH,
+    DBUS_OBJ_MANAGER_IFACE,
+    DBUS_PROPERTIES_IFACE,
+    DBUS_MAX_IN_FLIGHT,
+    DBUS_CALL_TIMEOUT,
+    BACKENDS,
+    OUTPUT_FORMATS
+)
 from termcolor import colored
 
 
 class WyPy(object):
 
-    def __init__(self):
-        self.bus = dbus.SystemBus()
+    def __init__(self, backend=None, output=None):
+        self.backend = backend or os.environ.get('WYPY_BACKEND', 'dbus')
+        if self.backend not in BACKENDS:
+            raise ValueError(f'Unknown backend "{self.backend}"')
+        self.output = output or os.environ.get('WYPY_OUTPUT', 'table')
+        if self.output not in OUTPUT_FORMATS:
+            raise ValueError(f'Unknown output format "{self.output}"')
         self.bus_name = NM_BUS_NAME
-
+        self.snapshot = None
+        self._proxies = {}
+        self.max_in_flight = DBUS_MAX_IN_FLIGHT
+        self.call_timeout = DBUS_CALL_TIMEOUT
+        self.daemon_socket = get_socket_path()
+        self._daemon_checked = False
+        self.clear_property_cache()
+
+    @lazy_property
+    def bus(self):
+        """
+        The system bus connection, opened on first use.
+
+        With the 'dbus' backend, it is a dbus-python connection attached
+        to the GLib main loop so that asynchronous calls and signals can
+        be dispatched. With the 'wire' backend, it is a pure-python
+        connection speaking the d-bus protocol over the bus socket.
+        """
+        with profiler.measure('WyPy.bus'):
+            if self.backend == 'wire':
+                from wypy.wire import SystemBus
+                return SystemBus(timeout=self.call_timeout)
+            import dbus
+            from dbus.mainloop.glib import DBusGMainLoop
+            return dbus.SystemBus(mainloop=DBusGMainLoop())
+
+    @lazy_property
+    def dbus_exception(self):
+        """
+        The exception the backend raises for d-bus errors, which WyPy
+        raises too: dbus-python's DBusException, or WireError.
+        It is only imported when an error has to be caught or raised,
+        so that the wire backend never imports dbus-python.
+        """
+        if self.backend == 'wire':
+            from wypy.wire import WireError
+            return WireError
+        from dbus.exceptions import DBusException
+        return DBusException
+
+    def create_main_loop(self):
+        """
+        Returns a main loop dispatching the bus' replies and signals,
+        it has run() and quit() methods.
+        """
+        if self.backend == 'wire':
+            return self.bus.create_main_loop()
+        from gi.repository import GLib
+        return GLib.MainLoop()
+
+    def timeout_add(self, seconds, callback):
+        """
+        Schedules `callback` on the main loop after `seconds`.
+
+        Returns:
+            int -- the timer's id, to pass to source_remove
+        """
+        if self.backend == 'wire':
+            return self.bus.timeout_add(int(seconds * 1000), callback)
+        from gi.repository import GLib
+        return GLib.timeout_add(int(seconds * 1000), callback)
+
+    def source_remove(self, timer_id):
+        if self.backend == 'wire':
+            return self.bus.source_remove(timer_id)
+        from gi.repository import GLib
+        return GLib.source_remove(timer_id)
+
+    @property
+    def machine_output(self):
+        """
+        Whether records are output in a machine readable format
+        rather than as tables.
+        """
+        return self.output != 'table'
+
+    def echo(self, message):
+        """
+        Echos a message to the user. With a machine readable output,
+        it goes to stderr so that stdout only holds records.
+        """
+        if self.machine_output:
+            click.echo(message, err=True)
+        else:
+            click.echo(message)
+
+    def record_writer(self, fields=None):
+        """
+        Returns a writer for the chosen machine readable output.
+
+        Keyword Arguments:
+            fields {list} -- the keys to write, in order
+            (default: {None}, those of each record)
+
+        Returns:
+            RecordWriter -- the writer, to use as a context manager
+        """
+        return get_writer(self.output, fields)
+
+    def get_proxy(self, object_path):
+        """
+        Returns a proxy for the given NetworkManager object.
+        Proxies are created without introspection, method signatures
+        come from NM_METHOD_SIGNATURES instead, and are cached by path.
+
+        Arguments:
+            object_path {string} -- the object's d-bus path
+
+        Returns:
+            dbus.proxies.ProxyObject -- the object's proxy
+        """
+        object_path = str(object_path)
+        if object_path not in self._proxies:
+            self._proxies[object_path] = self.bus.get_object(
+                self.bus_name,
+                object_path,
+                introspect=False
+            )
+        return self._proxies[object_path]
+
+    def get_interface(self, object_path, iface_name):
+        """
+        Returns an interface on the given NetworkManager object
+        whose method calls carry their static signature.
+
+        Arguments:
+            object_path {string} -- the object's d-bus path
+            iface_name {string} -- the d-bus interface to use
+
+        Returns:
+            StaticInterface -- the object's interface
+        """
+        return StaticInterface(self.get_proxy(object_path), iface_name)
+
+    def clear_property_cache(self):
+        """
+        Empties the property cache and resets its hit / miss counters.
+
+        Properties are memoized for the lifetime of the instance,
+        which is a single command invocation.
+        """
+        self._properties_cache = {}
+        self._value_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @profiler.profile('WyPy.set_object_property')
     def set_object_property(
         self,
         proxy=None,
         bus_name=None,
         prop_name=None,
         value=None,
-        iface=dbus.PROPERTIES_IFACE
+        iface=DBUS_PROPERTIES_IFACE
     ):
         _bus_name = bus_name if bus_name else self.bus_name
-        return proxy.Set(
+        self._invalidate_properties(proxy, _bus_name)
+        set_prop = profiler.wrap_method(iface, 'Set', proxy.Set)
+        return set_prop(
             _bus_name,
             prop_name,
             value,
-            dbus_interface=iface
+            dbus_interface=iface,
+            signature=get_method_signature(iface, 'Set')
         )
 
+    @profiler.profile('WyPy.get_object_property')
     def get_object_property(
         self,
         proxy=None,
         bus_name=None,
         prop_name=None,
-        iface=dbus.PROPERTIES_IFACE
+        iface=DBUS_PROPERTIES_IFACE
     ):
         _bus_name = bus_name if bus_name else self.bus_name
-        return proxy.Get(
+        object_path = getattr(proxy, 'object_path', None)
+        key = (str(object_path), _bus_name)
+        self._seed_from_daemon()
+
+        if object_path is not None:
+            props = self._properties_cache.get(key, {})
+            if prop_name in props:
+                self.cache_hits += 1
+                return props[prop_name]
+            if key + (prop_name,) in self._value_cache:
+                self.cache_hits += 1
+                return self._value_cache[key + (prop_name,)]
+
+        self.cache_misses += 1
+        get_prop = profiler.wrap_method(iface, 'Get', proxy.Get)
+        value = get_prop(
             _bus_name,
             prop_name,
-            dbus_interface=iface
+            dbus_interface=iface,
+            signature=get_method_signature(iface, 'Get')
         )
-
+        if object_path is not None:
+            self._value_cache[key + (prop_name,)] = value
+        return value
+
+    @profiler.profile('WyPy.load_snapshot')
+    def load_snapshot(self):
+        """
+        Fetches the whole NetworkManager object tree in a single
+        GetManagedObjects call and keeps it in memory.
+        Every object's properties are added to the property cache,
+        so get_all_properties no longer issues one GetAll per object.
+        When `wypy daemon` is running, the tree is read from it instead.
+
+        Returns:
+            dict -- object paths mapped to their interfaces' properties
+        """
+        self._daemon_checked = True
+        snapshot = fetch_snapshot(self.daemon_socket) \
+            if self.daemon_socket else None
+
+        if snapshot is None:
+            manager = self.get_interface(
+                NM_OBJ_MANAGER_PATH,
+                DBUS_OBJ_MANAGER_IFACE
+            )
+            snapshot = manager.GetManagedObjects()
+
+        self._set_snapshot(snapshot)
+        return self.snapshot
+
+    def get_snapshot_paths(self, iface_name):
+        """
+        Lists the object paths in the snapshot implementing `iface_name`.
+
+        Arguments:
+            iface_name {string} -- the d-bus interface to look for
+
+        Returns:
+            list -- the matching object paths
+        """
+        if self.snapshot is None:
+            self.load_snapshot()
+        return [
+            path for path, ifaces in self.snapshot.items()
+            if iface_name in ifaces
+        ]
+
+    @profiler.profile('WyPy.get_all_properties')
     def get_all_properties(self, object_path, iface_name):
-        proxy = self.bus.get_object(self.bus_name, object_path)
-        iface = dbus.Interface(proxy, dbus.PROPERTIES_IFACE)
-        return iface.GetAll(iface_name)
-
-    def translate_status_code(self, prop, code):
+        key = (str(object_path), iface_name)
+        self._seed_from_daemon()
+
+        if key in self._properties_cache:
+            self.cache_hits += 1
+            return self._properties_cache[key]
+
+        if key[0] == '/':
+            # NetworkManager's "no object" path, such as a disconnected
+            # device's ActiveConnection. Objects missing from the
+            # snapshot may have been added since, they are read live.
+            raise self.dbus_exception(
+                f'No such object path {object_path}',
+                name='org.freedesktop.DBus.Error.UnknownObject'
+            )
+
+        self.cache_misses += 1
+        iface = self.get_interface(object_path, DBUS_PROPERTIES_IFACE)
+        props = iface.GetAll(iface_name)
+        self._properties_cache[key] = props
+        return props
+
+    @profiler.profile('WyPy.call_many')
+    def call_many(
+        self,
+        calls,
+        max_in_flight=None,
+        timeout=None,
+        return_exceptions=False
+    ):
+        """
+        Issues d-bus method calls asynchronously and waits for
+        all the replies, instead of paying one round trip per call.
+        At most `max_in_flight` calls are pending at any time.
+
+        Arguments:
+            calls {list} -- (object_path, iface_name, method_name, args)
+            tuples describing each call
+
+        Keyword Arguments:
+            max_in_flight {int} -- concurrency cap
+            (default: {self.max_in_flight})
+            timeout {int} -- seconds to wait for all the replies
+            (default: {self.call_timeout})
+            return_exceptions {bool} -- return failed calls' exceptions
+            in place of their result instead of raising (default: {False})
+
+        Returns:
+            list -- the replies, in the same order as `calls`
+        """
+        calls = list(calls)
+        if len(calls) == 0:
+            return []
+
+        max_in_flight = max_in_flight or self.max_in_flight
+        timeout = timeout or self.call_timeout
+        results = [None] * len(calls)
+        errors = {}
+        pending = iter(enumerate(calls))
+        loop = self.create_main_loop()
+        state = {'in_flight': 0, 'done': 0}
+
+        def send_next():
+            for index, (path, iface_name, method, args) in pending:
+                iface = self.get_interface(path, iface_name)
+                state['in_flight'] += 1
+                getattr(iface, method)(
+                    *args,
+                    reply_handler=partial(on_reply, index),
+                    error_handler=partial(on_error, index),
+                    timeout=timeout
+                )
+                if state['in_flight'] >= max_in_flight:
+                    return
+
+        def on_reply(index, *values):
+            results[index] = values[0] if len(values) == 1 else values
+            on_done()
+
+        def on_error(index, exc):
+            errors[index] = exc
+            on_done()
+
+        def on_done():
+            state['in_flight'] -= 1
+            state['done'] += 1
+            if state['done'] == len(calls):
+                loop.quit()
+            else:
+                send_next()
+
+        def on_timeout():
+            state['timed_out'] = True
+            loop.quit()
+            return False
+
+        send_next()
+        if state['done'] < len(calls):
+            timer = self.timeout_add(timeout, on_timeout)
+            with profiler.measure('MainLoop.run', 'loop'):
+                loop.run()
+            if not state.get('timed_out'):
+                self.source_remove(timer)
+
+        if state.get('timed_out'):
+            raise self.dbus_exception(
+                f'Timed out waiting for {len(calls) - state["done"]} replies',
+                name='org.freedesktop.DBus.Error.Timeout'
+            )
+
+        for index in sorted(errors):
+            if not return_exceptions:
+                raise errors[index]
+            results[index] = errors[index]
+
+        return results
+
+    @profiler.profile('WyPy.prefetch_all_properties')
+    def prefetch_all_properties(self, object_paths, iface_name, refresh=False):
+        """
+        Fetches the properties of several objects with a single
+        call_many fan-out and stores them in the property cache, so
+        that the following get_all_properties calls are cache hits.
+        Objects already cached are skipped unless `refresh` is set.
+        Failed fetches are not cached: the next get_all_properties
+        call on that object raises as usual.
+
+        Arguments:
+            object_paths {list} -- the objects' d-bus paths
+            iface_name {string} -- the interface to get the properties of
+
+        Keyword Arguments:
+            refresh {bool} -- refetch cached objects (default: {False})
+        """
+        paths = []
+        for path in map(str, object_paths):
+            key = (path, iface_name)
+            if path == '/' or path in paths:
+                continue
+            if refresh or key not in self._properties_cache:
+                paths.append(path)
+
+        calls = [
+            (path, DBUS_PROPERTIES_IFACE, 'GetAll', (iface_name,))
+            for path in paths
+        ]
+        results = self.call_many(calls, return_exceptions=True)
+        self.cache_misses += len(paths)
+
+        for path, props in zip(paths, results):
+            if not isinstance(props, Exception):
+                self._properties_cache[(path, iface_name)] = props
+
+    def iter_all_properties(self, object_paths, iface_name, refresh=False):
+        """
+        Yields the properties of each object, fetched `max_in_flight`
+        objects at a time through prefetch_all_properties: the first
+        objects are available before the last ones are fetched.
+        Objects whose properties cannot be read are skipped.
+
+        Arguments:
+            object_paths {list} -- the objects' d-bus paths
+            iface_name {string} -- the interface to get the properties of
+
+        Keyword Arguments:
+            refresh {bool} -- refetch cached objects (default: {False})
+
+        Yields:
+            tuple -- (object path, properties)
+        """
+        object_paths = [str(path) for path in object_paths]
+        for start in range(0, len(object_paths), self.max_in_flight):
+            window = object_paths[start:start + self.max_in_flight]
+            self.prefetch_all_properties(window, iface_name, refresh=refresh)
+            for path in window:
+                props = self._properties_cache.get((path, iface_name))
+                if props is not None:
+                    yield path, props
+
+    def _set_snapshot(self, snapshot):
+        """
+        Keeps `snapshot` and adds every object's properties
+        to the property cache.
+        """
+        self.snapshot = snapshot
+        for path, ifaces in snapshot.items():
+            for iface_name, props in ifaces.items():
+                self._properties_cache[(str(path), iface_name)] = props
+
+    def _seed_from_daemon(self):
+        """
+        Fills the property cache from a running `wypy daemon`, once,
+        before the first property read. Does nothing if it is not
+        running: properties are then read over d-bus.
+        """
+        if self._daemon_checked:
+            return
+        self._daemon_checked = True
+
+        if self.daemon_socket and self.snapshot is None:
+            snapshot = fetch_snapshot(self.daemon_socket)
+            if snapshot is not None:
+                self._set_snapshot(snapshot)
+
+    def _invalidate_properties(self, proxy, iface_name):
+        """
+        Drops the cached properties of `iface_name` on the proxy's
+        object so that the next read reflects the new value.
+        """
+        object_path = str(getattr(proxy, 'object_path', None))
+        self._properties_cache.pop((object_path, iface_name), None)
+        stale = [
+            key for key in self._value_cache
+            if key[:2] == (object_path, iface_name)
+        ]
+        for key in stale:
+            del self._value_cache[key]
+
+    def translate_status_code(self, prop, code, color=True):
+        """
+        Translates a NetworkManager status code into words.
+
+        Arguments:
+            prop {string} -- the property, a DBUS_GENERAL_PROPS value
+            code {int} -- its value
+
+        Keyword Arguments:
+            color {bool} -- color the words according to the status
+            (default: {True})
+        """
+        paint = colored if color else lambda text, _color: text
 
         if prop == 'CONNECTIVITY':
 
             if code == 0:
-                return colored('unknown', 'red')
+                return paint('unknown', 'red')
 
             if code == 1:
-                return colored('none', 'red')
+                return paint('none', 'red')
 
             if code == 2:
-                return colored('portal', 'yellow')
+                return paint('portal', 'yellow')
 
             if code == 3:
-                return colored('limited', 'green')
+                return paint('limited', 'green')
 
             if code == 4:
-                return colored('full', 'green')
+                return paint('full', 'green')
 
         if prop == 'STATE':
             if code == 0:
-                return colored('unknown', 'red')
+                return paint('unknown', 'red')
 
             if code == 10:
-                return colored('asleep', 'yellow')
+                return paint('asleep', 'yellow')
 
             if code == 20:
-                return colored('disconnected', 'red')
+                return paint('disconnected', 'red')
 
             if code == 30:
-                return colored('disconnecting', 'red')
+                return paint('disconnecting', 'red')
 
             if code == 40:
-                return colored('connecting', 'yellow')
+                return paint('connecting', 'yellow')
 
             if code == 50:
-                return colored('connected (local)', 'green')
+                return paint('connected (local)', 'green')
 
             if code == 60:
-                return colored('connected (site)', 'green')
+                return paint('connected (site)', 'green')
 
             if code == 70:
-                return colored('connected', 'green')
+                return paint('connected', 'green')
 
         if prop in ['NETWORKING', 'WIFI', 'WIFI-HW', 'WWAN', 'WWAN-HW']:
             if code == 1:
-                return colored('enabled', 'green')
+                return paint('enabled', 'green')
             if code == 0:
-                return colored('disabled', 'red')
+                return paint('disabled', 'red')
 
     def translate_device_type(self, _type):
         if _type == 30: